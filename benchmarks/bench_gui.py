@@ -0,0 +1,431 @@
+"""
+GUI Performance Benchmark Suite
+
+Drives the launcher window without manual interaction and measures:
+    startup      time from launch to the first frame
+    switch       script-switch latency for configs of 10, 100 and 1000 keys,
+                 first switch (form built) and later switches (cached form)
+    throughput   output lines per second the window keeps up with: the
+                 highest rate at which the event loop's p95 lag stays under
+                 the lag budget and every line is on screen shortly after the
+                 output stops
+    memory       RSS growth per million output lines
+
+Each benchmark runs in a fresh interpreter. Results are written as JSON,
+stamped with the git commit, so runs on different commits can be compared.
+
+Purpose:
+    Catches regressions in the parts of the launcher users feel: start-up,
+    switching scripts with large configs, and streaming output from chatty
+    scripts during long runs.
+
+Usage:
+    python benchmarks/bench_gui.py [--only switch,throughput] [--runs 3]
+                                   [--lines 1000000] [--lag-budget-ms 100]
+                                   [--json results.json] [--compare old.json]
+
+    Without a DISPLAY the suite starts its own Xvfb (it must be installed,
+    e.g. apt install xvfb); --xvfb forces that even when a display is set.
+
+Output:
+    A summary table, the JSON results file and, with --compare, the change
+    of every metric against an earlier results file.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BENCHMARKS = ("startup", "switch", "throughput", "memory")
+SWITCH_SIZES = (10, 100, 1000)
+THROUGHPUT_RATES = (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000, 500000)
+HEARTBEAT_MS = 20
+LINE = "Processing tile {n:07d}: 512x512 px, 4 bands, class histogram [0.12 0.55 0.21 0.12]\n"
+
+
+# ---------------------------------------------------------------------------
+# Child side: runs inside the launcher process
+# ---------------------------------------------------------------------------
+
+def _start_app():
+    sys.path.insert(0, str(REPO_DIR))
+    import drag_drop
+    app = drag_drop.App()
+    while drag_drop.STARTUP.elapsed("first frame") is None:
+        app.update()
+        time.sleep(0.005)
+    return drag_drop, app
+
+
+def _settle(app, seconds=0.0):
+    """Process events, for at least the given time"""
+    end = time.perf_counter() + seconds
+    while True:
+        app.update()
+        if time.perf_counter() >= end:
+            return
+        time.sleep(0.002)
+
+
+def _rss_bytes():
+    from launcher.resources import _read_proc, _read_psutil
+    values = _read_proc(os.getpid()) or _read_psutil(os.getpid())
+    return values[1] if values else None
+
+
+class Heartbeat:
+    """after() callback that records how late the event loop runs it"""
+
+    def __init__(self, app, interval_ms=HEARTBEAT_MS):
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.lags = []
+        self._expected = None
+        self._running = False
+
+    def start(self):
+        self.lags = []
+        self._running = True
+        self._schedule()
+
+    def stop(self):
+        self._running = False
+
+    def _schedule(self):
+        self._expected = time.perf_counter() + self.interval
+        self.app.after(int(self.interval * 1000), self._beat)
+
+    def _beat(self):
+        self.lags.append(max(0.0, time.perf_counter() - self._expected) * 1000)
+        if self._running:
+            self._schedule()
+
+    def percentile(self, q):
+        if not self.lags:
+            return None
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def child_startup(args):
+    drag_drop, app = _start_app()
+    result = {"first_frame_ms": drag_drop.STARTUP.elapsed("first frame")}
+    app._on_close()
+    return result
+
+
+def child_switch(args):
+    drag_drop, app = _start_app()
+    _settle(app, 0.5)
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_switch_"))
+    try:
+        names = []
+        for size in SWITCH_SIZES:
+            name = f"bench_keys_{size}.py"
+            (work_dir / name).write_text(f'"""Switch benchmark script with {size} config keys"""\n')
+            # A mix of the value kinds real configs hold; every fifth is a path
+            values = {}
+            for i in range(size):
+                if i % 5 == 0:
+                    values[f"key_{i:04d}"] = str(work_dir / f"missing_{i}")
+                elif i % 5 == 1:
+                    values[f"key_{i:04d}"] = i
+                elif i % 5 == 2:
+                    values[f"key_{i:04d}"] = i / 7
+                else:
+                    values[f"key_{i:04d}"] = f"value {i}"
+            with open(work_dir / f"bench_keys_{size}_config.yml", 'w') as f:
+                yaml.safe_dump(values, f)
+            names.append(name)
+        app.script_registry.script_dirs.append(work_dir)
+        app.script_registry.refresh()
+
+        def switch(name):
+            started = time.perf_counter()
+            app.on_script_selected(name)
+            app.update_idletasks()
+            return (time.perf_counter() - started) * 1000
+
+        result = {}
+        baseline = app.script_dropdown.get()
+        for name, size in zip(names, SWITCH_SIZES):
+            first = switch(name)
+            _settle(app, 0.2)
+            cached = []
+            for _ in range(args.runs):
+                switch(baseline)
+                _settle(app, 0.05)
+                cached.append(switch(name))
+                _settle(app, 0.05)
+            result[f"keys_{size}"] = {"first_ms": first, "cached_ms": statistics.median(cached)}
+        switch(baseline)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    app._on_close()
+    return result
+
+
+def _widget_lines(app):
+    return int(app.output_textbox.index("end-1c").split(".")[0]) - 1
+
+
+def _stream(app, rate, seconds):
+    """Feed lines at a rate while the output pump runs; (p95 lag, max lag, catch-up s)"""
+    app._set_output("")
+    app.script_is_running = True
+    app._start_output_pump()
+    done = threading.Event()
+    produced = [0]
+
+    def produce():
+        step = 0.01
+        per_step = max(1, int(rate * step))
+        next_time = time.perf_counter()
+        end = next_time + seconds
+        while time.perf_counter() < end:
+            n = produced[0]
+            chunk = "".join(LINE.format(n=n + i) for i in range(per_step))
+            app.output_buffer.feed_bytes(chunk.encode())
+            produced[0] = n + per_step
+            next_time += step
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        done.set()
+
+    heartbeat = Heartbeat(app)
+    heartbeat.start()
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    while not done.is_set():
+        app.update()
+        time.sleep(0.001)
+    stopped = time.perf_counter()
+    heartbeat.stop()
+    # Caught up once every produced line is in the widget; the pump keeps
+    # drawing at its usual interval until then
+    while _widget_lines(app) < produced[0] and time.perf_counter() - stopped < 30:
+        app.update()
+        time.sleep(0.001)
+    catch_up = time.perf_counter() - stopped
+    app.script_is_running = False
+    _settle(app, 0.1)
+    return heartbeat.percentile(0.95), max(heartbeat.lags or [0]), catch_up
+
+
+def child_throughput(args):
+    drag_drop, app = _start_app()
+    _settle(app, 0.5)
+    steps = []
+    sustained = 0
+    for rate in THROUGHPUT_RATES:
+        p95, worst, catch_up = _stream(app, rate, args.seconds)
+        ok = p95 is not None and p95 <= args.lag_budget_ms and catch_up <= 1.0
+        steps.append({"lines_per_sec": rate, "p95_lag_ms": p95, "max_lag_ms": worst,
+                      "catch_up_s": catch_up, "ok": ok})
+        if not ok:
+            break
+        sustained = rate
+    app._on_close()
+    return {"sustained_lines_per_sec": sustained, "lag_budget_ms": args.lag_budget_ms, "steps": steps}
+
+
+def child_memory(args):
+    drag_drop, app = _start_app()
+    _settle(app, 1.0)
+    app._set_output("")
+    _settle(app, 0.2)
+    before = _rss_bytes()
+    app.script_is_running = True
+    app._start_output_pump()
+    batch = 10000
+    started = time.perf_counter()
+    for first in range(0, args.lines, batch):
+        chunk = "".join(LINE.format(n=n) for n in range(first, min(first + batch, args.lines)))
+        app.output_buffer.feed_bytes(chunk.encode())
+        app._flush_output()
+        app.update()
+    app.script_is_running = False
+    app.output_buffer.finish()
+    app._flush_output()
+    _settle(app, 0.5)
+    after = _rss_bytes()
+    lines_shown = _widget_lines(app)
+    result = {
+        "lines": args.lines,
+        "seconds": time.perf_counter() - started,
+        "rss_before_bytes": before,
+        "rss_after_bytes": after,
+        "growth_per_million_lines_mb": (None if before is None or after is None
+                                        else (after - before) / 1024 ** 2 * 1e6 / args.lines),
+        "lines_in_widget": lines_shown,
+    }
+    app._on_close()
+    return result
+
+
+CHILDREN = {
+    "startup": child_startup,
+    "switch": child_switch,
+    "throughput": child_throughput,
+    "memory": child_memory,
+}
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def virtual_display(force=False):
+    """Environment with a DISPLAY, starting Xvfb if there is none"""
+    env = os.environ.copy()
+    if env.get("DISPLAY") and not force:
+        yield env
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise RuntimeError("No DISPLAY and Xvfb is not installed (e.g. apt install xvfb)")
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen([xvfb, "-displayfd", str(write_fd), "-screen", "0", "1600x1200x24", "-nolisten", "tcp"],
+                               pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd) as f:
+            display = f.readline().strip()
+        if not display:
+            raise RuntimeError("Xvfb did not start")
+        env["DISPLAY"] = f":{display}"
+        yield env
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run_in_child(name, args, env):
+    command = [sys.executable, __file__, "--child", name, "--runs", str(args.runs),
+               "--lines", str(args.lines), "--seconds", str(args.seconds),
+               "--lag-budget-ms", str(args.lag_budget_ms)]
+    result = subprocess.run(command, capture_output=True, text=True, timeout=1800, cwd=REPO_DIR, env=env)
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    print(result.stdout + result.stderr)
+    raise RuntimeError(f"Benchmark '{name}' did not report a result")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=REPO_DIR, timeout=10).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def flatten(results, prefix=""):
+    """{"switch.keys_10.first_ms": 12.3, ...} for numeric results"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def print_comparison(results, old_path):
+    with open(old_path, 'r') as f:
+        old = json.load(f)
+    current, previous = flatten(results["results"]), flatten(old.get("results", {}))
+    print(f"\nCompared with {old.get('commit') or old_path}:")
+    print(f"{'metric':<44}{'before':>14}{'now':>14}{'change':>10}")
+    for name in sorted(set(current) & set(previous)):
+        before, now = previous[name], current[name]
+        change = f"{(now - before) / before * 100:+.1f}%" if before else ""
+        print(f"{name:<44}{before:>14.1f}{now:>14.1f}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Launcher GUI performance benchmarks")
+    parser.add_argument("--only", help=f"comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--runs", type=int, default=3, help="startup runs / cached switches per size")
+    parser.add_argument("--lines", type=int, default=1000000, help="output lines for the memory benchmark")
+    parser.add_argument("--seconds", type=float, default=2.0, help="seconds of output per throughput rate")
+    parser.add_argument("--lag-budget-ms", type=float, default=100.0)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--xvfb", action="store_true", help="Use a private Xvfb even if DISPLAY is set")
+    parser.add_argument("--child", choices=BENCHMARKS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(CHILDREN[args.child](args)), flush=True)
+        return 0
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    try:
+        with virtual_display(args.xvfb) as env:
+            for name in selected:
+                print(f"Running {name}...", flush=True)
+                if name == "startup":
+                    samples = [run_in_child(name, args, env)["first_frame_ms"] for _ in range(args.runs)]
+                    results[name] = {"first_frame_ms": statistics.median(samples), "samples_ms": samples}
+                else:
+                    results[name] = run_in_child(name, args, env)
+    except RuntimeError as e:
+        print(e)
+        return 2
+
+    if "startup" in results:
+        print(f"\nStartup to first frame: {results['startup']['first_frame_ms']:.1f} ms")
+    if "switch" in results:
+        print(f"\n{'config keys':<14}{'first ms':>10}{'cached ms':>11}")
+        for size in SWITCH_SIZES:
+            row = results["switch"][f"keys_{size}"]
+            print(f"{size:<14}{row['first_ms']:>10.1f}{row['cached_ms']:>11.1f}")
+    if "throughput" in results:
+        print(f"\nOutput throughput: {results['throughput']['sustained_lines_per_sec']} lines/s "
+              f"within a {args.lag_budget_ms:.0f} ms p95 event-loop lag")
+        for step in results["throughput"]["steps"]:
+            print(f"  {step['lines_per_sec']:>8} lines/s  p95 lag {step['p95_lag_ms'] or 0:7.1f} ms  "
+                  f"max {step['max_lag_ms']:7.1f} ms  catch-up {step['catch_up_s']:5.2f} s  "
+                  f"{'ok' if step['ok'] else 'LAGS'}")
+    if "memory" in results and results["memory"]["growth_per_million_lines_mb"] is not None:
+        print(f"\nMemory growth: {results['memory']['growth_per_million_lines_mb']:.1f} MB per million lines "
+              f"({results['memory']['lines']} lines in {results['memory']['seconds']:.1f} s)")
+
+    document = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(document, f, indent=2)
+    if args.compare:
+        print_comparison(document, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
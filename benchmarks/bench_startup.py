@@ -0,0 +1,106 @@
+"""
+Startup Regression Benchmark
+
+Starts drag_drop.py in a fresh interpreter several times, waits for the first
+frame and collects the launcher's startup profile from each run.
+
+Purpose:
+    Guards the first-frame budget of the launcher. Work that does not need to
+    happen before the window is shown should be deferred; this benchmark
+    fails when it creeps back in.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 300] [--json out.json]
+
+    A display is required. On a Linux server run it under a virtual display:
+    xvfb-run -a python benchmarks/bench_startup.py
+
+Output:
+    Median time per startup phase and the median first-frame time. Exits with
+    status 1 when the median first-frame time exceeds the budget.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_child():
+    """Start the launcher, report its profile at the first frame and exit"""
+    sys.path.insert(0, str(REPO_DIR))
+    import drag_drop
+
+    app = drag_drop.App()
+
+    def check():
+        if drag_drop.STARTUP.elapsed("first frame") is None:
+            app.after(5, check)
+            return
+        print(json.dumps(drag_drop.STARTUP.as_dict()), flush=True)
+        app._on_close()
+
+    app.after(5, check)
+    app.mainloop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Launcher startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return 0
+
+    samples = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            capture_output=True, text=True, timeout=120, cwd=REPO_DIR,
+        )
+        profile = None
+        for line in result.stdout.splitlines():
+            if line.startswith("{"):
+                profile = json.loads(line)
+        if profile is None:
+            print(result.stdout + result.stderr)
+            print("Launcher did not report a first frame")
+            return 2
+        samples.append(profile)
+
+    phase_names = [phase["name"] for phase in samples[0]["phases"]]
+    print(f"{'phase':<24}{'median ms':>10}")
+    phases = {}
+    for name in phase_names:
+        durations = [phase["duration_ms"] for sample in samples
+                     for phase in sample["phases"] if phase["name"] == name]
+        phases[name] = statistics.median(durations)
+        print(f"{name:<24}{phases[name]:>10.1f}")
+
+    first_frames = [phase["start_ms"] + phase["duration_ms"] for sample in samples
+                    for phase in sample["phases"] if phase["name"] == "first frame"]
+    first_frame = statistics.median(first_frames)
+    passed = first_frame <= args.budget_ms
+    print(f"\nFirst frame: {first_frame:.1f} ms (budget {args.budget_ms:.0f} ms) "
+          f"{'OK' if passed else 'OVER BUDGET'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                "first_frame_ms": first_frame,
+                "first_frame_samples_ms": first_frames,
+                "phases_ms": phases,
+                "budget_ms": args.budget_ms,
+            }, f, indent=2)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
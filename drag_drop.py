@@ -1,26 +1,804 @@
+from launcher.startup import StartupProfile
+
+# Created before the heavy imports so they show up in the startup profile
+STARTUP = StartupProfile()
+
 import customtkinter as ctk
+import tkinter as tk
+from tkinter import filedialog
 from tkinterdnd2 import DND_FILES, TkinterDnD
 import yaml
 from pathlib import Path
-import subprocess
-import sys
 import threading
-import glob
+import time
+import json
+import getpass
+import sqlite3
 import os
 from datetime import datetime
 from PIL import Image
 import random
 
+from launcher.output import TerminalBuffer
+from launcher.settings import load_settings, state_dir
+from launcher.conda_envs import default_environment, discover_environments
+from launcher.script_registry import ScriptRegistry, config_filename_for
+from launcher.config_store import PATH_TYPES, ConfigStoreManager, format_value, normalize_path, schema_defaults
+from launcher.runner import CONFIG_ENV_VAR, start_process, command_text, write_config_snapshot
+from launcher.process_tree import stop_tree
+from launcher.resources import ResourceMonitor, describe_summary, format_bytes
+from launcher.history import RunHistory, STATUSES, SLOWER_THRESHOLD, new_run_id
+from launcher.profiling import (PROFILE_MODES, PROFILE_FILENAME, shim_args, load_summary, format_table,
+                                format_memory_sites, format_memory_growth)
+from launcher.sweep import SweepRunner, SweepError, expand_sweep
+from launcher.workflow import Workflow, WorkflowRunner, WorkflowError
+from launcher.run_cache import RunCache, environment_identity, fingerprint, may_rewrite_inputs
+from launcher.staging import StagingCache, StagingPlan
+from launcher.job_server import JobClient, JobServerError, RemoteJob
+from launcher.path_check import TIF_SUFFIXES, PathChecker, looks_like_path
+from launcher.tile_list import TILE_LIST_KEY, sidecar_path, write_tile_list
+from launcher import latency
+from launcher.latency import LatencyMonitor, instrumented
+from launcher.exec_profiles import ExecProfile, ExecProfileStore, ExecProfileError, format_cpu_list
+from launcher import worker_pool
+from launcher.worker_pool import WorkerPool, WorkerError
+
 ctk.set_appearance_mode("system")
 ctk.set_default_color_theme("blue")
+STARTUP.checkpoint("imports")
+
+# How often (ms) buffered script output is drawn while a script is running
+OUTPUT_REFRESH_MS = 250
+
+# Number of script forms kept built in memory for instant switching
+FORM_CACHE_SIZE = 20
+
+# Execution profile menu entry for "run without a profile"
+NO_EXEC_PROFILE = "None"
+
+# Delay (ms) after the last keystroke before an edited path is checked
+PATH_CHECK_DELAY_MS = 600
+
+# Path check badge colors (light, dark)
+BADGE_COLORS = {
+    "ok": ("#388E3C", "#81C784"),
+    "warning": ("#F57C00", "#FFB74D"),
+    "error": ("#D32F2F", "#E57373"),
+    "info": ("gray40", "gray70"),
+}
+
+
+class FieldRow:
+    """Label and drop-target entry for one config key
+
+    Rows are created once and reused when a form's keys change, so the
+    drop target registration and bindings are only done once per widget.
+    """
+
+    def __init__(self, app, parent):
+        self.key = None
+        self.frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.label = ctk.CTkLabel(self.frame, text="", font=app.label_font)
+        self.label.pack(pady=(10, 5))
+        entry_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        entry_frame.pack(pady=5, fill="x", padx=10)
+        self.entry = ctk.CTkEntry(entry_frame, height=40, font=app.entry_font)
+        self.entry.pack(side="left", fill="x", expand=True)
+
+        # Result of the background path check, shown next to the entry
+        self.badge = ctk.CTkLabel(entry_frame, text="", font=("Segoe UI", 11))
+        self.checking_path = None
+        self.check_count = 0
+        self.check_after_id = None
+
+        # Enable drag and drop
+        self.entry.drop_target_register(DND_FILES)
+        self.entry.dnd_bind("<<Drop>>", lambda e: app.drop(e, self.key))
+
+        # Bind change detection to update the config model
+        self.entry.bind("<KeyRelease>", lambda e: app._on_field_change(e, self.key))
+
+    def assign(self, key):
+        """Point the row at a (possibly different) config key"""
+        if key != self.key:
+            self.key = key
+            self.label.configure(text=f"{key.replace('_', ' ').title()}:")
+            self.entry.configure(placeholder_text=f"Drag {key} here")
+            self.show_badge(None)
+
+    def show_badge(self, text, level="info"):
+        """Show a path check result next to the entry; None hides it"""
+        if text is None:
+            self.checking_path = None
+            self.badge.pack_forget()
+            return
+        self.badge.configure(text=text, text_color=BADGE_COLORS[level])
+        if not self.badge.winfo_ismapped():
+            self.badge.pack(side="left", padx=(8, 0))
+
+    def set_value(self, value):
+        """Show a value, touching the widget only if the text differs"""
+        text = str(value) if value else ""
+        if self.entry.get() != text:
+            self.entry.delete(0, "end")
+            if text:
+                self.entry.insert(0, text)
+
+
+class ConfigForm:
+    """The fields for one config file, built once and kept for reuse"""
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.frame = ctk.CTkFrame(parent, fg_color="transparent")
+        self.rows = {}       # key -> FieldRow, in display order
+        self.spare_rows = []  # hidden rows waiting to be reused
+        self.entries = {}    # key -> entry widget
+
+    def update(self, config_data):
+        """Show config_data, reusing rows and only updating changed values"""
+        keys = list(config_data)
+        if keys != list(self.rows):
+            self._layout(keys)
+        for key, value in config_data.items():
+            self.rows[key].set_value(value)
+
+    def _layout(self, keys):
+        # Hide rows for keys that went away and keep them for reuse
+        for key in list(self.rows):
+            if key not in keys:
+                row = self.rows.pop(key)
+                row.frame.pack_forget()
+                self.spare_rows.append(row)
+
+        rows = {}
+        for key in keys:
+            row = self.rows.get(key)
+            if row is None:
+                row = self.spare_rows.pop() if self.spare_rows else FieldRow(self.app, self.frame)
+                row.assign(key)
+            rows[key] = row
+
+        # Re-pack in config order
+        for row in self.rows.values():
+            row.frame.pack_forget()
+        for row in rows.values():
+            row.frame.pack(fill="x")
+        self.rows = rows
+        self.entries = {key: row.entry for key, row in rows.items()}
+
+    def destroy(self):
+        self.frame.destroy()
+
+
+class SweepWindow(ctk.CTkToplevel):
+    """Results table for a parameter sweep, updated live while it runs"""
+
+    STATUS_COLORS = {
+        "pending": ("gray40", "gray70"),
+        "running": ("#F57C00", "#FFB74D"),
+        "ok": ("#388E3C", "#81C784"),
+        "failed": ("#D32F2F", "#E57373"),
+        "cancelled": ("gray40", "gray70"),
+    }
+
+    def __init__(self, app, script_name, script_path, conda_env, swept_keys, variants, work_dir):
+        super().__init__(app)
+        self.app = app
+        self.script_path = script_path
+        self.conda_env = conda_env
+        self.swept_keys = swept_keys
+        self.variant_configs = variants
+        self.work_dir = work_dir
+        self.runner = None
+        self.rows = {}
+        self.recorded = set()   # indexes of variants already in the run history
+
+        self.title(f"Sweep: {script_name}")
+        self.geometry("760x600")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        title_label = ctk.CTkLabel(
+            self,
+            text=f"Sweep: {script_name} ({len(variants)} variants)",
+            font=("Segoe UI", 16, "bold")
+        )
+        title_label.pack(pady=(15, 5))
+
+        env_label = ctk.CTkLabel(self, text=f"Conda Environment: {conda_env or 'system Python'}",
+                                 font=("Segoe UI", 11))
+        env_label.pack()
+
+        # Controls
+        control_frame = ctk.CTkFrame(self, fg_color="transparent")
+        control_frame.pack(pady=10)
+        ctk.CTkLabel(control_frame, text="Parallel workers:", font=("Segoe UI", 12)).pack(side="left", padx=5)
+        self.workers_menu = ctk.CTkOptionMenu(
+            control_frame,
+            values=[str(n) for n in range(1, 9)],
+            width=70
+        )
+        self.workers_menu.set(str(app.settings["sweep"]["max_workers"]))
+        self.workers_menu.pack(side="left", padx=5)
+        self.start_button = ctk.CTkButton(
+            control_frame, text="▶ Start", command=self.start, width=100,
+            font=("Segoe UI", 12, "bold")
+        )
+        self.start_button.pack(side="left", padx=5)
+        self.cancel_button = ctk.CTkButton(
+            control_frame, text="⏹ Cancel", command=self.cancel, width=100,
+            font=("Segoe UI", 12, "bold"), state="disabled",
+            fg_color=["#D32F2F", "#B71C1C"], hover_color=["#F44336", "#D32F2F"]
+        )
+        self.cancel_button.pack(side="left", padx=5)
+
+        # Results table
+        table = ctk.CTkScrollableFrame(self, width=720, height=400)
+        table.pack(pady=5, padx=15, fill="both", expand=True)
+        table.grid_columnconfigure(1, weight=1)
+        for column, heading in enumerate(["#", "Parameters", "Status", "Duration", "Exit"]):
+            ctk.CTkLabel(table, text=heading, font=("Segoe UI", 12, "bold")).grid(
+                row=0, column=column, padx=6, pady=4, sticky="w")
+        for index, config in enumerate(variants, start=1):
+            params = ", ".join(f"{key}={config[key]}" for key in swept_keys)
+            cells = [
+                ctk.CTkLabel(table, text=str(index), font=("Segoe UI", 11)),
+                ctk.CTkLabel(table, text=params, font=("Segoe UI", 11), anchor="w", justify="left",
+                             wraplength=420),
+                ctk.CTkLabel(table, text="pending", font=("Segoe UI", 11, "bold"),
+                             text_color=self.STATUS_COLORS["pending"]),
+                ctk.CTkLabel(table, text="", font=("Segoe UI", 11)),
+                ctk.CTkLabel(table, text="", font=("Segoe UI", 11)),
+            ]
+            for column, cell in enumerate(cells):
+                cell.grid(row=index, column=column, padx=6, pady=2, sticky="w")
+            self.rows[index] = cells
+
+        self.summary_label = ctk.CTkLabel(self, text=f"Logs and config snapshots: {work_dir}",
+                                          font=("Segoe UI", 10), wraplength=720)
+        self.summary_label.pack(pady=(5, 15))
+
+    def start(self):
+        """Run the variants in the background"""
+        self.runner = SweepRunner(
+            self.script_path, self.conda_env, self.variant_configs, self.swept_keys, self.work_dir,
+            max_workers=int(self.workers_menu.get()),
+            on_update=lambda variant: self.app.after(0, self._update_row, variant),
+            exec_profile=self.app.exec_profiles.profile_for(Path(self.script_path).name)
+        )
+        self.start_button.configure(state="disabled")
+        self.workers_menu.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.runner.start()
+
+    def cancel(self):
+        if self.runner is not None:
+            self.runner.cancel()
+            self.cancel_button.configure(state="disabled")
+
+    def _update_row(self, variant):
+        if variant.ended is not None and variant.index not in self.recorded:
+            self.recorded.add(variant.index)
+            self.app.record_batch_run(
+                "sweep", self.script_path, variant.status, variant.returncode, variant.config,
+                self.conda_env, variant.started, variant.ended, variant.log_path,
+            )
+        if not self.winfo_exists():
+            return
+        cells = self.rows[variant.index]
+        cells[2].configure(text=variant.status, text_color=self.STATUS_COLORS[variant.status])
+        if variant.duration is not None:
+            cells[3].configure(text=f"{variant.duration:.1f} s")
+        if variant.returncode is not None:
+            cells[4].configure(text=str(variant.returncode))
+
+        variants = self.runner.variants
+        finished = [v for v in variants if v.status in ("ok", "failed", "cancelled")]
+        failed = sum(1 for v in variants if v.status == "failed")
+        summary = f"{len(finished)}/{len(variants)} finished, {failed} failed. Logs: {self.work_dir}"
+        self.summary_label.configure(text=summary)
+        if len(finished) == len(variants):
+            self.cancel_button.configure(state="disabled")
+
+    def _on_close(self):
+        # Closing the window cancels a sweep that is still running
+        if self.runner is not None and not self.runner.done.is_set():
+            self.runner.cancel()
+        self.destroy()
+
+
+class WorkflowWindow(ctk.CTkToplevel):
+    """Workflow DAG with live status and timing per step"""
+
+    NODE_WIDTH = 190
+    NODE_HEIGHT = 64
+    COLUMN_GAP = 70
+    ROW_GAP = 26
+    STATUS_COLORS = {
+        "pending": "#757575",
+        "running": "#F57C00",
+        "ok": "#388E3C",
+        "failed": "#D32F2F",
+        "skipped": "#9E9E9E",
+        "cancelled": "#9E9E9E",
+    }
+
+    def __init__(self, app, workflow, conda_env, work_dir):
+        super().__init__(app)
+        self.app = app
+        self.workflow = workflow
+        self.conda_env = conda_env
+        self.work_dir = work_dir
+        self.runner = None
+        self.nodes = {}
+
+        self.title(f"Workflow: {workflow.name}")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        title_label = ctk.CTkLabel(
+            self,
+            text=f"Workflow: {workflow.name} ({len(workflow.steps)} steps)",
+            font=("Segoe UI", 16, "bold")
+        )
+        title_label.pack(pady=(15, 5))
+        env_label = ctk.CTkLabel(
+            self, text=f"Default Conda Environment: {conda_env or 'system Python'}", font=("Segoe UI", 11)
+        )
+        env_label.pack()
+
+        control_frame = ctk.CTkFrame(self, fg_color="transparent")
+        control_frame.pack(pady=10)
+        ctk.CTkLabel(control_frame, text="Parallel steps:", font=("Segoe UI", 12)).pack(side="left", padx=5)
+        self.workers_menu = ctk.CTkOptionMenu(control_frame, values=[str(n) for n in range(1, 9)], width=70)
+        self.workers_menu.set(str(app.settings["workflows"]["max_workers"]))
+        self.workers_menu.pack(side="left", padx=5)
+        self.start_button = ctk.CTkButton(
+            control_frame, text="▶ Start", command=self.start, width=100,
+            font=("Segoe UI", 12, "bold")
+        )
+        self.start_button.pack(side="left", padx=5)
+        self.cancel_button = ctk.CTkButton(
+            control_frame, text="⏹ Cancel", command=self.cancel, width=100,
+            font=("Segoe UI", 12, "bold"), state="disabled",
+            fg_color=["#D32F2F", "#B71C1C"], hover_color=["#F44336", "#D32F2F"]
+        )
+        self.cancel_button.pack(side="left", padx=5)
+
+        # Steps are laid out in columns by dependency depth
+        levels = workflow.levels()
+        rows = max(len(level) for level in levels)
+        width = len(levels) * (self.NODE_WIDTH + self.COLUMN_GAP) + self.COLUMN_GAP
+        height = rows * (self.NODE_HEIGHT + self.ROW_GAP) + self.ROW_GAP
+        dark = ctk.get_appearance_mode() == "Dark"
+        self.text_color = "#EEEEEE" if dark else "#212121"
+        self.canvas = tk.Canvas(self, width=min(width, 1100), height=min(height, 600),
+                                scrollregion=(0, 0, width, height), highlightthickness=0,
+                                bg="#2B2B2B" if dark else "#F2F2F2")
+        self.canvas.pack(padx=15, pady=5, fill="both", expand=True)
+
+        positions = {}
+        for column, level in enumerate(levels):
+            for row, name in enumerate(level):
+                x = self.COLUMN_GAP + column * (self.NODE_WIDTH + self.COLUMN_GAP)
+                y = self.ROW_GAP + row * (self.NODE_HEIGHT + self.ROW_GAP)
+                positions[name] = (x, y)
+        for name, step in workflow.steps.items():
+            x, y = positions[name]
+            for need in step.needs:
+                nx, ny = positions[need]
+                self.canvas.create_line(nx + self.NODE_WIDTH, ny + self.NODE_HEIGHT / 2,
+                                        x, y + self.NODE_HEIGHT / 2,
+                                        arrow="last", fill="#9E9E9E", width=2)
+        for name, step in workflow.steps.items():
+            x, y = positions[name]
+            box = self.canvas.create_rectangle(x, y, x + self.NODE_WIDTH, y + self.NODE_HEIGHT,
+                                               outline=self.STATUS_COLORS["pending"], width=3)
+            self.canvas.create_text(x + 10, y + 8, anchor="nw", text=name, fill=self.text_color,
+                                    font=("Segoe UI", 11, "bold"))
+            self.canvas.create_text(x + 10, y + 26, anchor="nw", fill=self.text_color,
+                                    text=f"{step.script.name} [{step.conda_env or conda_env or 'python'}]",
+                                    font=("Segoe UI", 9), width=self.NODE_WIDTH - 20)
+            status = self.canvas.create_text(x + 10, y + 44, anchor="nw", text="pending",
+                                             fill=self.STATUS_COLORS["pending"], font=("Segoe UI", 10, "bold"))
+            self.nodes[name] = (box, status)
+
+        self.summary_label = ctk.CTkLabel(self, text=f"Logs and config snapshots: {work_dir}",
+                                          font=("Segoe UI", 10), wraplength=700)
+        self.summary_label.pack(pady=(5, 15))
+
+    def start(self):
+        """Run the workflow in the background"""
+        self.runner = WorkflowRunner(
+            self.workflow, self.work_dir,
+            max_workers=int(self.workers_menu.get()),
+            default_env=self.conda_env,
+            on_update=lambda step: self.app.after(0, self._update_node, step),
+            exec_profiles=self.app.exec_profiles
+        )
+        try:
+            self.runner.start()
+        except WorkflowError as e:
+            self.summary_label.configure(text=f"Invalid workflow: {e}")
+            return
+        self.start_button.configure(state="disabled")
+        self.workers_menu.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self._tick()
+
+    def cancel(self):
+        if self.runner is not None:
+            self.runner.cancel()
+            self.cancel_button.configure(state="disabled")
+
+    def _update_node(self, step, record=True):
+        if record and step.status in ("ok", "failed", "cancelled") and step.started is not None:
+            self.app.record_batch_run(
+                "workflow", step.script, step.status, step.returncode, step.config,
+                step.conda_env or self.conda_env, step.started, step.ended, step.log_path,
+            )
+        if not self.winfo_exists():
+            return
+        box, status = self.nodes[step.name]
+        color = self.STATUS_COLORS[step.status]
+        text = step.status
+        if step.duration is not None:
+            text += f"  {step.duration:.1f} s"
+        self.canvas.itemconfigure(box, outline=color)
+        self.canvas.itemconfigure(status, text=text, fill=color)
+
+    def _tick(self):
+        """Refresh the timers of running steps until the workflow is done"""
+        if not self.winfo_exists():
+            return
+        for step in self.workflow.steps.values():
+            if step.status == "running":
+                self._update_node(step, record=False)
+        steps = self.workflow.steps.values()
+        finished = sum(1 for step in steps if step.status in ("ok", "failed", "skipped", "cancelled"))
+        failed = sum(1 for step in steps if step.status == "failed")
+        self.summary_label.configure(
+            text=f"{finished}/{len(self.workflow.steps)} steps finished, {failed} failed. Logs: {self.work_dir}"
+        )
+        if self.runner.done.is_set():
+            self.cancel_button.configure(state="disabled")
+            return
+        self.after(500, self._tick)
+
+    def _on_close(self):
+        if self.runner is not None and not self.runner.done.is_set():
+            self.runner.cancel()
+        self.destroy()
+
+
+class HistoryWindow(ctk.CTkToplevel):
+    """Filterable run history with durations compared to earlier runs"""
+
+    ALL = "All"
+    MAX_ROWS = 200
+
+    def __init__(self, app, history, script_name=None):
+        super().__init__(app)
+        self.app = app
+        self.history = history
+        self.runs = []
+
+        self.title("Run History")
+        self.geometry("980x720")
+
+        # Filters
+        filter_frame = ctk.CTkFrame(self, fg_color="transparent")
+        filter_frame.pack(pady=(15, 5))
+        ctk.CTkLabel(filter_frame, text="Script:", font=("Segoe UI", 12)).pack(side="left", padx=5)
+        scripts = history.scripts()
+        self.script_menu = ctk.CTkOptionMenu(filter_frame, values=[self.ALL] + scripts, width=220,
+                                             command=lambda _: self.refresh())
+        self.script_menu.set(script_name if script_name in scripts else self.ALL)
+        self.script_menu.pack(side="left", padx=5)
+        ctk.CTkLabel(filter_frame, text="Status:", font=("Segoe UI", 12)).pack(side="left", padx=5)
+        self.status_menu = ctk.CTkOptionMenu(filter_frame, values=[self.ALL] + list(STATUSES), width=110,
+                                             command=lambda _: self.refresh())
+        self.status_menu.set(self.ALL)
+        self.status_menu.pack(side="left", padx=5)
+        self.search_entry = ctk.CTkEntry(filter_frame, width=220,
+                                         placeholder_text="Env, command or config contains...")
+        self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind("<Return>", lambda e: self.refresh())
+        ctk.CTkButton(filter_frame, text="Filter", width=70, command=self.refresh).pack(side="left", padx=5)
+
+        self.table = ctk.CTkScrollableFrame(self, width=940, height=400)
+        self.table.pack(pady=5, padx=15, fill="both", expand=True)
+        self.table.grid_columnconfigure(1, weight=1)
+
+        self.summary_label = ctk.CTkLabel(self, text="", font=("Segoe UI", 11))
+        self.summary_label.pack(pady=(5, 0))
+
+        # Details of the selected run
+        self.details = ctk.CTkTextbox(self, height=160, font=("Consolas", 11), wrap="word")
+        self.details.pack(pady=(5, 15), padx=15, fill="x")
+        self.details.insert("1.0", "Click a run to see its command, config snapshot and log.")
+        self.details.configure(state="disabled")
+
+        self.refresh()
+
+    def refresh(self):
+        script = self.script_menu.get()
+        status = self.status_menu.get()
+        runs = self.history.query(
+            script=None if script == self.ALL else script,
+            status=None if status == self.ALL else status,
+            text=self.search_entry.get().strip() or None,
+            limit=self.MAX_ROWS,
+        )
+        self.runs = self.history.compare_durations(runs)
+
+        for widget in self.table.winfo_children():
+            widget.destroy()
+        headings = ["Started", "Script", "Env", "Status", "Exit", "Duration", "vs. median", "Peak RSS"]
+        for column, heading in enumerate(headings):
+            ctk.CTkLabel(self.table, text=heading, font=("Segoe UI", 12, "bold")).grid(
+                row=0, column=column, padx=6, pady=4, sticky="w")
+
+        slower = 0
+        for row, run in enumerate(self.runs, start=1):
+            change = run["change"]
+            if change is None:
+                change_text, change_color = "", None
+            else:
+                change_text = f"{change:+.0%}"
+                change_color = ("#D32F2F", "#E57373") if change > SLOWER_THRESHOLD else None
+                slower += change > SLOWER_THRESHOLD
+            started = datetime.fromtimestamp(run["started"]).strftime("%Y-%m-%d %H:%M:%S") if run["started"] else ""
+            cells = [
+                started,
+                run["script"] if run["kind"] == "run" else f"{run['script']} ({run['kind']})",
+                run["conda_env"] or "",
+                run["status"] or "",
+                "" if run["exit_code"] is None else str(run["exit_code"]),
+                "" if run["wall_seconds"] is None else f"{run['wall_seconds']:.1f} s",
+                change_text,
+                "" if not run["peak_rss_bytes"] else format_bytes(run["peak_rss_bytes"]),
+            ]
+            for column, text in enumerate(cells):
+                label = ctk.CTkLabel(self.table, text=text, font=("Segoe UI", 11), anchor="w")
+                if column == 6 and change_color:
+                    label.configure(text_color=change_color)
+                label.grid(row=row, column=column, padx=6, pady=1, sticky="w")
+                label.bind("<Button-1>", lambda e, r=run: self._show_details(r))
+
+        summary = f"{len(self.runs)} runs"
+        if len(self.runs) == self.MAX_ROWS:
+            summary += f" (most recent {self.MAX_ROWS})"
+        if slower:
+            summary += f", {slower} more than {SLOWER_THRESHOLD:.0%} slower than the median of earlier runs"
+        self.summary_label.configure(text=summary)
+
+    def _show_details(self, run):
+        text = f"Run: {run['run_id'] or run['id']}\n"
+        text += f"Command: {run['command'] or 'Unknown'}\n"
+        text += f"Script hash: {run['script_hash'] or 'Unknown'}\n"
+        if run["baseline_seconds"] is not None:
+            text += f"Median of earlier runs: {run['baseline_seconds']:.1f} s\n"
+        if run["cpu_seconds"] is not None:
+            text += f"CPU time: {run['cpu_seconds']:.1f} s\n"
+        if run["read_bytes"] is not None:
+            text += f"I/O: read {format_bytes(run['read_bytes'])}, written {format_bytes(run['write_bytes'] or 0)}\n"
+        text += f"Log: {run['log_path'] or 'None'}\n"
+        text += "\nConfig:\n"
+        config = json.loads(run["config"]) if run["config"] else {}
+        for key, value in config.items():
+            text += f"  {key}: {value}\n"
+        self.details.configure(state="normal")
+        self.details.delete("1.0", "end")
+        self.details.insert("1.0", text)
+        self.details.configure(state="disabled")
+
+
+class ProfileWindow(ctk.CTkToplevel):
+    """Top functions of a profiled run"""
+
+    def __init__(self, app, summary, profile_path):
+        super().__init__(app)
+        self.title(f"Profile: {Path(summary['script']).name}")
+        self.geometry("900x650")
+
+        mode = {"cprofile": "cProfile", "sample": "Sampling", "memory": "Memory"}[summary["mode"]]
+        title_label = ctk.CTkLabel(self, text=f"{mode} profile of {Path(summary['script']).name}",
+                                   font=("Segoe UI", 16, "bold"))
+        title_label.pack(pady=(15, 5))
+        details = f"Wall time {summary['wall_seconds']:.1f} s, exit code {summary['exit_code']}"
+        if summary["mode"] == "memory":
+            details += (f", traced peak {format_bytes(summary['peak_bytes'])}, "
+                        f"snapshot every {summary['snapshot_interval']:g} s")
+            files = summary["snapshot_dir"]
+            tab_texts = (("Top allocation sites", format_memory_sites(summary)),
+                         ("Growth between snapshots", format_memory_growth(summary)))
+        else:
+            if summary["samples"] is not None:
+                details += f", {summary['samples']} samples every {summary['interval'] * 1000:.0f} ms"
+            files = summary["profile_file"] or f"{profile_path}.json"
+            tab_texts = (("By cumulative time", format_table(summary["by_cumulative"], summary["mode"])),
+                         ("By own time", format_table(summary["by_tottime"], summary["mode"])))
+        ctk.CTkLabel(self, text=details, font=("Segoe UI", 12)).pack()
+        ctk.CTkLabel(self, text=f"Saved: {files}", font=("Segoe UI", 10), wraplength=850).pack(pady=(0, 5))
+
+        tabs = ctk.CTkTabview(self)
+        tabs.pack(padx=15, pady=(5, 15), fill="both", expand=True)
+        for tab_name, text in tab_texts:
+            textbox = ctk.CTkTextbox(tabs.add(tab_name), font=("Consolas", 11), wrap="none")
+            textbox.pack(fill="both", expand=True)
+            textbox.insert("1.0", text)
+            textbox.configure(state="disabled")
+
+
+class ExecProfileEditor(ctk.CTkToplevel):
+    """Create, edit and delete execution profiles"""
+
+    FIELDS = (
+        ("threads", "Threads (OMP/MKL/OpenBLAS)"),
+        ("cpu_affinity", "CPU affinity (e.g. 0-3,6)"),
+        ("nice", "Nice / lower priority"),
+        ("memory_mb", "Memory limit (MB)"),
+        ("open_files", "Open files limit (POSIX)"),
+        ("cpu_seconds", "CPU time limit (s, POSIX)"),
+    )
+
+    def __init__(self, app, store):
+        super().__init__(app)
+        self.app = app
+        self.store = store
+        self.title("Execution Profiles")
+        self.geometry("560x680")
+
+        top_frame = ctk.CTkFrame(self, fg_color="transparent")
+        top_frame.pack(pady=(15, 10))
+        self.profile_menu = ctk.CTkOptionMenu(top_frame, values=store.names() or [""], width=220,
+                                              command=self._load_profile)
+        self.profile_menu.pack(side="left", padx=5)
+        ctk.CTkButton(top_frame, text="New", width=70, command=self._new_profile).pack(side="left", padx=5)
+        ctk.CTkButton(top_frame, text="Delete", width=70, command=self._delete_profile,
+                      fg_color=["#D32F2F", "#B71C1C"], hover_color=["#F44336", "#D32F2F"]).pack(side="left", padx=5)
+
+        form = ctk.CTkFrame(self, fg_color="transparent")
+        form.pack(padx=15, fill="x")
+        form.grid_columnconfigure(1, weight=1)
+        self.entries = {}
+        for row, (key, label) in enumerate(self.FIELDS):
+            ctk.CTkLabel(form, text=label, font=("Segoe UI", 12)).grid(row=row, column=0, padx=5, pady=4, sticky="w")
+            entry = ctk.CTkEntry(form, width=220)
+            entry.grid(row=row, column=1, padx=5, pady=4, sticky="ew")
+            self.entries[key] = entry
+
+        ctk.CTkLabel(self, text="Environment variables (NAME=value, one per line):",
+                     font=("Segoe UI", 12)).pack(pady=(10, 2))
+        self.env_textbox = ctk.CTkTextbox(self, height=160, font=("Consolas", 12))
+        self.env_textbox.pack(padx=15, fill="x")
+
+        self.status_label = ctk.CTkLabel(self, text="", font=("Segoe UI", 11), wraplength=520)
+        self.status_label.pack(pady=5)
+        ctk.CTkButton(self, text="Save Profile", width=200, height=40, command=self._save_profile,
+                      font=("Segoe UI", 13, "bold")).pack(pady=(5, 15))
+
+        if store.names():
+            self._load_profile(store.names()[0])
+
+    def _load_profile(self, name):
+        profile = self.store.get(name)
+        if profile is None:
+            return
+        self.profile_menu.set(name)
+        values = {
+            "threads": profile.threads,
+            "cpu_affinity": format_cpu_list(profile.cpu_affinity),
+            "nice": profile.nice,
+        }
+        values.update(profile.limits)
+        for key, entry in self.entries.items():
+            entry.delete(0, "end")
+            value = values.get(key)
+            if value not in (None, ""):
+                entry.insert(0, str(value))
+        self.env_textbox.delete("1.0", "end")
+        self.env_textbox.insert("1.0", "\n".join(f"{k}={v}" for k, v in profile.env.items()))
+        self.status_label.configure(text="")
+
+    def _new_profile(self):
+        dialog = ctk.CTkInputDialog(text="Name of the new profile:", title="New Execution Profile")
+        name = (dialog.get_input() or "").strip()
+        if not name:
+            return
+        if self.store.get(name) is None:
+            self.store.put(ExecProfile(name))
+        self.profile_menu.configure(values=self.store.names())
+        self._load_profile(name)
+        self.app._exec_profiles_changed()
+
+    def _delete_profile(self):
+        name = self.profile_menu.get()
+        if self.store.get(name) is None:
+            return
+        self.store.delete(name)
+        names = self.store.names()
+        self.profile_menu.configure(values=names or [""])
+        if names:
+            self._load_profile(names[0])
+        else:
+            self.profile_menu.set("")
+        self.app._exec_profiles_changed()
+
+    def _save_profile(self):
+        name = self.profile_menu.get()
+        if not name:
+            self.status_label.configure(text="Create a profile first.")
+            return
+        env = {}
+        for line in self.env_textbox.get("1.0", "end").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "=" not in line:
+                self.status_label.configure(text=f"'{line}' is not NAME=value")
+                return
+            key, value = line.split("=", 1)
+            env[key.strip()] = value.strip()
+        values = {key: entry.get().strip() for key, entry in self.entries.items()}
+        try:
+            profile = ExecProfile.from_dict(name, {
+                "env": env,
+                "threads": values["threads"],
+                "cpu_affinity": values["cpu_affinity"],
+                "nice": values["nice"],
+                "limits": {key: values[key] for key in ("memory_mb", "open_files", "cpu_seconds")},
+            })
+            self.store.put(profile)
+        except (ExecProfileError, OSError) as e:
+            self.status_label.configure(text=f"Not saved: {e}")
+            return
+        self.status_label.configure(text=f"Saved {name}: {profile.describe()}")
+        self.app._exec_profiles_changed()
 
 
 class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
     def __init__(self):
         super().__init__()
+        STARTUP.checkpoint("Tk root window")
 
         self.title("Drag and Drop File Path")
         self.geometry("700x1120")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        self.settings = load_settings()
+
+        # Warm interpreters per conda environment (POSIX only)
+        self.worker_pool = None
+        if self.settings["worker_pool"]["enabled"] and worker_pool.available():
+            self.worker_pool = WorkerPool.from_settings(self.settings)
+
+        # SQLite history of every run
+        try:
+            self.run_history = RunHistory(state_dir(self.settings) / "history.db")
+        except sqlite3.Error as e:
+            print(f"Run history unavailable: {e}")
+            self.run_history = None
+
+        # Named env vars / affinity / priority / limits, attached per script
+        self.exec_profiles = ExecProfileStore()
+
+        # Records of completed runs, used to skip unchanged reruns
+        self.run_cache = RunCache.from_settings(self.settings, state_dir(self.settings, "run_cache"))
+
+        # Local copies of network-share inputs, created on first use
+        self.staging_cache = None
+
+        # Background checks of paths in the config fields
+        self.path_checker = PathChecker(self.settings["path_check"]["max_entries"])
+
+        # Shared job server on the processing workstation, if configured
+        server_url = self.settings["job_server"]["url"]
+        self.job_client = JobClient(server_url) if server_url else None
+
+        # Event-loop latency log, off unless LAUNCHER_LATENCY is set or Ctrl+Shift+L is pressed
+        self.latency_monitor = None
+        self.bind_all("<Control-Shift-L>", lambda e: self.toggle_latency_monitor())
 
         # Font configuration
         self.label_font = ("Segoe UI", 14)
@@ -40,12 +818,9 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         logo_path = Path(__file__).parent / "img" / "logo-nv5-white-no-tagline.png"
         if logo_path.exists():
             try:
-                logo_image = Image.open(logo_path)
                 # Resize logo to fit title (height ~40 pixels)
-                aspect_ratio = logo_image.width / logo_image.height
-                new_height = 40
-                new_width = int(new_height * aspect_ratio)
-                logo_image = logo_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                logo_image = self._load_logo(logo_path, 40)
+                new_width, new_height = logo_image.size
                 logo_ctk = ctk.CTkImage(light_image=logo_image, dark_image=logo_image, size=(new_width, new_height))
                 
                 logo_label = ctk.CTkLabel(title_frame, image=logo_ctk, text="")
@@ -59,14 +834,20 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             font=self.title_font
         )
         title_label.pack(side="left")
+        STARTUP.checkpoint("title and logo")
 
         # Script selector dropdown at top
         self.script_label = ctk.CTkLabel(self.main_frame, text="Select Script:", font=self.label_font)
         self.script_label.pack(pady=(10, 5))
         
-        # Get all Python files in the current directory
-        script_dir = Path(__file__).parent
-        python_files = [f.name for f in script_dir.glob('*.py') if f.name != 'drag_drop.py']
+        # Get all Python files in the configured script directories
+        self.script_registry = ScriptRegistry.from_settings(
+            self.settings, Path(__file__).parent,
+            cache_file=state_dir(self.settings, "cache") / "script_index.json"
+        )
+        self.script_registry.refresh()
+        python_files = self.script_registry.names()
+        STARTUP.checkpoint("script list")
         
         self.script_dropdown = ctk.CTkComboBox(
             self.main_frame,
@@ -84,34 +865,119 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         self.env_label = ctk.CTkLabel(self.main_frame, text="Conda Environment:", font=self.label_font)
         self.env_label.pack(pady=(10, 5))
         
-        # Get conda environments
-        conda_envs = self.get_conda_environments()
-        
+        # Conda environments are discovered in the background once the
+        # window is up (see _load_conda_environments)
+        self.conda_env_prefixes = {}
         self.env_dropdown = ctk.CTkComboBox(
             self.main_frame,
-            values=conda_envs if conda_envs else ["No conda environments found"],
+            values=["Loading environments..."],
             width=400,
             height=40,
+            command=self.on_env_selected,
             font=self.entry_font
         )
-        if conda_envs:
-            # Try to set to 'base' or first environment
-            if 'base' in conda_envs:
-                self.env_dropdown.set('base')
-            else:
-                self.env_dropdown.set(conda_envs[0])
+        self.env_dropdown.set("Loading environments...")
         self.env_dropdown.pack(pady=5)
 
-        # View documentation button
-        self.doc_button = ctk.CTkButton(
+        # Warm worker toggle (only offered where workers can fork)
+        self.warm_worker_var = ctk.BooleanVar(value=self.worker_pool is not None)
+        if self.worker_pool is not None:
+            self.warm_worker_checkbox = ctk.CTkCheckBox(
+                self.main_frame,
+                text="Use warm worker (skip conda startup)",
+                variable=self.warm_worker_var,
+                font=self.entry_font
+            )
+            self.warm_worker_checkbox.pack(pady=5)
+
+        # Run even if an identical run is in the run cache
+        self.force_rerun_var = ctk.BooleanVar(value=False)
+        if self.run_cache is not None:
+            self.force_rerun_checkbox = ctk.CTkCheckBox(
+                self.main_frame,
+                text="Force rerun (ignore cached results)",
+                variable=self.force_rerun_var,
+                font=self.entry_font
+            )
+            self.force_rerun_checkbox.pack(pady=5)
+
+        # Copy declared inputs to local disk for the run
+        self.stage_inputs_var = ctk.BooleanVar(value=self.settings["staging"]["enabled"])
+        self.stage_inputs_checkbox = ctk.CTkCheckBox(
             self.main_frame,
+            text="Stage inputs on local disk",
+            variable=self.stage_inputs_var,
+            font=self.entry_font
+        )
+        self.stage_inputs_checkbox.pack(pady=5)
+
+        # Queue runs on the shared job server instead of starting them here
+        self.job_server_var = ctk.BooleanVar(value=self.job_client is not None)
+        if self.job_client is not None:
+            self.job_server_checkbox = ctk.CTkCheckBox(
+                self.main_frame,
+                text=f"Run on job server ({self.job_client.url})",
+                variable=self.job_server_var,
+                font=self.entry_font
+            )
+            self.job_server_checkbox.pack(pady=5)
+
+        # Profiler for the next run
+        profile_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        profile_frame.pack(pady=5)
+        ctk.CTkLabel(profile_frame, text="Run with profiler:", font=self.entry_font).pack(side="left", padx=5)
+        self.profile_menu = ctk.CTkOptionMenu(
+            profile_frame,
+            values=list(PROFILE_MODES),
+            width=200,
+            font=self.entry_font
+        )
+        self.profile_menu.set("Off")
+        self.profile_menu.pack(side="left", padx=5)
+
+        # Execution profile attached to the selected script
+        exec_profile_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        exec_profile_frame.pack(pady=5)
+        ctk.CTkLabel(exec_profile_frame, text="Execution profile:", font=self.entry_font).pack(side="left", padx=5)
+        self.exec_profile_menu = ctk.CTkOptionMenu(
+            exec_profile_frame,
+            values=[NO_EXEC_PROFILE] + self.exec_profiles.names(),
+            command=self.on_exec_profile_selected,
+            width=200,
+            font=self.entry_font
+        )
+        self.exec_profile_menu.set(NO_EXEC_PROFILE)
+        self.exec_profile_menu.pack(side="left", padx=5)
+        self.exec_profile_edit_button = ctk.CTkButton(
+            exec_profile_frame,
+            text="Edit...",
+            command=self.show_exec_profile_editor,
+            width=80,
+            font=self.entry_font
+        )
+        self.exec_profile_edit_button.pack(side="left", padx=5)
+
+        # View documentation and run history buttons
+        info_button_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        info_button_frame.pack(pady=10)
+        self.doc_button = ctk.CTkButton(
+            info_button_frame,
             text="📄 View Documentation",
             command=self.show_documentation_window,
             width=200,
             height=35,
             font=self.entry_font
         )
-        self.doc_button.pack(pady=10)
+        self.doc_button.pack(side="left", padx=5)
+        self.history_button = ctk.CTkButton(
+            info_button_frame,
+            text="📜 Run History",
+            command=self.show_history_window,
+            width=200,
+            height=35,
+            font=self.entry_font
+        )
+        self.history_button.pack(side="left", padx=5)
 
         # Scrollable frame for dynamic fields
         self.scroll_frame = ctk.CTkScrollableFrame(
@@ -123,9 +989,18 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
 
         # Dictionary to store field widgets
         self.field_entries = {}
+
+        # Built forms per config file, most recently used last
+        self.config_forms = {}
+        self.current_form = None
         
         # Current config file (determined by script selection)
         self.current_config_file = None
+        self.current_config_path = None
+
+        # Typed in-memory config models, reloaded when files change on disk
+        self.config_stores = ConfigStoreManager()
+        self.current_store = None
         
         # Script execution state
         self.script_is_running = False
@@ -156,6 +1031,28 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         )
         self.clear_button.pack(side="left", padx=5)
 
+        # Sweep button: runs the script once per value of list/range/glob fields
+        self.sweep_button = ctk.CTkButton(
+            button_frame,
+            text="Sweep",
+            command=self.run_sweep,
+            width=100,
+            height=40,
+            font=self.button_font
+        )
+        self.sweep_button.pack(side="left", padx=5)
+
+        # Workflow button: runs a chain of scripts from a workflow file
+        self.workflow_button = ctk.CTkButton(
+            button_frame,
+            text="Workflow",
+            command=self.run_workflow,
+            width=100,
+            height=40,
+            font=self.button_font
+        )
+        self.workflow_button.pack(side="left", padx=5)
+
         # Run/Stop button frame
         run_button_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         run_button_frame.pack(pady=10)
@@ -184,9 +1081,19 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         )
         # Don't pack initially - will show when script runs
 
+        # Progress bar fed by percentages found on redrawn output lines
+        self.progress_bar = ctk.CTkProgressBar(run_button_frame, width=150)
+        self.progress_bar.set(0)
+        self.progress_label = ctk.CTkLabel(run_button_frame, text="", width=45, font=self.entry_font)
+        # Don't pack initially - will show when script reports progress
+
         # Output section label
         self.output_label = ctk.CTkLabel(self.main_frame, text="Script Output:", font=self.label_font)
         self.output_label.pack(pady=(10, 5))
+
+        # Live CPU / memory / I/O of the running script's process tree
+        self.resource_label = ctk.CTkLabel(self.main_frame, text="", font=("Segoe UI", 11))
+        self.resource_label.pack(pady=(0, 5))
         
         self.output_textbox = ctk.CTkTextbox(
             self.main_frame,
@@ -195,6 +1102,13 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             font=self.entry_font
         )
         self.output_textbox.pack(pady=(5, 5))
+
+        # Script output is interpreted like a terminal ('\r', ANSI erase) and
+        # drawn on a timer; the "live" mark is where the unfinished line starts
+        self.output_buffer = TerminalBuffer()
+        self.output_pump_scheduled = False
+        self.live_output_line = ""
+        self._init_live_mark(self.output_textbox)
         
         # Expand button below output box
         self.expand_output_button = ctk.CTkButton(
@@ -238,46 +1152,143 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         self.random_img_button.bind("<Enter>", self._show_random_button)
         self.random_img_button.bind("<Leave>", self._hide_random_button)
 
-        # Load initial config based on first script (after all widgets created)
-        if python_files:
-            self.on_script_selected(python_files[0])
+        STARTUP.checkpoint("widgets")
+
+        # Everything else waits until the first frame is on screen
+        self.initial_script = python_files[0] if python_files else None
+        self.first_map_binding = self.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, event):
+        """Schedule deferred start-up work once the main window is mapped"""
+        if event.widget is not self:
+            return
+        # Remove only the start-up hook, not other <Map> bindings of the root.
+        # unbind(sequence, funcid) drops them all before Python 3.13.
+        script = self.bind("<Map>")
+        kept = "\n".join(line for line in script.split("\n") if self.first_map_binding not in line)
+        self.tk.call("bind", self._w, "<Map>", kept)
+        self.deletecommand(self.first_map_binding)
+        self.after_idle(self._after_first_paint)
+
+    def _after_first_paint(self):
+        """Start-up work that is not needed for the first frame"""
+        self.update_idletasks()
+        STARTUP.checkpoint("first frame")
+
+        if latency.enabled_by_env():
+            self.toggle_latency_monitor()
+
+        # Load initial config based on first script
+        if self.initial_script:
+            self.on_script_selected(self.initial_script)
+        STARTUP.checkpoint("initial config")
+
+        # Environment discovery runs in the background
+        self._load_conda_environments()
+
+        self.config_stores.start_watching(
+            self.settings["configs"]["watch_seconds"],
+            lambda store: self.after(0, self._on_config_changed_on_disk, store)
+        )
+
+        # Pick up new and edited scripts without a restart
+        self.script_registry.start_watching(
+            self.settings["scripts"]["poll_seconds"],
+            lambda names: self.after(0, self._on_scripts_changed, names)
+        )
+
+    def _on_scripts_changed(self, python_files):
+        """Update the script dropdown after the registry saw a change"""
+        self.script_dropdown.configure(values=python_files if python_files else ["No scripts found"])
+        current = self.script_dropdown.get()
+        if current not in python_files and not self.script_is_running:
+            if python_files:
+                self.script_dropdown.set(python_files[0])
+                self.on_script_selected(python_files[0])
+            else:
+                self.script_dropdown.set("No scripts found")
+
+    def _load_logo(self, logo_path, height):
+        """Return the logo resized to height, cached on disk to skip resampling"""
+        cache_dir = state_dir(self.settings, "cache")
+        cache_path = cache_dir / f"{logo_path.stem}-{height}px-{logo_path.stat().st_mtime_ns}.png"
+        if cache_path.exists():
+            return Image.open(cache_path)
+        logo_image = Image.open(logo_path)
+        aspect_ratio = logo_image.width / logo_image.height
+        new_width = int(height * aspect_ratio)
+        logo_image = logo_image.resize((new_width, height), Image.Resampling.LANCZOS)
+        logo_image.save(cache_path)
+        return logo_image
 
     def get_conda_environments(self):
         """Get list of available conda environments"""
+        cache_file = state_dir(self.settings) / "conda_envs.json"
+        envs = discover_environments(cache_file)
+        self.conda_env_prefixes = dict(envs)
+        return [name for name, _ in envs]
+
+    def _load_conda_environments(self):
+        """Discover conda environments without blocking the window"""
+        def worker():
+            try:
+                conda_envs = self.get_conda_environments()
+            except Exception as e:
+                print(f"Error getting conda environments: {e}")
+                conda_envs = []
+            self.after(0, self._set_conda_environments, conda_envs)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _set_conda_environments(self, conda_envs):
+        """Fill the environment dropdown once discovery has finished"""
+        self.env_dropdown.configure(values=conda_envs if conda_envs else ["No conda environments found"])
+        if conda_envs:
+            self.env_dropdown.set(default_environment(conda_envs))
+        else:
+            self.env_dropdown.set("No conda environments found")
+        self.on_env_selected(self.env_dropdown.get())
+
+        # Environment discovery is the last piece of start-up work
+        if "conda environments" not in STARTUP.marks:
+            STARTUP.mark("conda environments")
+            if STARTUP.enabled:
+                print(STARTUP.report())
+
+    def on_env_selected(self, env_name):
+        """Start the warm worker for the selected environment in the background"""
+        if self.worker_pool is None or not self.warm_worker_var.get():
+            return
+        if env_name == "No conda environments found":
+            env_name = None
+        threading.Thread(target=self._warm_up_worker, args=(env_name,), daemon=True).start()
+
+    def _warm_up_worker(self, env_name):
         try:
-            # Try different conda commands for Windows
-            conda_commands = ['conda', 'conda.exe']
-            
-            for conda_cmd in conda_commands:
-                try:
-                    result = subprocess.run(
-                        [conda_cmd, 'env', 'list'],
-                        capture_output=True,
-                        text=True,
-                        timeout=10,
-                        shell=True  # Use shell on Windows
-                    )
-                    
-                    if result.returncode == 0:
-                        envs = []
-                        for line in result.stdout.split('\n'):
-                            # Skip comments and empty lines
-                            if line.strip() and not line.startswith('#'):
-                                # Extract environment name (first word)
-                                parts = line.split()
-                                if parts:
-                                    env_name = parts[0]
-                                    if env_name and env_name != 'conda':
-                                        envs.append(env_name)
-                        if envs:
-                            return envs
-                except FileNotFoundError:
-                    continue
-                    
-        except Exception as e:
-            print(f"Error getting conda environments: {e}")
-        
-        return []
+            self.worker_pool.warm_up(env_name)
+        except (WorkerError, OSError) as e:
+            print(f"Could not start warm worker for {env_name}: {e}")
+
+    def _on_close(self):
+        """Stop background workers before closing the window"""
+        self.script_registry.stop()
+        self.config_stores.stop()
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+        if self.latency_monitor is not None and self.latency_monitor.running:
+            print(self.latency_monitor.stop())
+        self.destroy()
+
+    def toggle_latency_monitor(self):
+        """Start or stop the event-loop latency log"""
+        monitor = self.latency_monitor
+        if monitor is not None and monitor.running:
+            print(monitor.stop())
+            self._update_output(f"\nLatency log written to {monitor.log_path}\n")
+            return
+        log_path = state_dir(self.settings, "latency") / f"latency_{datetime.now():%Y%m%d_%H%M%S}.log"
+        self.latency_monitor = LatencyMonitor.from_settings(self.settings, log_path)
+        self.latency_monitor.start(self)
+        print(f"Latency monitor on, logging to {log_path} (Ctrl+Shift+L to stop)")
 
     def open_random_image(self):
         """Open a random image from the img/pets folder"""
@@ -321,26 +1332,20 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         )
     
     def get_script_docstring(self, script_name):
-        """Extract the module-level docstring from a Python script"""
-        script_path = Path(__file__).parent / script_name
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Try to extract docstring using ast module for reliable parsing
-            import ast
-            try:
-                tree = ast.parse(content)
-                docstring = ast.get_docstring(tree)
-                if docstring:
-                    return docstring.strip()
-            except:
-                pass
-            
-            return "No documentation available for this script."
-        except Exception as e:
-            return f"Error reading script documentation: {e}"
+        """Return the module-level docstring of a script from the registry"""
+        info = self.script_registry.get(script_name)
+        if info is None:
+            return f"Error reading script documentation: {script_name} not found"
+        return info.docstring
+
+    def _script_path(self, script_name):
+        """Full path of a script listed in the dropdown"""
+        info = self.script_registry.get(script_name)
+        if info is None:
+            return Path(__file__).parent / script_name
+        return info.path
 
+    @instrumented()
     def show_documentation_window(self):
         """Display script documentation in an overlay within the main window"""
         script_name = self.script_dropdown.get()
@@ -411,6 +1416,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             self.doc_overlay.destroy()
             del self.doc_overlay
     
+    @instrumented()
     def show_expanded_output(self):
         """Show output in an expanded pop-out window"""
         output_content = self.output_textbox.get("1.0", "end-1c")
@@ -453,6 +1459,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         )
         output_textbox.pack(pady=10, padx=20)
         output_textbox.insert("1.0", output_content)
+        self._init_live_mark(output_textbox, len(self.live_output_line))
         
         # Store reference to expanded textbox for live updates
         self.expanded_output_textbox = output_textbox
@@ -494,6 +1501,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         if hasattr(self, 'expanded_output_textbox'):
             del self.expanded_output_textbox
     
+    @instrumented()
     def _copy_expanded_output(self):
         """Copy the expanded output to clipboard"""
         if hasattr(self, 'current_expanded_output'):
@@ -504,11 +1512,9 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
 
     def get_config_filename(self, script_name):
         """Determine config filename from script name"""
-        # Remove .py extension and add _config.yml
-        base_name = script_name.rsplit('.py', 1)[0]
-        config_filename = f"{base_name}_config.yml"
-        return config_filename
+        return config_filename_for(script_name)
 
+    @instrumented()
     def on_script_selected(self, script_name):
         """Handle script selection - load corresponding config and update button"""
         # Update button text if button exists
@@ -517,80 +1523,173 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         
         # Determine config file
         config_filename = self.get_config_filename(script_name)
-        config_path = Path(__file__).parent / config_filename
+        config_path = self._script_path(script_name).parent / config_filename
         
         # Create config file if it doesn't exist
+        info = self.script_registry.get(script_name)
+        schema = info.schema if info is not None else None
         if not config_path.exists():
-            default_data = {'folder': None, 'model_path': None, 'out_dir': None}
+            if schema:
+                default_data = schema_defaults(schema)
+            else:
+                default_data = {'folder': None, 'model_path': None, 'out_dir': None}
             with open(config_path, 'w') as f:
                 yaml.dump(default_data, f, default_flow_style=False)
         
+        # Show the execution profile attached to the script
+        attached = self.exec_profiles.scripts.get(script_name)
+        self.exec_profile_menu.set(attached if attached in self.exec_profiles.profiles else NO_EXEC_PROFILE)
+
         # Store current config file
         self.current_config_file = config_filename
+        self.current_config_path = config_path
+        self.current_store = self.config_stores.get(config_path, schema)
         
         # Load the config
         self.load_config_and_rebuild(config_filename)
 
     def load_config_and_rebuild(self, config_filename):
-        """Load config file and rebuild the drag/drop fields dynamically"""
-        config_path = Path(__file__).parent / config_filename
-        
-        # Clear existing fields
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-        self.field_entries.clear()
-        
-        # Load config
-        try:
-            with open(config_path, 'r') as f:
-                config_data = yaml.safe_load(f) or {}
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            config_data = {}
-        
-        # Create fields dynamically based on config keys
-        for key, value in config_data.items():
-            # Create label
-            label = ctk.CTkLabel(self.scroll_frame, text=f"{key.replace('_', ' ').title()}:", font=self.label_font)
-            label.pack(pady=(10, 5))
-            
-            # Create entry
-            entry = ctk.CTkEntry(
-                self.scroll_frame,
-                placeholder_text=f"Drag {key} here",
-                height=40,
-                font=self.entry_font
-            )
-            entry.pack(pady=5, fill="x", padx=10)
-            
-            # Set existing value if any
-            if value:
-                entry.insert(0, str(value))
-            
-            # Enable drag and drop
-            entry.drop_target_register(DND_FILES)
-            entry.dnd_bind("<<Drop>>", lambda e, k=key: self.drop(e, k))
-            
-            # Bind change detection to reset save button color
-            entry.bind("<KeyRelease>", self._on_field_change)
-            
-            # Store reference
-            self.field_entries[key] = entry
+        """Show the fields of a config, reusing a cached form if built"""
+        config_path = self.current_config_path.parent / config_filename
+        
+        # Values come from the in-memory store, including unsaved edits
+        store = self.config_stores.get(config_path)
+        config_data = {key: format_value(value) for key, value in store.values.items()}
+        
+        # Reuse the form built for this config, or build one
+        form = self.config_forms.pop(config_path, None)
+        if form is None:
+            form = ConfigForm(self, self.scroll_frame)
+        self.config_forms[config_path] = form
+        form.update(config_data)
+        for row in form.rows.values():
+            self._check_field_path(row)
+
+        # Swap the visible form
+        if form is not self.current_form:
+            if self.current_form is not None:
+                self.current_form.frame.pack_forget()
+            form.frame.pack(fill="x")
+            self.current_form = form
+        self.field_entries = form.entries
+
+        # Drop the least recently used forms
+        while len(self.config_forms) > FORM_CACHE_SIZE:
+            oldest = next(iter(self.config_forms))
+            self.config_forms.pop(oldest).destroy()
 
     def drop(self, event, field_name):
-        file_path = event.data.strip("{}")  # handles spaces in paths
-        
-        if field_name in self.field_entries:
-            entry = self.field_entries[field_name]
-            entry.delete(0, "end")
-            entry.insert(0, file_path)
-            print(f"{field_name}:", file_path)
-            # Reset save button color when field changes
-            self._reset_save_button_color()
+        # Tcl list: paths with spaces come wrapped in braces
+        paths = list(self.tk.splitlist(event.data))
+        if not paths or field_name not in self.field_entries:
+            return
+
+        # Several tiles, or tiles dropped on tile_list, become a tile list.
+        # Decided by name only: a stat could hang on a slow share
+        tiles = [p for p in paths if p.lower().endswith(TIF_SUFFIXES)]
+        if TILE_LIST_KEY in self.field_entries and tiles and (len(paths) > 1 or field_name == TILE_LIST_KEY):
+            self._drop_tile_list(tiles, len(paths) - len(tiles))
+            return
+        if len(paths) > 1:
+            self._update_output(f"\n{len(paths)} files dropped on {field_name}, which takes one path; "
+                                f"using {paths[0]}. Configs with a {TILE_LIST_KEY} key accept several tiles.\n")
+
+        file_path = paths[0]
+        entry = self.field_entries[field_name]
+        entry.delete(0, "end")
+        entry.insert(0, file_path)
+        print(f"{field_name}:", file_path)
+        self._on_field_change(field_name=field_name)
+
+    def _drop_tile_list(self, paths, skipped=0):
+        """Save dropped tiles as the config's tile list sidecar and reference it"""
+        try:
+            list_path = sidecar_path(self.current_config_path)
+            count = write_tile_list(paths, list_path)
+        except (OSError, ValueError) as e:
+            self._update_output(f"\nError saving tile list: {e}\n")
+            return
+        entry = self.field_entries[TILE_LIST_KEY]
+        entry.delete(0, "end")
+        entry.insert(0, str(list_path).replace("\\", "/"))
+        message = f"\nTile list with {count} tiles saved to tile_lists/{list_path.name}"
+        if skipped:
+            message += f" ({skipped} dropped items that are not .tif files ignored)"
+        self._update_output(message + ". Save the config to use it; clear the field to process all tiles.\n")
+        self._on_field_change(field_name=TILE_LIST_KEY)
     
-    def _on_field_change(self, event=None):
-        """Reset save button color when any field changes"""
+    def _on_field_change(self, event=None, field_name=None):
+        """Record an edited field in the config model and reset save button color"""
+        if field_name is not None and self.current_store is not None:
+            entry = self.field_entries.get(field_name)
+            if entry is not None:
+                self.current_store.set_text(field_name, entry.get())
         self._reset_save_button_color()
+
+        # Check the path right after a drop, shortly after typing stops
+        row = self.current_form.rows.get(field_name) if self.current_form is not None else None
+        if row is not None:
+            if row.check_after_id is not None:
+                self.after_cancel(row.check_after_id)
+                row.check_after_id = None
+            if event is None:
+                self._check_field_path(row)
+            else:
+                row.check_after_id = self.after(PATH_CHECK_DELAY_MS, self._check_field_path, row)
+
+    def _check_field_path(self, row):
+        """Start a background check of the path in a field and show a badge"""
+        row.check_after_id = None
+        text = row.entry.get().strip()
+        type_name = self.current_store.type_of(row.key) if self.current_store is not None else None
+        if not text or not (type_name in PATH_TYPES or (type_name in (None, "str") and looks_like_path(text))):
+            row.show_badge(None)
+            return
+        path = normalize_path(text)
+        row.checking_path = path
+        row.check_count += 1
+        check = row.check_count
+        row.show_badge("⏳ checking...")
+        self.path_checker.check(path, lambda info: self.after(0, self._show_path_info, row, check, type_name, info))
+        timeout = self.settings["path_check"]["timeout_seconds"]
+        self.after(int(timeout * 1000), self._path_check_timed_out, row, check, timeout)
+
+    def _path_check_timed_out(self, row, check, timeout):
+        """The share has not answered yet; the badge is replaced if it still does"""
+        if row.check_count == check and row.checking_path is not None:
+            row.show_badge(f"⏳ no answer after {timeout:g} s (slow share?)", "warning")
+
+    def _show_path_info(self, row, check, type_name, info):
+        """Badge text for a finished path check"""
+        if row.check_count != check or row.checking_path != info.path:
+            return  # the field changed or was reused meanwhile
+        row.check_count += 1  # the timeout no longer applies
+        if info.kind == "missing":
+            row.show_badge("✗ not found", "error")
+        elif info.kind == "error":
+            row.show_badge(f"✗ {info.error}"[:60], "error")
+        elif info.kind == "file":
+            if type_name == "dir":
+                row.show_badge("⚠ a file, expected a folder", "warning")
+            else:
+                row.show_badge(f"✓ file, {format_bytes(info.size)}", "ok")
+        elif type_name == "file":
+            row.show_badge("⚠ a folder, expected a file", "warning")
+        elif info.tif_count:
+            more = "+" if info.truncated else ""
+            row.show_badge(f"✓ {info.tif_count}{more} .tif, {format_bytes(info.tif_bytes)}", "ok")
+        else:
+            row.show_badge(f"folder, no .tif files ({info.entries}{'+' if info.truncated else ''} entries)")
+
+    def _on_config_changed_on_disk(self, store):
+        """A config file was edited outside the launcher"""
+        form = self.config_forms.get(store.path)
+        if form is not None:
+            form.update({key: format_value(value) for key, value in store.values.items()})
+            if form is self.current_form:
+                self.field_entries = form.entries
+        if store is self.current_store and not self.script_is_running:
+            self._update_output(f"\n{store.path.name} was changed on disk and has been reloaded.\n")
     
     def _reset_save_button_color(self):
         """Reset save button to default blue color"""
@@ -601,88 +1700,125 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
 
     def clear_fields(self):
         """Clear all entry fields"""
-        for entry in self.field_entries.values():
+        for key, entry in self.field_entries.items():
             entry.delete(0, "end")
+            if self.current_store is not None:
+                self.current_store.set_text(key, "")
         print("All fields cleared")
         # Reset save button color when fields are cleared
         self._reset_save_button_color()
 
     def save_config(self):
-        # Get values from all dynamic entry widgets
-        config_data = {}
-        for key, entry in self.field_entries.items():
-            value = entry.get()
-            config_data[key] = value if value else None
-        
+        """Save the entered values; returns True if the config was written"""
         config_filename = self.current_config_file
         if not config_filename:
-            self.output_textbox.delete("1.0", "end")
-            self.output_textbox.insert("1.0", "Error: No config file selected\n")
-            return
+            self._set_output("Error: No config file selected\n")
+            return False
             
-        config_path = Path(__file__).parent / config_filename
+        config_path = self.current_config_path
+        store = self.current_store
         
         try:
-            with open(config_path, 'w') as f:
-                yaml.dump(config_data, f, default_flow_style=False)
+            # Written atomically with typed values from the config model
+            store.save()
             print(f"Configuration saved to {config_path}")
-            print(f"Saved values: {config_data}")
+            print(f"Saved values: {store.saved}")
             
-            # Read back and display the saved config
-            with open(config_path, 'r') as f:
-                config_contents = f.read()
+            config_contents = store.dump_text()
             
             # Display in output textbox
-            self.output_textbox.delete("1.0", "end")
-            self.output_textbox.insert("1.0", "Configuration saved successfully!\n\n")
-            self.output_textbox.insert("end", f"Contents of {config_filename}:\n")
-            self.output_textbox.insert("end", "-" * 40 + "\n")
-            self.output_textbox.insert("end", config_contents)
-            self.output_textbox.insert("end", "-" * 40 + "\n")
+            self._set_output(
+                "Configuration saved successfully!\n\n"
+                f"Contents of {config_filename}:\n"
+                + "-" * 40 + "\n"
+                + config_contents
+                + "-" * 40 + "\n"
+            )
             
             # Change save button to green to indicate successful save
             self.save_button.configure(
                 fg_color=["#4CAF50", "#388E3C"],  # Green color
                 hover_color=["#66BB6A", "#43A047"]  # Lighter green hover
             )
+            return True
             
         except Exception as e:
             print(f"Error saving configuration: {e}")
-            self.output_textbox.delete("1.0", "end")
-            self.output_textbox.insert("1.0", f"Error saving configuration: {e}\n")
+            self._set_output(f"Error saving configuration: {e}\n")
+            return False
     
+    def run_sweep(self):
+        """Expand sweep expressions in the fields and open the sweep window"""
+        selected_script = self.script_dropdown.get()
+        if selected_script == "No scripts found" or self.current_store is None:
+            self._set_output("No scripts available to run\n")
+            return
+        if self.env_dropdown.get() == "Loading environments...":
+            self._set_output("Conda environments are still loading, please try again in a moment.\n")
+            return
+
+        field_texts = {key: entry.get() for key, entry in self.field_entries.items()}
+        try:
+            swept_keys, variants = expand_sweep(field_texts, self.current_store.type_of,
+                                                self.settings["sweep"]["max_variants"])
+        except SweepError as e:
+            self._set_output(f"Invalid sweep: {e}\n")
+            return
+        if not swept_keys:
+            self._set_output(
+                "No sweep found. Enter a list [a, b], range(start, stop, step) "
+                "or glob:pattern in one or more fields.\n"
+            )
+            return
+
+        selected_env = self.env_dropdown.get()
+        conda_env = selected_env if selected_env != "No conda environments found" else None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        work_dir = state_dir(self.settings, "sweeps", f"{stamp}_{Path(selected_script).stem}")
+        SweepWindow(self, selected_script, self._script_path(selected_script), conda_env,
+                    swept_keys, variants, work_dir)
+
+    def run_workflow(self):
+        """Pick a workflow file and open its DAG window"""
+        if self.env_dropdown.get() == "Loading environments...":
+            self._set_output("Conda environments are still loading, please try again in a moment.\n")
+            return
+        workflow_file = filedialog.askopenfilename(
+            parent=self,
+            title="Open workflow",
+            initialdir=Path(__file__).parent,
+            filetypes=[("Workflow files", "*_workflow.yml"), ("YAML files", "*.yml *.yaml")]
+        )
+        if not workflow_file:
+            return
+        try:
+            workflow = Workflow.load(workflow_file)
+        except (OSError, WorkflowError) as e:
+            self._set_output(f"Invalid workflow: {e}\n")
+            return
+
+        selected_env = self.env_dropdown.get()
+        conda_env = selected_env if selected_env != "No conda environments found" else None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        work_dir = state_dir(self.settings, "workflows", f"{stamp}_{workflow.name}")
+        WorkflowWindow(self, workflow, conda_env, work_dir)
+
     def _check_values_match(self):
         """Check if GUI values match the saved yml values"""
         if not self.current_config_file:
             return True
         
-        config_path = Path(__file__).parent / self.current_config_file
-        try:
-            with open(config_path, 'r') as f:
-                saved_values = yaml.safe_load(f) or {}
-        except:
-            return True  # If can't read file, allow to proceed
-        
-        # Get current GUI values
-        gui_values = {}
-        for key, entry in self.field_entries.items():
-            value = entry.get()
-            gui_values[key] = value if value else None
-        
-        # Compare values
-        return gui_values == saved_values
+        # The config model tracks edits, so no file access is needed
+        return not self.current_store.dirty
     
+    @instrumented()
     def _show_mismatch_warning(self):
         """Show warning popup when GUI values don't match yml values"""
         # Get saved and GUI values
-        config_path = Path(__file__).parent / self.current_config_file
-        with open(config_path, 'r') as f:
-            saved_values = yaml.safe_load(f) or {}
-        
-        gui_values = {}
-        for key, entry in self.field_entries.items():
-            value = entry.get()
-            gui_values[key] = value if value else None
+        saved_values = self.current_store.saved
+        gui_values = dict(self.current_store.values)
+        for key, error in self.current_store.errors.items():
+            gui_values[key] = f"{self.field_entries[key].get()} (invalid: {error})"
         
         # Build comparison message with prominent confirmation text
         message = "⚠️ CONFIGURATION MISMATCH DETECTED ⚠️\n\n"
@@ -821,11 +1957,15 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
     
     def _save_and_run(self):
         """Save configuration, close warning popup, and run the script"""
-        self.save_config()
+        saved = self.save_config()
         self._close_warning_popup()
+        if not saved:
+            # Running now would use the old values on disk; the error is in the output box
+            return
         # Now run the script (skip validation since we just saved)
         self._proceed_with_run()
     
+    @instrumented()
     def _copy_warning_to_clipboard(self):
         """Copy the warning message to clipboard"""
         if hasattr(self, 'current_warning_message'):
@@ -837,13 +1977,16 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
     def run_wait_script(self):
         selected_script = self.script_dropdown.get()
         if selected_script == "No scripts found":
-            self.output_textbox.delete("1.0", "end")
-            self.output_textbox.insert("1.0", "No scripts available to run\n")
+            self._set_output("No scripts available to run\n")
             return
         
         # Prevent multiple simultaneous executions
         if self.script_is_running:
-            self.output_textbox.insert("end", "\nA script is already running. Please wait...\n")
+            self._update_output("\nA script is already running. Please wait...\n")
+            return
+        
+        if self.env_dropdown.get() == "Loading environments...":
+            self._set_output("Conda environments are still loading, please try again in a moment.\n")
             return
         
         # Check if GUI values match saved yml values
@@ -876,20 +2019,24 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         self.script_start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.current_conda_env = self.env_dropdown.get()  # Store conda environment
         self.current_command = None  # Will be set when subprocess starts
+        self.current_resource_summary = None
+        self.current_started_at = time.time()
+        self.stop_requested = False
+        self.current_profile_mode = PROFILE_MODES[self.profile_menu.get()]
+
+        # Each run gets its own log directory, referenced from the run history
+        self.current_run_id = new_run_id(selected_script)
+        self.current_log_path = state_dir(self.settings, "runs", self.current_run_id) / "output.log"
+        self.current_profile_path = self.current_log_path.parent / PROFILE_FILENAME
         
-        # Read current config values
+        # Snapshot of the config values the script will read
         self.current_config_values = {}
-        if self.current_config_file:
-            config_path = Path(__file__).parent / self.current_config_file
-            try:
-                with open(config_path, 'r') as f:
-                    self.current_config_values = yaml.safe_load(f) or {}
-            except:
-                pass
+        if self.current_store is not None:
+            self.current_config_values = dict(self.current_store.saved)
             
-        script_path = Path(__file__).parent / selected_script
-        self.output_textbox.delete("1.0", "end")
-        self.output_textbox.insert("1.0", f"Starting {selected_script}...\n")
+        script_path = self._script_path(selected_script)
+        self._set_output(f"Starting {selected_script}...\n")
+        self._start_output_pump()
         
         # Run in a separate thread to avoid blocking GUI
         thread = threading.Thread(target=self._execute_script, args=(script_path,))
@@ -897,103 +2044,307 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         thread.start()
 
     def _execute_script(self, script_path):
+        staging = None
         try:
             # Get selected conda environment
             selected_env = self.env_dropdown.get()
             
-            # Set environment variables for unbuffered output
-            env = os.environ.copy()
-            env['PYTHONUNBUFFERED'] = '1'
-            
-            # Build command based on whether conda env is selected
-            if selected_env and selected_env != "No conda environments found":
-                # Use conda run to execute in selected environment
-                # Use cmd /c to ensure proper output handling on Windows
-                command = f'cmd /c conda run --no-capture-output -n {selected_env} python -u "{script_path}"'
+            use_conda = selected_env and selected_env != "No conda environments found"
+            if use_conda:
                 self.after(0, self._update_output, f"Using conda environment: {selected_env}\n")
-            else:
-                # Use system Python - don't use shell for direct python execution
-                command = [sys.executable, '-u', str(script_path)]
+
+            # Skip the run if an identical one already completed
+            run_env = environment_identity(selected_env if use_conda else None,
+                                           self.conda_env_prefixes.get(selected_env))
+            fingerprints = []
+            if self.run_cache is not None:
+                fingerprints.append(self._run_fingerprint(script_path, run_env))
+                if fingerprints[0] and not self.force_rerun_var.get() and not self.current_profile_mode:
+                    record = self.run_cache.lookup(fingerprints[0])
+                    if record is not None:
+                        self._record_run("cached", script_path)
+                        self.after(0, self._show_cached_result, record)
+                        return
             
-            try:
-                if isinstance(command, str):
-                    # Shell command for conda
-                    process = subprocess.Popen(
-                        command,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=0,
-                        shell=True,
-                        env=env
-                    )
-                else:
-                    # Direct command for system python
-                    process = subprocess.Popen(
-                        command,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=0,
-                        env=env
-                    )
-            except FileNotFoundError as e:
-                # If conda command fails, fall back to system Python
-                if selected_env and selected_env != "No conda environments found":
-                    self.after(0, self._update_output, f"Warning: Could not activate conda environment '{selected_env}', using system Python instead.\n")
-                    command = [sys.executable, '-u', str(script_path)]
-                    process = subprocess.Popen(
-                        command,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        bufsize=0,
-                        env=env
+            exec_profile = self.exec_profiles.profile_for(self.current_script_name)
+            if exec_profile is not None:
+                self.after(0, self._update_output,
+                           f"Execution profile: {exec_profile.name} ({exec_profile.describe()})\n")
+
+            # The job server runs the script with its own copy of the config;
+            # profiled runs need the profile files here, so they stay local
+            use_server = self.job_client is not None and self.job_server_var.get()
+            if use_server and self.current_profile_mode:
+                self.after(0, self._update_output, "Profiled runs are started locally, not on the job server.\n")
+                use_server = False
+
+            # Copy inputs to local disk and point the run's config at the copies
+            config_path = None
+            if self.stage_inputs_var.get() and not use_server:
+                staging, config_path = self._prepare_staging()
+
+            process = None
+            if use_server:
+                process, command = self._submit_to_job_server(selected_env if use_conda else None, exec_profile)
+
+            # Prefer a warm worker: no conda startup and preloaded imports.
+            # Its libraries are already loaded, so thread counts, affinity and
+            # limits of an execution profile could not take effect there
+            if (process is None and self.worker_pool is not None and self.warm_worker_var.get()
+                    and not self.current_profile_mode and exec_profile is None):
+                pool_env = selected_env if use_conda else None
+                worker_env = {'PYTHONUNBUFFERED': '1'}
+                if config_path is not None:
+                    worker_env[CONFIG_ENV_VAR] = str(config_path)
+                try:
+                    process = self.worker_pool.start_script(
+                        pool_env, script_path, env=worker_env, cwd=os.getcwd()
                     )
-                else:
-                    raise
+                    command = f'warm worker ({pool_env or "system Python"}): runpy "{script_path}"'
+                except (WorkerError, OSError) as e:
+                    self.after(0, self._update_output, f"Warm worker unavailable ({e}), starting normally.\n")
+            
+            if process is None:
+                prefix_args = ()
+                if self.current_profile_mode:
+                    self.after(0, self._update_output, f"Profiling with {self.profile_menu.get()}\n")
+                    prefix_args = shim_args(self.current_profile_mode, self.current_profile_path,
+                                            self.settings["profiler"]["sample_interval"],
+                                            self.settings["profiler"]["snapshot_interval"])
+                process, command = self._start_process(
+                    script_path, selected_env if use_conda else None, prefix_args, exec_profile, config_path
+                )
             
             # Store process reference for stop button
             self.current_process = process
+
+            # Sample the process tree's resources while it runs
+            self.current_resource_summary = None
+            monitor = ResourceMonitor(
+                process.pid, self.settings["monitor"]["interval_seconds"],
+                on_sample=lambda sample: self.after(0, self._show_resource_sample, sample)
+            ).start()
             
             # Store command for execution details
-            if isinstance(command, str):
-                self.current_command = command
-            else:
-                self.current_command = ' '.join(str(c) for c in command)
+            self.current_command = command_text(command)
             
-            # Read output line by line
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    self.after(0, self._update_output, line)
-                if process.poll() is not None:
-                    # Process finished, read any remaining output
-                    remaining = process.stdout.read()
-                    if remaining:
-                        self.after(0, self._update_output, remaining)
-                    break
+            # Read raw output as it arrives; the buffer interprets '\r' and
+            # ANSI sequences and the GUI draws it on a timer. The raw output
+            # is also kept as the run's log
+            with open(self.current_log_path, 'ab') as log_file:
+                while True:
+                    chunk = process.stdout.read(65536)
+                    if not chunk:
+                        break
+                    self.output_buffer.feed_bytes(chunk)
+                    log_file.write(chunk)
             
             process.wait()
+            monitor.stop()
+            self.current_resource_summary = monitor.summary()
+            self.output_buffer.finish()
+            self.after(0, self._flush_output)
+            if staging is not None:
+                staging.finish(process.returncode == 0 and not self.stop_requested)
+                staging = None
+            if self.stop_requested:
+                status = "cancelled"
+            else:
+                status = "ok" if process.returncode == 0 else "failed"
+            self._record_run(status, script_path, process.returncode)
+            if self.current_profile_mode:
+                self.after(0, self._show_profile_window, self.current_profile_path)
             
             if process.returncode == 0:
+                if self.run_cache is not None and not self.stop_requested:
+                    # Inputs may have been rewritten by the run; record the new state too
+                    info = self.script_registry.get(self.current_script_name)
+                    if may_rewrite_inputs(info.schema if info is not None else None):
+                        fingerprints.append(self._run_fingerprint(script_path, run_env))
+                    self.run_cache.record([fp for fp in fingerprints if fp], {
+                        "script": self.current_script_name,
+                        "conda_env": self.current_conda_env,
+                        "command": self.current_command,
+                        "config": self.current_config_values,
+                        "started": self.script_start_time,
+                        "completed": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "output_tail": self.output_buffer.tail(),
+                    })
                 self.after(0, self._update_output, "\nScript completed successfully!\n")
                 self.after(0, self._set_button_success)
                 self.after(0, self._restore_button_state)
                 self.after(0, self._show_success_popup)
             else:
-                stderr_output = process.stderr.read()
-                self.after(0, self._update_output, f"\nError: {stderr_output}\n")
+                # stderr is merged into stdout, so report the last lines of output
+                error_output = self.output_buffer.tail()
+                self.after(0, self._update_output, f"\nError: script exited with code {process.returncode}\n")
                 self.after(0, self._set_button_error)
                 self.after(0, self._restore_button_state)
-                self.after(0, lambda: self._show_error_popup(stderr_output, include_context=True))
+                self.after(0, lambda: self._show_error_popup(error_output, include_context=True))
                 
         except Exception as e:
             error_msg = str(e)
+            if staging is not None:
+                staging.finish(False)
+            self._record_run("failed", script_path)
             self.after(0, self._update_output, f"\nError running script: {e}\n")
             self.after(0, self._set_button_error)
             self.after(0, self._restore_button_state)
             self.after(0, lambda: self._show_error_popup(error_msg, include_context=True))
 
+    def on_exec_profile_selected(self, profile_name):
+        """Attach the chosen execution profile to the selected script"""
+        script_name = self.script_dropdown.get()
+        if script_name == "No scripts found":
+            return
+        try:
+            self.exec_profiles.attach(script_name, None if profile_name == NO_EXEC_PROFILE else profile_name)
+        except OSError as e:
+            self._set_output(f"Error saving execution profiles: {e}\n")
+
+    def show_exec_profile_editor(self):
+        ExecProfileEditor(self, self.exec_profiles)
+
+    def _exec_profiles_changed(self):
+        """Refresh the profile menu after the editor saved"""
+        self.exec_profile_menu.configure(values=[NO_EXEC_PROFILE] + self.exec_profiles.names())
+        attached = self.exec_profiles.scripts.get(self.script_dropdown.get())
+        self.exec_profile_menu.set(attached if attached in self.exec_profiles.profiles else NO_EXEC_PROFILE)
+
+    @instrumented()
+    def show_history_window(self):
+        """Open the run history, filtered to the selected script"""
+        if self.run_history is None:
+            self._set_output("Run history is unavailable.\n")
+            return
+        HistoryWindow(self, self.run_history, self.script_dropdown.get())
+
+    def record_batch_run(self, kind, script_path, status, exit_code=None, config=None,
+                         conda_env=None, started=None, ended=None, log_path=None):
+        """Add a sweep variant or workflow step to the run history"""
+        if self.run_history is None:
+            return
+        try:
+            self.run_history.record(
+                Path(script_path).name, status, exit_code=exit_code, started=started, ended=ended,
+                config=config, conda_env=conda_env, script_path=script_path,
+                log_path=log_path, kind=kind,
+            )
+        except Exception as e:
+            print(f"Could not record run history: {e}")
+
+    def _record_run(self, status, script_path, exit_code=None):
+        """Add the current run to the run history"""
+        if self.run_history is None:
+            return
+        try:
+            self.run_history.record(
+                self.current_script_name, status, exit_code=exit_code,
+                started=self.current_started_at, ended=time.time(),
+                config=self.current_config_values, conda_env=self.current_conda_env,
+                command=self.current_command, script_path=script_path,
+                resources=self.current_resource_summary, log_path=self.current_log_path,
+                run_id=self.current_run_id,
+            )
+        except Exception as e:
+            print(f"Could not record run history: {e}")
+
+    def _run_fingerprint(self, script_path, run_env):
+        """Fingerprint of the current run, or None if it cannot be computed"""
+        info = self.script_registry.get(self.current_script_name)
+        try:
+            return fingerprint(script_path, self.current_config_values, run_env,
+                               info.schema if info is not None else None)
+        except OSError as e:
+            print(f"Could not fingerprint run: {e}")
+            return None
+
+    def _show_resource_sample(self, sample):
+        """Show the latest resource sample next to the output while a script runs"""
+        if self.script_is_running:
+            self.resource_label.configure(text=sample.describe())
+
+    def _resource_summary_text(self):
+        """Resource section for the completion popups"""
+        summary = getattr(self, 'current_resource_summary', None)
+        if not summary:
+            return ""
+        text = "\n" + "-"*60 + "\n"
+        text += "RESOURCES:\n"
+        text += describe_summary(summary)
+        return text
+
+    def _show_cached_result(self, record):
+        """Report a skipped run whose result is already in the run cache"""
+        self._update_output(
+            f"\n⏭ Skipped: an identical run completed at {record.get('completed', 'Unknown')} (cached result).\n"
+            "Nothing changed in the script, its config, the environment or the input files.\n"
+            "Tick 'Force rerun' to run it anyway.\n"
+        )
+        if record.get("output_tail"):
+            self._update_output("\nOutput of the cached run (last lines):\n" + record["output_tail"])
+        self._set_button_success()
+        self._restore_button_state()
+
+    def _start_process(self, script_path, conda_env, prefix_args=(), exec_profile=None, config_path=None):
+        """Start the script as a new process, returning (process, command)"""
+        try:
+            return start_process(script_path, conda_env, config_path=config_path, prefix_args=prefix_args,
+                                 exec_profile=exec_profile)
+        except FileNotFoundError:
+            # If conda command fails, fall back to system Python
+            if conda_env:
+                self.after(0, self._update_output, f"Warning: Could not activate conda environment '{conda_env}', using system Python instead.\n")
+                return start_process(script_path, config_path=config_path, prefix_args=prefix_args,
+                                     exec_profile=exec_profile)
+            raise
+
+    def _submit_to_job_server(self, conda_env, exec_profile):
+        """Queue the run on the job server, returning (RemoteJob, command) or (None, None)"""
+        try:
+            job = self.job_client.submit(
+                self.current_script_name, getpass.getuser(), config=self.current_config_values or None,
+                conda_env=conda_env, exec_profile=exec_profile.name if exec_profile else None,
+            )
+        except JobServerError as e:
+            self.after(0, self._update_output, f"Job server unavailable ({e}), starting locally.\n")
+            return None, None
+        ahead = job.get("queue_position")
+        self.after(0, self._update_output,
+                   f"Queued on {self.job_client.url} as {job['id']}"
+                   + (f" ({ahead} of your jobs ahead)\n" if ahead else "\n"))
+        return RemoteJob(self.job_client, job), f"job server {self.job_client.url}: {job['script']} ({job['id']})"
+
+    def _prepare_staging(self):
+        """Stage the run's declared inputs; return (plan, config snapshot path) or (None, None)"""
+        info = self.script_registry.get(self.current_script_name)
+
+        def plan_messages(message):
+            self.after(0, self._update_output, message)
+
+        if self.staging_cache is None:
+            self.staging_cache = StagingCache.from_settings(self.settings, state_dir(self.settings, "staging"))
+        plan = StagingPlan(self.staging_cache, self.current_config_values,
+                           info.schema if info is not None else None, on_message=plan_messages)
+        if not plan.keys:
+            plan_messages("Staging: the script declares no input or output folders, running in place\n")
+            return None, None
+        try:
+            staged = plan.prepare()
+            config_path = write_config_snapshot(staged, self.current_log_path.parent / "config.yml")
+        except Exception:
+            plan.finish(False)
+            raise
+        return plan, config_path
+
+    def _show_profile_window(self, profile_path):
+        """Show the top functions of a profiled run"""
+        summary = load_summary(profile_path)
+        if summary is None:
+            self._update_output(f"\nNo profile was written to {profile_path}\n")
+            return
+        ProfileWindow(self, summary, profile_path)
+
     def _set_button_success(self):
         """Set button color to default (success state)"""
         self.wait_button.configure(fg_color=["#3B8ED0", "#1F6AA5"])  # Default blue
@@ -1011,28 +2362,50 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             text=f"Run {selected_script}",
             state="normal"
         )
-        # Hide stop button
+        # Keep the final resource numbers visible until the next run
+        summary = getattr(self, 'current_resource_summary', None)
+        self.resource_label.configure(
+            text=f"Last run: {summary['wall_seconds']:.1f} s, peak RSS {format_bytes(summary['peak_rss_bytes'])}, "
+                 f"read {format_bytes(summary['read_bytes'])}, written {format_bytes(summary['write_bytes'])}"
+            if summary else ""
+        )
+        # Hide stop button and progress bar
         self.stop_button.pack_forget()
+        self.progress_bar.pack_forget()
+        self.progress_label.pack_forget()
 
     def stop_script(self):
-        """Stop the currently running script"""
+        """Stop the currently running script and everything it started"""
         if self.current_process and self.script_is_running:
-            try:
-                self.current_process.terminate()  # Try graceful termination first
-                self.after(1000, self._force_kill_if_needed)  # Force kill after 1 second if still running
-                self._update_output("\n⏹ Script termination requested...\n")
-            except Exception as e:
-                self._update_output(f"\nError stopping script: {e}\n")
-    
-    def _force_kill_if_needed(self):
-        """Force kill the process if it didn't terminate gracefully"""
-        if self.current_process and self.current_process.poll() is None:
-            try:
-                self.current_process.kill()
-                self._update_output("\n⏹ Script forcefully terminated.\n")
-            except:
-                pass
+            self.stop_requested = True
+            self.stop_button.configure(state="disabled")
+            self._update_output("\n⏹ Script termination requested...\n")
+            thread = threading.Thread(target=self._stop_process_tree, args=(self.current_process,))
+            thread.daemon = True
+            thread.start()
+
+    def _stop_process_tree(self, process):
+        """Terminate the process tree, force-kill it after the grace period, then verify"""
+        grace_seconds = self.settings["stop"]["grace_seconds"]
+
+        def report(step):
+            if step == "forced":
+                self.after(0, self._update_output,
+                           f"\n⏹ Still running after {grace_seconds} s, forcing termination...\n")
+
+        try:
+            remaining = stop_tree(process, grace_seconds, on_message=report)
+        except Exception as e:
+            self.after(0, self._update_output, f"\nError stopping script: {e}\n")
+            remaining = []
+        if remaining:
+            pids = ", ".join(str(pid) for pid in remaining if pid is not None) or f"{len(remaining)} processes"
+            self.after(0, self._update_output, f"\n⚠ Processes still running after stop: {pids}\n")
+        else:
+            self.after(0, self._update_output, "\n⏹ Script and all child processes stopped.\n")
+        self.after(0, lambda: self.stop_button.configure(state="normal"))
 
+    @instrumented()
     def _show_error_popup(self, error_message, include_context=False):
         """Display error popup overlay with red background"""
         # Build full error message with context
@@ -1046,6 +2419,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             context_info += f"Conda Environment: {getattr(self, 'current_conda_env', 'Unknown')}\n"
             context_info += f"Command: {getattr(self, 'current_command', 'Unknown')}\n"
             context_info += f"Started: {getattr(self, 'script_start_time', 'Unknown')}\n"
+            context_info += self._resource_summary_text()
             context_info += f"\nConfig File ({getattr(self, 'current_config_file', 'Unknown')}):\n"
             context_info += "-"*60 + "\n"
             
@@ -1147,6 +2521,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             self.error_overlay.destroy()
             del self.error_overlay
     
+    @instrumented()
     def _show_success_popup(self):
         """Display success popup overlay with green background"""
         # Build context info
@@ -1158,6 +2533,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
         context_info += f"Command: {getattr(self, 'current_command', 'Unknown')}\n"
         context_info += f"Started: {getattr(self, 'script_start_time', 'Unknown')}\n"
         context_info += f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        context_info += self._resource_summary_text()
         context_info += f"\nConfig File ({getattr(self, 'current_config_file', 'Unknown')}):\n"
         context_info += "-"*60 + "\n"
         
@@ -1257,6 +2633,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             self.success_overlay.destroy()
             del self.success_overlay
     
+    @instrumented()
     def _copy_success_to_clipboard(self):
         """Copy the success context to clipboard"""
         if hasattr(self, 'current_success_context'):
@@ -1265,6 +2642,7 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             self.update()  # Required to finalize clipboard content
             print("Success details copied to clipboard")
     
+    @instrumented()
     def _copy_error_to_clipboard(self):
         """Copy the error message to clipboard"""
         if hasattr(self, 'current_error_message'):
@@ -1273,20 +2651,83 @@ class App(TkinterDnD.Tk):   # IMPORTANT: use TkinterDnD root
             self.update()  # Required to finalize clipboard content
             print("Error message copied to clipboard")
 
+    @instrumented()
     def _update_output(self, text):
-        self.output_textbox.insert("end", text)
-        self.output_textbox.see("end")
+        """Append launcher messages to the output, after any script output"""
+        self.output_buffer.feed(text)
+        self._flush_output()
+
+    def _set_output(self, text):
+        """Replace the output box contents and start a fresh output stream"""
+        self.output_buffer.reset()
+        self.live_output_line = ""
+        self.output_textbox.delete("1.0", "end")
+        self.output_textbox.insert("1.0", text)
+        self._init_live_mark(self.output_textbox)
+
+    def _init_live_mark(self, textbox, live_length=0):
+        """Place the mark that separates finished lines from the live line"""
+        textbox.mark_set("live", f"end-1c-{live_length}c")
+        textbox.mark_gravity("live", "left")
+
+    def _start_output_pump(self):
+        """Draw buffered output periodically while a script is running"""
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="")
+        if not self.output_pump_scheduled:
+            self.output_pump_scheduled = True
+            self.after(OUTPUT_REFRESH_MS, self._pump_output)
+
+    def _pump_output(self):
+        """Timer callback: flush output and reschedule while running"""
+        self._flush_output()
+        if self.script_is_running:
+            self.after(OUTPUT_REFRESH_MS, self._pump_output)
+        else:
+            self.output_pump_scheduled = False
+
+    @instrumented()
+    def _flush_output(self):
+        """Draw output received since the last flush in one widget update"""
+        drained = self.output_buffer.drain()
+        if drained is None:
+            return
+        committed, live_line, progress = drained
+        self.live_output_line = live_line
+
+        self._render_output(self.output_textbox, committed, live_line)
         
         # Also update expanded output window if it's open
         if hasattr(self, 'expanded_output_textbox'):
             try:
-                self.expanded_output_textbox.insert("end", text)
-                self.expanded_output_textbox.see("end")
+                self._render_output(self.expanded_output_textbox, committed, live_line)
             except:
                 # Window might have been closed
                 if hasattr(self, 'expanded_output_textbox'):
                     del self.expanded_output_textbox
 
+        if progress is not None and self.script_is_running:
+            if not self.progress_bar.winfo_ismapped():
+                self.progress_bar.pack(side="left", padx=5)
+                self.progress_label.pack(side="left", padx=(0, 5))
+            self.progress_bar.set(progress / 100)
+            self.progress_label.configure(text=f"{progress:.0f}%")
+
+    def _render_output(self, textbox, committed, live_line):
+        """Replace the live line of a textbox and append finished lines"""
+        textbox.delete("live", "end-1c")
+        if committed:
+            textbox.insert("end-1c", committed)
+            textbox.mark_set("live", "end-1c")
+        if live_line:
+            textbox.insert("end-1c", live_line)
+        textbox.see("end")
+
+
+def main():
+    app = App()
+    app.mainloop()
+
 
-app = App()
-app.mainloop()
+if __name__ == "__main__":
+    main()
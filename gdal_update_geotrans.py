@@ -25,13 +25,22 @@ from osgeo import gdal
 import yaml
 from pathlib import Path
 
+# Config keys and types, read by the launcher without importing this script
+CONFIG_SCHEMA = {
+    "img_dir": {"type": "dir", "role": "input", "help": "Source imagery with the geospatial metadata"},
+    "label_dir": {"type": "dir", "role": "inout", "help": "Prediction TIFFs to update"},
+    "tile_list": {"type": "file", "help": "Optional tile list (drop several tiles); only these tiles are updated"},
+}
+
 # Load configuration from YAML file
-config_path = Path(__file__).parent / 'gdal_update_geotrans_config.yml'
+# LAUNCHER_CONFIG_PATH points at a per-run config snapshot, e.g. for sweeps
+config_path = Path(os.environ.get('LAUNCHER_CONFIG_PATH') or Path(__file__).parent / 'gdal_update_geotrans_config.yml')
 with open(config_path, 'r') as f:
     config = yaml.safe_load(f)
 
 img_dir = config['img_dir']
 label_dir = config['label_dir']
+tile_list_path = config.get('tile_list')
 
 
 def add_proj(src_tiff, lbl_tiff):
@@ -65,8 +74,19 @@ def add_proj(src_tiff, lbl_tiff):
     return lbl_ds
 
 
+def read_tile_list(path):
+    """Tiles named in a tile list file, looked up in label_dir"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tiles = (yaml.safe_load(f) or {}).get('tiles') or []
+    return [os.path.join(label_dir, os.path.basename(t)) for t in tiles]
+
+
 if __name__ == "__main__":
-    tile_list = glob.glob(f'{label_dir}/*.tif')
+    if tile_list_path:
+        tile_list = read_tile_list(tile_list_path)
+        print(f"Processing {len(tile_list)} tiles from {tile_list_path}")
+    else:
+        tile_list = glob.glob(f'{label_dir}/*.tif')
     tile_ids = [(os.path.splitext(os.path.basename(t))[0]) for t in tile_list]
     print("Tiles for inference : ", tile_ids)
 
@@ -0,0 +1,7 @@
+"""
+Support code for the Land Cover Script Interface (drag_drop.py).
+
+The GUI module holds the widgets; everything that does not need a display
+lives in this package so it can be reused outside the window, e.g. by the
+headless runner (python -m launcher, see launcher.cli).
+"""
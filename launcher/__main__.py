@@ -0,0 +1,6 @@
+"""Headless runner: python -m launcher --help (see launcher.cli)"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
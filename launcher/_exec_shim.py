@@ -0,0 +1,49 @@
+"""
+Exec wrapper applying an execution profile's process settings (POSIX).
+
+    python _exec_shim.py '{"cpus": [0, 1], "nice": 10, "limits": {...}}' -- conda run ...
+
+Sets CPU affinity, the nice increment and resource limits on itself, then
+replaces itself with the command, which inherits them (as do conda's python
+and anything the script starts). Doing this in a separate process instead of
+a subprocess preexec_fn keeps Python code out of the child forked from the
+multi-threaded GUI.
+
+This file must only use the standard library.
+"""
+import json
+import os
+import resource
+import sys
+
+RLIMITS = {
+    "open_files": resource.RLIMIT_NOFILE,
+    "cpu_seconds": resource.RLIMIT_CPU,
+}
+
+
+def apply(settings):
+    cpus = settings.get("cpus")
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    if settings.get("nice"):
+        os.nice(settings["nice"])
+    limits = settings.get("limits") or {}
+    if "memory_mb" in limits:
+        size = limits["memory_mb"] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (size, size))
+    for key, limit in RLIMITS.items():
+        if key in limits:
+            resource.setrlimit(limit, (limits[key], limits[key]))
+
+
+def main():
+    if len(sys.argv) < 4 or sys.argv[2] != "--":
+        sys.exit("usage: _exec_shim.py SETTINGS_JSON -- COMMAND...")
+    apply(json.loads(sys.argv[1]))
+    command = sys.argv[3:]
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Profiling wrapper for launcher runs.
+
+Runs a script as __main__ in the target environment and profiles it:
+
+    python -u _profile_shim.py --mode cprofile --out run.prof script.py
+    python -u _profile_shim.py --mode sample --interval 0.01 --out run.prof script.py
+    python -u _profile_shim.py --mode memory --snapshot-interval 30 --out run.prof script.py
+
+cprofile  deterministic profile with cProfile; every call is counted, which
+          slows down call-heavy pure Python code.
+sample    statistical profile: a background thread looks at the main thread's
+          stack every --interval seconds with sys._current_frames(). Overhead
+          stays low for long runs; times are estimates (samples x interval).
+memory    tracemalloc: a snapshot every --snapshot-interval seconds and one at
+          exit, saved in <out>.snapshots/ (load them with
+          tracemalloc.Snapshot.load to compare offline). Allocations made by
+          C libraries such as GDAL outside Python's allocator are not seen.
+
+Every mode writes <out>.json, a summary the launcher shows when the run
+ends, whatever Python version the environment uses: the top functions by
+cumulative and own ("total") time, or for memory the top allocation sites at
+exit and the growth between consecutive snapshots. cprofile also writes the
+raw <out> file for pstats or snakeviz.
+
+This file runs inside the target environment and must only use the
+standard library.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+TOP_N = 30
+# Allocations made by the import machinery and by this shim are not the script's
+MEMORY_IGNORE = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                 "<unknown>", os.path.abspath(__file__))
+
+
+def _main_module(script):
+    """Fresh __main__ module for a script"""
+    module = types.ModuleType("__main__")
+    module.__file__ = script
+    module.__cached__ = None
+    return module
+
+
+def _run_script(script, module):
+    """Run a script in a module like runpy.run_path(run_name="__main__")
+
+    The caller keeps the module, so the script's globals are still alive
+    for the exit snapshot even if the script ends with sys.exit().
+    """
+    with open(script, 'rb') as f:
+        code = compile(f.read(), script, 'exec')
+    saved_main = sys.modules.get("__main__")
+    sys.modules["__main__"] = module
+    try:
+        exec(code, module.__dict__)
+    finally:
+        sys.modules["__main__"] = saved_main
+
+
+def _function_name(filename, lineno, name):
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _entry(function, calls, tottime, cumtime, filename=None):
+    return {"function": function, "calls": calls, "tottime": tottime, "cumtime": cumtime,
+            "file": filename}
+
+
+def _cprofile_summary(profiler, out):
+    import pstats
+    profiler.dump_stats(out)
+    stats = pstats.Stats(out)
+    entries = []
+    for (filename, lineno, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        entries.append(_entry(_function_name(filename, lineno, name), calls, tottime, cumtime, filename))
+    return entries, stats.total_tt
+
+
+class Sampler:
+    """Sample the main thread's stack from a background thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = 0
+        self.own = {}
+        self.cumulative = {}
+        self.files = {}
+        self._thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        this_file = os.path.abspath(__file__)
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            seen = set()
+            top = None
+            while frame is not None:
+                code = frame.f_code
+                if os.path.abspath(code.co_filename) != this_file:
+                    key = _function_name(code.co_filename, code.co_firstlineno, code.co_name)
+                    self.files[key] = code.co_filename
+                    if top is None:
+                        top = key
+                    if key not in seen:
+                        seen.add(key)
+                        self.cumulative[key] = self.cumulative.get(key, 0) + 1
+                frame = frame.f_back
+            if top is not None:
+                self.own[top] = self.own.get(top, 0) + 1
+                self.samples += 1
+
+    def summary(self):
+        entries = []
+        for key, count in self.cumulative.items():
+            entries.append(_entry(key, None, self.own.get(key, 0) * self.interval,
+                                  count * self.interval, self.files.get(key)))
+        return entries
+
+
+class MemoryTracker:
+    """Periodic tracemalloc snapshots, saved to a directory"""
+
+    def __init__(self, interval, snapshot_dir, frames=1):
+        import tracemalloc
+        self.tracemalloc = tracemalloc
+        self.interval = interval
+        self.snapshot_dir = snapshot_dir
+        self.snapshots = []
+        self._previous = None
+        self.growth = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        os.makedirs(snapshot_dir, exist_ok=True)
+        tracemalloc.start(frames)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.take("periodic")
+
+    def _script_stats(self, stats):
+        # Filtering the grouped statistics is much cheaper than filter_traces()
+        ignored = MEMORY_IGNORE + (self.tracemalloc.__file__,)
+        return [s for s in stats if s.traceback[0].filename not in ignored]
+
+    @staticmethod
+    def _site(frame):
+        return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+    def take(self, kind):
+        with self._lock:
+            snapshot = self.tracemalloc.take_snapshot()
+            current, peak = self.tracemalloc.get_traced_memory()
+            index = len(self.snapshots) + 1
+            path = os.path.join(self.snapshot_dir, f"snapshot_{index:03d}.tracemalloc")
+            snapshot.dump(path)
+            info = {
+                "index": index,
+                "kind": kind,
+                "elapsed": time.perf_counter() - self._started,
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "file": path,
+            }
+            self.snapshots.append(info)
+            if self._previous is not None:
+                stats = self._script_stats(snapshot.compare_to(self._previous, "lineno"))
+                self.growth.append({
+                    "from": index - 1,
+                    "to": index,
+                    "elapsed": info["elapsed"],
+                    "delta_bytes": sum(s.size_diff for s in stats),
+                    "top": [{"site": self._site(s.traceback[0]), "size_diff": s.size_diff,
+                             "count_diff": s.count_diff, "size": s.size}
+                            for s in stats[:TOP_N] if s.size_diff],
+                })
+            self._previous = snapshot
+            return snapshot
+
+    def finish(self):
+        """Take the exit snapshot and return (top sites, snapshots, growth)"""
+        self._stop.set()
+        self._thread.join()
+        snapshot = self.take("exit")
+        top = [{"site": self._site(s.traceback[0]), "size": s.size, "count": s.count}
+               for s in self._script_stats(snapshot.statistics("lineno"))[:TOP_N]]
+        self.tracemalloc.stop()
+        return top, self.snapshots, self.growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a script under a profiler")
+    parser.add_argument("--mode", choices=("cprofile", "sample", "memory"), default="cprofile")
+    parser.add_argument("--interval", type=float, default=0.01)
+    parser.add_argument("--snapshot-interval", type=float, default=30.0)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    options = parser.parse_args()
+
+    script = os.path.abspath(options.script)
+    sys.argv = [script] + options.args
+    sys.path[0] = os.path.dirname(script)
+
+    module = _main_module(script)
+    exit_code = 0
+    profiler = sampler = memory = None
+    started = time.perf_counter()
+    try:
+        if options.mode == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif options.mode == "memory":
+            memory = MemoryTracker(options.snapshot_interval, options.out + ".snapshots")
+        else:
+            sampler = Sampler(options.interval)
+            sampler.start()
+        try:
+            _run_script(script, module)
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            exit_code = 1
+    finally:
+        summary = {
+            "mode": options.mode,
+            "script": script,
+            "exit_code": exit_code,
+            "wall_seconds": time.perf_counter() - started,
+        }
+        if memory is not None:
+            top, snapshots, growth = memory.finish()
+            summary.update({
+                "snapshot_interval": options.snapshot_interval,
+                "snapshot_dir": options.out + ".snapshots",
+                "peak_bytes": max(s["peak_bytes"] for s in snapshots),
+                "snapshots": snapshots,
+                "top_sites": top,
+                "growth": growth,
+            })
+        else:
+            if profiler is not None:
+                profiler.disable()
+                entries, total = _cprofile_summary(profiler, options.out)
+                samples = None
+            else:
+                sampler.stop()
+                entries, total, samples = sampler.summary(), sampler.samples * options.interval, sampler.samples
+            summary.update({
+                "profiled_seconds": total,
+                "samples": samples,
+                "interval": options.interval if sampler is not None else None,
+                "profile_file": options.out if profiler is not None else None,
+                "by_cumulative": sorted(entries, key=lambda e: e["cumtime"], reverse=True)[:TOP_N],
+                "by_tottime": sorted(entries, key=lambda e: e["tottime"], reverse=True)[:TOP_N],
+            })
+        with open(options.out + ".json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=1)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
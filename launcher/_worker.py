@@ -0,0 +1,140 @@
+"""
+Warm worker interpreter for the launcher's worker pool.
+
+Started once per conda environment (python -u _worker.py --control-port N).
+It imports the requested heavy modules, connects back to the launcher and
+waits for run requests. Each request is served by forking a fresh child that
+connects its stdout/stderr to the launcher's per-run socket and executes the
+script with runpy, so runs share the warm imports but not their state.
+
+This file runs inside the target environment and must only use the
+standard library.
+"""
+import argparse
+import atexit
+import importlib
+import io
+import json
+import os
+import runpy
+import socket
+import sys
+import threading
+import traceback
+
+
+def _exit_code(status):
+    """Convert a waitpid status to a Popen-style return code"""
+    if hasattr(os, 'waitstatus_to_exitcode'):
+        return os.waitstatus_to_exitcode(status)
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _run_child(request):
+    """Body of the forked child: run one script and exit"""
+    code = 1
+    try:
+        os.setsid()
+        out = socket.create_connection(("127.0.0.1", request["port"]))
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        os.close(devnull)
+        out.close()
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = io.TextIOWrapper(open(1, 'wb', 0, closefd=False), encoding='utf-8',
+                                      errors='backslashreplace', write_through=True)
+        sys.stderr = io.TextIOWrapper(open(2, 'wb', 0, closefd=False), encoding='utf-8',
+                                      errors='backslashreplace', write_through=True)
+
+        script = request["script"]
+        os.environ.update(request.get("env") or {})
+        os.chdir(request.get("cwd") or os.path.dirname(script))
+        sys.argv = [script] + list(request.get("args") or [])
+        sys.path[0] = os.path.dirname(script)
+
+        try:
+            runpy.run_path(script, run_name="__main__")
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        atexit._run_exitfuncs()
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+class Worker:
+    def __init__(self, control):
+        self.control = control
+        self.write_lock = threading.Lock()
+
+    def send(self, message):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self.write_lock:
+            self.control.sendall(data)
+
+    def serve(self):
+        reader = self.control.makefile('r', encoding='utf-8')
+        for line in reader:
+            request = json.loads(line)
+            if request.get("op") == "exit":
+                break
+            if request.get("op") == "run":
+                self.start_run(request)
+
+    def start_run(self, request):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            self.control.close()
+            _run_child(request)
+        self.send({"event": "started", "id": request["id"], "pid": pid})
+        threading.Thread(target=self.reap, args=(request["id"], pid), daemon=True).start()
+
+    def reap(self, run_id, pid):
+        _, status = os.waitpid(pid, 0)
+        self.send({"event": "exited", "id": run_id, "returncode": _exit_code(status)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--control-port", type=int, required=True)
+    parser.add_argument("--preload", default="", help="Comma separated modules to import")
+    args = parser.parse_args()
+
+    preloaded, failed = [], {}
+    for name in filter(None, args.preload.split(",")):
+        try:
+            importlib.import_module(name.strip())
+            preloaded.append(name.strip())
+        except Exception as e:
+            failed[name.strip()] = str(e)
+
+    control = socket.create_connection(("127.0.0.1", args.control_port))
+    worker = Worker(control)
+    worker.send({"event": "ready", "pid": os.getpid(), "python": sys.version.split()[0],
+                 "preloaded": preloaded, "failed": failed})
+    worker.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Headless runner.
+
+Runs launcher scripts without a display, the way the GUI does: each script
+reads its <script>_config.yml (or a per-run snapshot through
+LAUNCHER_CONFIG_PATH), runs in the selected conda environment ('base' or the
+first environment found unless -e is given) with the execution profile
+attached to it, and every run is logged and recorded in the run history.
+
+    python -m launcher gdal_update_geotrans.py
+    python -m launcher gdal_update_geotrans.py -e geo --set label_dir=/data/block_4
+    python -m launcher a.py b.py c.py --jobs 3 --json > progress.jsonl
+
+Scripts are names from the configured script directories or paths. With one
+script its output is passed through unchanged; with several, each completed
+line is prefixed with the script name. --json writes JSON lines instead:
+
+    {"event": "start", "run_id": ..., "script": ..., "command": ..., "time": ...}
+    {"event": "line", "run_id": ..., "script": ..., "text": ..., "time": ...}
+    {"event": "progress", "run_id": ..., "script": ..., "percent": 42.0, "time": ...}
+    {"event": "end", "run_id": ..., "script": ..., "status": "ok", "exit_code": 0,
+     "duration": 12.3, "log_path": ..., "time": ...}
+    {"event": "summary", "ok": 2, "failed": 1, "cancelled": 0, "exit_code": 1, "time": ...}
+
+Exit codes: a single script's own exit code; with several scripts 0 if all
+succeeded and 1 otherwise; 2 for usage errors; 130 when interrupted
+(Ctrl+C or SIGTERM), which stops the runs' process trees first.
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+from .conda_envs import default_environment, discover_environments
+from .config_store import ConfigValueError, convert, infer_from_text, normalize_schema
+from .exec_profiles import ExecProfileStore
+from .history import RunHistory, new_run_id
+from .output import TerminalBuffer
+from .runner import run_script, write_config_snapshot
+from .script_registry import ScriptRegistry, config_filename_for, parse_script
+from .settings import load_settings, state_dir
+from .staging import StagingCache, StagingPlan
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+NONE = "none"
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class UsageError(Exception):
+    """Raised for arguments that cannot be run"""
+
+
+class Reporter:
+    """Writes run output and events to stdout, one whole line at a time"""
+
+    def __init__(self, json_lines, prefix_lines, stream=None):
+        self.json_lines = json_lines
+        self.prefix_lines = prefix_lines
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def event(self, event, **fields):
+        if not self.json_lines:
+            return
+        record = {"event": event}
+        record.update(fields)
+        record["time"] = time.time()
+        self._write(json.dumps(record, default=str) + "\n")
+
+    def message(self, text):
+        """Launcher messages: stderr in text mode, a 'message' event in JSON mode"""
+        if self.json_lines:
+            self.event("message", text=text.rstrip("\n"))
+        else:
+            with self._lock:
+                sys.stderr.write(text)
+                sys.stderr.flush()
+
+    def output_handler(self, job):
+        """on_output callback for run_script()"""
+        if not self.json_lines and not self.prefix_lines:
+            def passthrough(chunk):
+                with self._lock:
+                    self.stream.buffer.write(chunk)
+                    self.stream.flush()
+            return passthrough
+
+        buffer = TerminalBuffer()
+        last_progress = [None]
+
+        def handle(chunk, final=False):
+            if chunk:
+                buffer.feed_bytes(chunk)
+            if final:
+                buffer.finish()
+            drained = buffer.drain()
+            if drained is None:
+                return
+            lines, _, progress = drained
+            for line in lines.splitlines():
+                if self.json_lines:
+                    self.event("line", run_id=job.run_id, script=job.name, text=line)
+                else:
+                    self._write(f"[{job.name}] {line}\n")
+            if progress is not None and progress != last_progress[0]:
+                last_progress[0] = progress
+                self.event("progress", run_id=job.run_id, script=job.name, percent=progress)
+
+        handle.finish = lambda: handle(b'', final=True)
+        return handle
+
+    def _write(self, text):
+        with self._lock:
+            self.stream.write(text)
+            self.stream.flush()
+
+
+class Job:
+    """One script run requested on the command line"""
+
+    def __init__(self, name, path, schema):
+        self.name = name
+        self.path = path
+        self.schema = schema
+        self.run_id = new_run_id(name)
+        self.config = {}
+        self.config_path = None
+        self.status = None
+        self.exit_code = None
+
+
+def _parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or not key.strip():
+            raise UsageError(f"--set expects KEY=VALUE, got '{pair}'")
+        overrides[key.strip()] = value
+    return overrides
+
+
+def _load_config(path):
+    try:
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return {}
+    except yaml.YAMLError as e:
+        raise UsageError(f"Invalid YAML in {path}: {e}")
+    if not isinstance(data, dict):
+        raise UsageError(f"{path} does not hold a mapping")
+    return data
+
+
+def _resolve_script(name, registry):
+    info = registry.get(name)
+    if info is not None:
+        return Job(info.name, info.path, info.schema)
+    path = Path(name)
+    if not path.is_file():
+        raise UsageError(f"Unknown script '{name}' (not in the script directories and not a file)")
+    _, schema = parse_script(path)
+    return Job(path.name, path.resolve(), schema)
+
+
+def _prepare_config(job, config_file, overrides, run_dir):
+    """Fill job.config; write a snapshot when it differs from the script's own file"""
+    own_file = job.path.parent / config_filename_for(job.name)
+    job.config = _load_config(config_file or own_file)
+    specs = normalize_schema(job.schema)
+    for key, text in overrides.items():
+        try:
+            job.config[key] = convert(text, specs[key]["type"]) if key in specs else infer_from_text(text)
+        except ConfigValueError as e:
+            raise UsageError(f"{job.name}: {key}: {e}")
+    if config_file or overrides:
+        job.config_path = write_config_snapshot(job.config, run_dir / "config.yml")
+
+
+def _select_environment(requested, settings):
+    """Conda environment name to run in, or None for the launcher's Python"""
+    if requested == NONE:
+        return None
+    names = [name for name, _ in discover_environments(state_dir(settings) / "conda_envs.json")]
+    if requested is None:
+        return default_environment(names)
+    if requested not in names:
+        raise UsageError(f"Unknown conda environment '{requested}' (found: {', '.join(names) or 'none'})")
+    return requested
+
+
+def _run_job(job, settings, conda_env, exec_profile, staging_cache, reporter, history, cancel_event):
+    run_dir = state_dir(settings, "runs", job.run_id)
+    log_path = run_dir / "output.log"
+    on_output = reporter.output_handler(job)
+    plan = None
+    config_path = job.config_path
+
+    reporter.event("start", run_id=job.run_id, script=job.name, conda_env=conda_env,
+                   exec_profile=exec_profile.name if exec_profile else None, log_path=str(log_path))
+    started = time.time()
+    command = None
+    try:
+        if staging_cache is not None:
+            plan = StagingPlan(staging_cache, job.config, job.schema, on_message=reporter.message)
+            if plan.keys:
+                # A staging error fails the run like any other error; finish() releases the pins
+                config_path = write_config_snapshot(plan.prepare(), run_dir / "staged_config.yml")
+            else:
+                plan = None
+        try:
+            result = run_script(job.path, conda_env, config_path=config_path, log_path=log_path,
+                                on_output=on_output, cancel_event=cancel_event,
+                                grace_seconds=settings["stop"]["grace_seconds"], exec_profile=exec_profile)
+        except FileNotFoundError:
+            if not conda_env:
+                raise
+            reporter.message(f"Could not activate conda environment '{conda_env}', using system Python instead.\n")
+            conda_env = None
+            result = run_script(job.path, config_path=config_path, log_path=log_path,
+                                on_output=on_output, cancel_event=cancel_event,
+                                grace_seconds=settings["stop"]["grace_seconds"], exec_profile=exec_profile)
+        command = result.command
+        job.exit_code = result.returncode
+        if result.cancelled:
+            job.status = "cancelled"
+        else:
+            job.status = "ok" if result.returncode == 0 else "failed"
+    except Exception as e:
+        reporter.message(f"Error running {job.name}: {e}\n")
+        job.status = "failed"
+    finally:
+        if hasattr(on_output, "finish"):
+            on_output.finish()
+        if plan is not None:
+            plan.finish(job.status == "ok")
+    ended = time.time()
+
+    reporter.event("end", run_id=job.run_id, script=job.name, status=job.status, exit_code=job.exit_code,
+                   duration=round(ended - started, 3), log_path=str(log_path))
+    if not reporter.json_lines:
+        reporter.message(f"{job.name}: {job.status} (exit code {job.exit_code}) in {ended - started:.1f} s, "
+                         f"log: {log_path}\n")
+    if history is not None:
+        try:
+            history.record(job.name, job.status, exit_code=job.exit_code, started=started, ended=ended,
+                           config=job.config, conda_env=conda_env, command=command, script_path=job.path,
+                           log_path=log_path, kind="cli", run_id=job.run_id)
+        except Exception as e:
+            reporter.message(f"Could not record run history: {e}\n")
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m launcher",
+        description="Run launcher scripts without the GUI.",
+    )
+    parser.add_argument("scripts", nargs="+", metavar="SCRIPT",
+                        help="script name from the script directories, or a path")
+    parser.add_argument("-e", "--env", help=f"conda environment (default: base or the first found; "
+                                            f"'{NONE}' for the launcher's Python)")
+    parser.add_argument("-c", "--config", type=Path,
+                        help="config file to use instead of <script>_config.yml (single script only)")
+    parser.add_argument("-s", "--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value for this run; may be repeated")
+    parser.add_argument("-p", "--exec-profile",
+                        help=f"execution profile (default: the one attached to the script; '{NONE}' for none)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="scripts run at the same time (default 1)")
+    parser.add_argument("--json", action="store_true", help="write JSON-lines events instead of plain output")
+    parser.add_argument("--stage", action="store_true",
+                        help="stage declared input folders on local disk (see launcher.staging)")
+    parser.add_argument("--no-history", action="store_true", help="do not record the runs in the run history")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    settings = load_settings()
+    reporter = Reporter(args.json, prefix_lines=len(args.scripts) > 1 or args.jobs > 1)
+
+    try:
+        if args.config and len(args.scripts) > 1:
+            raise UsageError("--config can only be used with a single script")
+        if args.config and not args.config.is_file():
+            raise UsageError(f"Config file {args.config} does not exist")
+        overrides = _parse_overrides(args.overrides)
+        registry = ScriptRegistry.from_settings(settings, REPO_DIR,
+                                                cache_file=state_dir(settings, "cache") / "script_index.json")
+        registry.refresh()
+        jobs = [_resolve_script(name, registry) for name in args.scripts]
+        for job in jobs:
+            _prepare_config(job, args.config, overrides, state_dir(settings, "runs", job.run_id))
+        conda_env = _select_environment(args.env, settings)
+        profiles = ExecProfileStore()
+        if args.exec_profile and args.exec_profile != NONE and profiles.get(args.exec_profile) is None:
+            raise UsageError(f"Unknown execution profile '{args.exec_profile}'")
+    except UsageError as e:
+        reporter.event("error", message=str(e))
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    history = None
+    if not args.no_history:
+        try:
+            history = RunHistory(state_dir(settings) / "history.db")
+        except Exception as e:
+            reporter.message(f"Run history unavailable: {e}\n")
+    staging_cache = StagingCache.from_settings(settings, state_dir(settings, "staging")) if args.stage else None
+
+    # Schedulers stop jobs with SIGTERM; treat it like Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+    futures = []
+    for job in jobs:
+        if args.exec_profile:
+            exec_profile = profiles.get(args.exec_profile) if args.exec_profile != NONE else None
+        else:
+            exec_profile = profiles.profile_for(job.name)
+        futures.append(executor.submit(_run_job, job, settings, conda_env, exec_profile,
+                                       staging_cache, reporter, history, cancel_event))
+    interrupted = False
+    try:
+        while not all(f.done() for f in futures):
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        interrupted = True
+        reporter.message("Interrupted, stopping runs...\n")
+        cancel_event.set()
+        for future in futures:
+            future.cancel()
+    executor.shutdown(wait=True)
+    for job, future in zip(jobs, futures):
+        if future.cancelled():
+            continue
+        error = future.exception()
+        if error is not None:
+            reporter.message(f"Error running {job.name}: {error}\n")
+            job.status = "failed"
+    if history is not None:
+        history.close()
+
+    for job in jobs:
+        if job.status is None:
+            job.status = "cancelled"
+    counts = {status: sum(1 for job in jobs if job.status == status) for status in ("ok", "failed", "cancelled")}
+    if interrupted:
+        exit_code = EXIT_INTERRUPTED
+    elif len(jobs) == 1:
+        exit_code = jobs[0].exit_code if jobs[0].exit_code is not None else 1
+    else:
+        exit_code = 0 if counts["ok"] == len(jobs) else 1
+    reporter.event("summary", exit_code=exit_code, **counts)
+    return exit_code
@@ -0,0 +1,181 @@
+"""
+Conda environment discovery without starting conda.
+
+`conda env list` costs seconds of conda startup. The same information is on
+disk: ~/.conda/environments.txt lists every environment conda has created,
+and each envs directory holds one sub-directory per named environment. This
+module reads those directly, caches the result in the launcher state
+directory and only rebuilds it when the mtime of one of those sources
+changes. `conda env list --json` is used only when nothing is found on disk.
+"""
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+ENVIRONMENTS_TXT = Path.home() / ".conda" / "environments.txt"
+
+# Usual install locations, checked in addition to the active conda
+COMMON_ROOTS = [
+    "~/anaconda3", "~/miniconda3", "~/miniforge3", "~/mambaforge",
+    "~/AppData/Local/anaconda3", "~/AppData/Local/miniconda3",
+    "C:/ProgramData/anaconda3", "C:/ProgramData/miniconda3",
+    "/opt/conda", "/opt/anaconda3", "/opt/miniconda3",
+]
+
+
+def _is_env(prefix):
+    return (Path(prefix) / "conda-meta").is_dir()
+
+
+def conda_roots():
+    """Return the base prefixes of the conda installations that can be found"""
+    candidates = []
+    conda_exe = os.environ.get("CONDA_EXE")
+    if conda_exe:
+        # <root>/bin/conda or <root>/Scripts/conda.exe
+        candidates.append(Path(conda_exe).parent.parent)
+    for var in ("CONDA_ROOT", "MAMBA_ROOT_PREFIX"):
+        if os.environ.get(var):
+            candidates.append(Path(os.environ[var]))
+    candidates.extend(Path(p).expanduser() for p in COMMON_ROOTS)
+
+    roots = []
+    for path in candidates:
+        try:
+            path = path.resolve()
+        except OSError:
+            continue
+        if path not in roots and _is_env(path):
+            roots.append(path)
+    return roots
+
+
+def envs_dirs(roots):
+    """Return the directories that hold named environments"""
+    dirs = [root / "envs" for root in roots]
+    dirs.append(Path.home() / ".conda" / "envs")
+    for path in os.environ.get("CONDA_ENVS_PATH", "").split(os.pathsep):
+        if path:
+            dirs.append(Path(path).expanduser())
+    unique = []
+    for path in dirs:
+        if path not in unique:
+            unique.append(path)
+    return unique
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _source_key(roots, dirs):
+    """Mtimes of everything the environment list is derived from"""
+    key = {str(ENVIRONMENTS_TXT): _mtime(ENVIRONMENTS_TXT)}
+    for path in list(roots) + list(dirs):
+        key[str(path)] = _mtime(path)
+    return key
+
+
+def _env_name(prefix, roots, dirs):
+    if prefix in roots:
+        return "base" if prefix == roots[0] else str(prefix)
+    if prefix.parent in dirs:
+        return prefix.name
+    # Environments created with -p have no name, conda shows the path
+    return str(prefix)
+
+
+def read_environments(roots=None):
+    """Read [(name, prefix), ...] from environments.txt and the envs directories"""
+    roots = conda_roots() if roots is None else roots
+    dirs = envs_dirs(roots)
+
+    prefixes = list(roots)
+    try:
+        with open(ENVIRONMENTS_TXT, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    prefixes.append(Path(line.strip()))
+    except OSError:
+        pass
+    for envs_dir in dirs:
+        try:
+            with os.scandir(envs_dir) as entries:
+                prefixes.extend(Path(entry.path) for entry in entries if entry.is_dir())
+        except OSError:
+            continue
+
+    envs = []
+    seen = set()
+    for prefix in prefixes:
+        try:
+            prefix = prefix.resolve()
+        except OSError:
+            continue
+        if prefix in seen or not _is_env(prefix):
+            continue
+        seen.add(prefix)
+        envs.append((_env_name(prefix, roots, dirs), str(prefix)))
+    return envs
+
+
+def list_environments_with_conda(timeout=10):
+    """Fallback: ask conda itself (slow, starts a conda process)"""
+    conda_cmd = os.environ.get("CONDA_EXE") or shutil.which("conda")
+    if not conda_cmd:
+        return []
+    try:
+        result = subprocess.run(
+            [conda_cmd, 'env', 'list', '--json'],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        prefixes = json.loads(result.stdout).get("envs", [])
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"Error getting conda environments: {e}")
+        return []
+    roots = [Path(p) for p in prefixes[:1]]
+    dirs = envs_dirs(roots)
+    return [(_env_name(Path(p), roots, dirs), p) for p in prefixes]
+
+
+def discover_environments(cache_file=None):
+    """Return [(name, prefix), ...], using the on-disk cache when still valid"""
+    roots = conda_roots()
+    key = _source_key(roots, envs_dirs(roots))
+
+    if cache_file is not None:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return [tuple(env) for env in cached["envs"]]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    envs = read_environments(roots)
+    if not envs:
+        envs = list_environments_with_conda()
+
+    if cache_file is not None and envs:
+        try:
+            tmp_file = Path(str(cache_file) + ".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "envs": envs}, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"Could not write conda environment cache: {e}")
+    return envs
+
+
+def default_environment(names):
+    """Environment selected when none was chosen: base, else the first found"""
+    if 'base' in names:
+        return 'base'
+    return names[0] if names else None
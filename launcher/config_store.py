@@ -0,0 +1,285 @@
+"""
+In-memory, typed config model for script config files.
+
+Each <script>_config.yml gets one ConfigStore holding two snapshots: the
+values as saved on disk and the values currently entered in the GUI. Entry
+edits update the store directly, so checking whether the GUI matches the file
+is a dict comparison instead of a re-read of the YAML.
+
+Values are typed using the script's optional CONFIG_SCHEMA (see
+launcher.script_registry). Without a schema a key keeps the type it has in the
+file. Saving writes a temporary file and renames it over the config, so a
+script never reads a half-written config.
+
+ConfigStoreManager hands out one store per file and polls the files in the
+background to pick up edits made outside the launcher.
+"""
+import copy
+import os
+import threading
+from pathlib import Path
+
+import yaml
+
+# Schema types and what the entry text is converted to
+SCHEMA_TYPES = ("str", "int", "float", "bool", "path", "dir", "file", "list")
+PATH_TYPES = ("path", "dir", "file")
+TRUE_WORDS = ("true", "yes", "on", "1")
+FALSE_WORDS = ("false", "no", "off", "0")
+
+
+class ConfigValueError(ValueError):
+    """Raised when entry text cannot be converted to the declared type"""
+
+
+def normalize_schema(schema):
+    """Expand shorthand entries ("key": "int") to {"type": "int"}"""
+    specs = {}
+    for key, spec in (schema or {}).items():
+        if isinstance(spec, str):
+            spec = {"type": spec}
+        elif not isinstance(spec, dict):
+            spec = {}
+        spec = dict(spec)
+        if spec.get("type") not in SCHEMA_TYPES:
+            spec["type"] = "str"
+        specs[key] = spec
+    return specs
+
+
+def schema_defaults(schema):
+    """Config dict with every schema key set to its default (or None)"""
+    return {key: spec.get("default") for key, spec in normalize_schema(schema).items()}
+
+
+def normalize_path(text):
+    """Clean up a pasted or dropped path: quotes, braces, ~ and slashes"""
+    text = text.strip().strip('"\'{}').strip()
+    if not text:
+        return None
+    return os.path.expanduser(text).replace("\\", "/")
+
+
+def convert(value, type_name):
+    """Convert text or a loaded YAML value to the given schema type"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if type_name == "str":
+        return value if isinstance(value, str) else str(value)
+    if type_name in PATH_TYPES:
+        return normalize_path(str(value))
+    if type_name == "list":
+        if isinstance(value, list):
+            return value
+        loaded = yaml.safe_load(value) if isinstance(value, str) else value
+        return loaded if isinstance(loaded, list) else [loaded]
+    if type_name == "bool":
+        if isinstance(value, bool):
+            return value
+        word = str(value).strip().lower()
+        if word in TRUE_WORDS:
+            return True
+        if word in FALSE_WORDS:
+            return False
+        raise ConfigValueError(f"'{value}' is not true/false")
+    try:
+        if type_name == "int":
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError
+            return int(str(value).strip()) if not isinstance(value, (int, float)) else int(value)
+        if type_name == "float":
+            return float(value)
+    except ValueError:
+        raise ConfigValueError(f"'{value}' is not a valid {type_name}")
+    return value
+
+
+def infer_type(value):
+    """Schema type matching a value loaded from YAML"""
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, list):
+        return "list"
+    return "str"
+
+
+def infer_from_text(text):
+    """Type a new, schema-less value: true/false, a decimal int or a float
+
+    Anything else stays a string. This is stricter than YAML on purpose:
+    YAML reads "0123" as 83, "12:30" as 750 and "no" as False.
+    """
+    stripped = text.strip()
+    if stripped.lower() in ("true", "false"):
+        return stripped.lower() == "true"
+    try:
+        return int(stripped, 10)
+    except ValueError:
+        pass
+    try:
+        return float(stripped)
+    except ValueError:
+        return text
+
+
+def format_value(value):
+    """Text shown in an entry for a typed value"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return yaml.safe_dump(value, default_flow_style=True).strip()
+    return str(value)
+
+
+class ConfigStore:
+    """Saved and edited values of one config file"""
+
+    def __init__(self, path, schema=None):
+        self.path = Path(path)
+        self.schema = normalize_schema(schema)
+        self.saved = {}
+        self.values = {}
+        self.errors = {}
+        self._file_state = None
+        self._lock = threading.RLock()
+        self.load()
+
+    @property
+    def dirty(self):
+        """True if the GUI values differ from the file"""
+        with self._lock:
+            return bool(self.errors) or self.values != self.saved
+
+    def changed_keys(self):
+        with self._lock:
+            keys = set(self.values) | set(self.saved)
+            return sorted(k for k in keys if self.values.get(k) != self.saved.get(k))
+
+    def type_of(self, key):
+        spec = self.schema.get(key)
+        if spec is not None:
+            return spec["type"]
+        if self.saved.get(key) is not None:
+            return infer_type(self.saved[key])
+        return None
+
+    def load(self):
+        """(Re)read the file; unsaved edits are kept"""
+        with self._lock:
+            try:
+                with open(self.path, 'r') as f:
+                    data = yaml.safe_load(f) or {}
+            except FileNotFoundError:
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            self._file_state = self._stat()
+
+            saved = {}
+            for key, value in data.items():
+                type_name = self.schema.get(key, {}).get("type")
+                try:
+                    saved[key] = convert(value, type_name) if type_name else value
+                except ConfigValueError:
+                    saved[key] = value
+            # Show declared keys even if the file does not have them yet
+            for key, spec in self.schema.items():
+                saved.setdefault(key, spec.get("default"))
+
+            was_dirty = self.dirty
+            previous_saved = self.saved
+            self.saved = saved
+            if not was_dirty:
+                self.values = copy.deepcopy(saved)
+            else:
+                # Keep edits, but follow the file for keys that were not edited
+                for key, value in saved.items():
+                    if self.values.get(key) == previous_saved.get(key):
+                        self.values[key] = copy.deepcopy(value)
+
+    def set_text(self, key, text):
+        """Update a value from entry text"""
+        with self._lock:
+            type_name = self.type_of(key)
+            try:
+                if type_name is None:
+                    value = infer_from_text(text) if text.strip() else None
+                else:
+                    value = convert(text, type_name)
+            except ConfigValueError as e:
+                self.errors[key] = str(e)
+                return
+            self.errors.pop(key, None)
+            self.values[key] = value
+
+    def save(self):
+        """Write the edited values atomically"""
+        with self._lock:
+            if self.errors:
+                raise ConfigValueError("; ".join(f"{k}: {e}" for k, e in self.errors.items()))
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, 'w') as f:
+                yaml.dump(self.values, f, default_flow_style=False)
+            os.replace(tmp_path, self.path)
+            self.saved = copy.deepcopy(self.values)
+            self._file_state = self._stat()
+
+    def dump_text(self):
+        """YAML text of the saved values"""
+        with self._lock:
+            return yaml.dump(self.saved, default_flow_style=False)
+
+    def changed_on_disk(self):
+        """True if the file was modified since it was last loaded or saved"""
+        return self._stat() != self._file_state
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigStoreManager:
+    """One ConfigStore per config file, with a background file watcher"""
+
+    def __init__(self):
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def get(self, path, schema=None):
+        """Store for a config file, created on first use"""
+        path = Path(path)
+        with self._lock:
+            store = self._stores.get(path)
+            if store is None:
+                store = ConfigStore(path, schema)
+                self._stores[path] = store
+            elif schema is not None and normalize_schema(schema) != store.schema:
+                # The script's declared schema changed
+                store.schema = normalize_schema(schema)
+                store.load()
+            return store
+
+    def start_watching(self, interval, on_change):
+        """Reload stores whose files change on disk, calling on_change(store)"""
+        def watch():
+            while not self._stop.wait(interval):
+                with self._lock:
+                    stores = list(self._stores.values())
+                for store in stores:
+                    if store.changed_on_disk():
+                        store.load()
+                        on_change(store)
+        threading.Thread(target=watch, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,258 @@
+"""
+Named execution profiles.
+
+A profile describes how a script's process is started, so runs that share a
+machine do not fight over cores and memory:
+
+    profiles:
+      gdal_heavy:
+        env:                        # extra environment variables
+          GDAL_CACHEMAX: "2048"
+          GDAL_NUM_THREADS: ALL_CPUS
+        threads: 4                  # OMP/MKL/OpenBLAS/NumExpr thread counts
+        cpu_affinity: "0-3"         # CPUs the run may use
+        nice: 10                    # POSIX nice increment / lower priority on Windows
+        limits:
+          memory_mb: 16000          # address space (POSIX) / job memory (Windows)
+          open_files: 4096          # POSIX only
+          cpu_seconds: 36000        # POSIX only
+    scripts:
+      gdal_update_geotrans.py: gdal_heavy
+
+Profiles live in exec_profiles.yml next to drag_drop.py. On POSIX affinity,
+nice and limits are applied by a small exec wrapper (launcher/_exec_shim.py)
+before the command runs, so they are inherited by conda's python and its
+children; on Windows they become limits of the run's job object.
+"""
+import copy
+import json
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+PROFILES_FILE = Path(__file__).parent.parent / "exec_profiles.yml"
+EXEC_SHIM = Path(__file__).parent / "_exec_shim.py"
+
+THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+               "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+LIMIT_KEYS = ("memory_mb", "open_files", "cpu_seconds")
+
+# Windows priority classes by nice level
+_PRIORITY_CLASSES = (
+    (15, 0x40),    # IDLE_PRIORITY_CLASS
+    (5, 0x4000),   # BELOW_NORMAL_PRIORITY_CLASS
+    (0, 0x20),     # NORMAL_PRIORITY_CLASS
+)
+
+
+class ExecProfileError(ValueError):
+    """Raised for invalid profile settings"""
+
+
+def parse_cpu_list(text):
+    """'0-3,6' -> [0, 1, 2, 3, 6]"""
+    if text is None or text == "":
+        return None
+    if isinstance(text, int):
+        return [text]
+    if isinstance(text, (list, tuple)):
+        return sorted({int(c) for c in text})
+    cpus = set()
+    for part in str(text).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, end = part.split("-", 1)
+                cpus.update(range(int(start), int(end) + 1))
+            else:
+                cpus.add(int(part))
+        except ValueError:
+            raise ExecProfileError(f"'{part}' is not a CPU number or range")
+    return sorted(cpus) or None
+
+
+def format_cpu_list(cpus):
+    """[0, 1, 2, 3, 6] -> '0-3,6'"""
+    if not cpus:
+        return ""
+    parts = []
+    start = previous = cpus[0]
+    for cpu in list(cpus[1:]) + [None]:
+        if cpu is not None and cpu == previous + 1:
+            previous = cpu
+            continue
+        parts.append(str(start) if start == previous else f"{start}-{previous}")
+        start = previous = cpu
+    return ",".join(parts)
+
+
+class ExecProfile:
+    """Environment, affinity, priority and limits for starting a run"""
+
+    def __init__(self, name, env=None, threads=None, cpu_affinity=None, nice=None, limits=None):
+        self.name = name
+        self.env = {str(k): str(v) for k, v in (env or {}).items()}
+        self.threads = int(threads) if threads not in (None, "") else None
+        self.cpu_affinity = parse_cpu_list(cpu_affinity)
+        self.nice = int(nice) if nice not in (None, "") else None
+        self.limits = {k: int(v) for k, v in (limits or {}).items() if k in LIMIT_KEYS and v not in (None, "")}
+
+    @classmethod
+    def from_dict(cls, name, data):
+        data = data or {}
+        try:
+            return cls(name, data.get("env"), data.get("threads"), data.get("cpu_affinity"),
+                       data.get("nice"), data.get("limits"))
+        except (TypeError, ValueError) as e:
+            raise ExecProfileError(f"Profile '{name}': {e}")
+
+    def to_dict(self):
+        data = {}
+        if self.env:
+            data["env"] = dict(self.env)
+        if self.threads is not None:
+            data["threads"] = self.threads
+        if self.cpu_affinity:
+            data["cpu_affinity"] = format_cpu_list(self.cpu_affinity)
+        if self.nice is not None:
+            data["nice"] = self.nice
+        if self.limits:
+            data["limits"] = dict(self.limits)
+        return data
+
+    @property
+    def process_settings(self):
+        """True if the profile changes more than environment variables"""
+        return bool(self.cpu_affinity or self.nice or self.limits)
+
+    def environment(self):
+        """Environment variables to add for a run"""
+        env = {}
+        if self.threads is not None:
+            for var in THREAD_VARS:
+                env[var] = str(self.threads)
+        env.update(self.env)
+        return env
+
+    def wrapper_args(self):
+        """Command prefix applying affinity, nice and rlimits on POSIX, or []
+
+        The prefix runs launcher/_exec_shim.py, which sets them on itself and
+        execs the real command.
+        """
+        if os.name == 'nt' or not self.process_settings:
+            return []
+        settings = {"cpus": self.cpu_affinity, "nice": self.nice, "limits": dict(self.limits)}
+        return [sys.executable, str(EXEC_SHIM), json.dumps(settings), "--"]
+
+    def job_limits(self):
+        """Job object limits for Windows (see process_tree.TreePopen)"""
+        limits = {}
+        if self.cpu_affinity:
+            limits["affinity_mask"] = sum(1 << cpu for cpu in self.cpu_affinity)
+        if self.nice:
+            for level, priority_class in _PRIORITY_CLASSES:
+                if self.nice >= level:
+                    limits["priority_class"] = priority_class
+                    break
+        if "memory_mb" in self.limits:
+            limits["job_memory"] = self.limits["memory_mb"] * 1024 * 1024
+        return limits
+
+    def describe(self):
+        parts = []
+        if self.threads is not None:
+            parts.append(f"{self.threads} threads")
+        if self.cpu_affinity:
+            parts.append(f"CPUs {format_cpu_list(self.cpu_affinity)}")
+        if self.nice:
+            parts.append(f"nice {self.nice}")
+        if "memory_mb" in self.limits:
+            parts.append(f"memory {self.limits['memory_mb']} MB")
+        if self.env:
+            parts.append(", ".join(f"{k}={v}" for k, v in self.env.items()))
+        return "; ".join(parts) or "no changes"
+
+
+class ExecProfileStore:
+    """Profiles and their script assignments in exec_profiles.yml"""
+
+    def __init__(self, path=PROFILES_FILE):
+        self.path = Path(path)
+        self.profiles = {}
+        self.scripts = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            data = {}
+        except yaml.YAMLError as e:
+            print(f"Error loading {self.path.name}: {e}")
+            data = {}
+        self.profiles = {}
+        for name, spec in (data.get("profiles") or {}).items():
+            try:
+                self.profiles[str(name)] = ExecProfile.from_dict(str(name), spec)
+            except ExecProfileError as e:
+                print(e)
+        self.scripts = {str(k): str(v) for k, v in (data.get("scripts") or {}).items() if v}
+
+    def _header(self):
+        """Comment lines at the top of the file, kept when it is rewritten"""
+        header = []
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    if line.strip() and not line.lstrip().startswith("#"):
+                        break
+                    header.append(line)
+        except FileNotFoundError:
+            pass
+        return "".join(header)
+
+    def save(self):
+        """Write the profiles atomically, keeping the file's leading comments"""
+        data = {
+            "profiles": {name: profile.to_dict() for name, profile in self.profiles.items()},
+            "scripts": copy.deepcopy(self.scripts),
+        }
+        header = self._header()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(header)
+            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, self.path)
+
+    def names(self):
+        return list(self.profiles)
+
+    def get(self, name):
+        return self.profiles.get(name) if name else None
+
+    def profile_for(self, script_name):
+        """Profile attached to a script, or None"""
+        return self.get(self.scripts.get(script_name))
+
+    def attach(self, script_name, profile_name):
+        """Attach a profile to a script (None detaches) and save"""
+        if profile_name:
+            self.scripts[script_name] = profile_name
+        else:
+            self.scripts.pop(script_name, None)
+        self.save()
+
+    def put(self, profile):
+        self.profiles[profile.name] = profile
+        self.save()
+
+    def delete(self, name):
+        self.profiles.pop(name, None)
+        self.scripts = {script: p for script, p in self.scripts.items() if p != name}
+        self.save()
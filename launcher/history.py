@@ -0,0 +1,180 @@
+"""
+Run history.
+
+Every run the launcher starts (single runs, sweep variants, workflow steps)
+is recorded in a SQLite database in the state directory: script, a hash of
+the script source, conda env, command, config snapshot, start and end time,
+exit code, status and, when the run was monitored, its resource peaks. The
+output of single runs is kept in <state_dir>/runs/<run_id>/output.log.
+
+query() filters the history; compare_durations() puts each run's duration
+next to the median of the earlier successful runs of the same script, which
+is where a slowdown in a pipeline script shows up first.
+"""
+import hashlib
+import json
+import sqlite3
+import statistics
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    kind TEXT NOT NULL DEFAULT 'run',
+    script TEXT NOT NULL,
+    script_hash TEXT,
+    conda_env TEXT,
+    command TEXT,
+    config TEXT,
+    started REAL,
+    ended REAL,
+    exit_code INTEGER,
+    status TEXT,
+    wall_seconds REAL,
+    cpu_seconds REAL,
+    peak_rss_bytes INTEGER,
+    read_bytes INTEGER,
+    write_bytes INTEGER,
+    log_path TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_script_started ON runs (script, started);
+"""
+
+COLUMNS = ("run_id", "kind", "script", "script_hash", "conda_env", "command", "config",
+           "started", "ended", "exit_code", "status", "wall_seconds", "cpu_seconds",
+           "peak_rss_bytes", "read_bytes", "write_bytes", "log_path")
+STATUSES = ("ok", "failed", "cancelled", "cached")
+RESOURCE_KEYS = ("wall_seconds", "cpu_seconds", "peak_rss_bytes", "read_bytes", "write_bytes")
+
+# Runs whose duration is this much above the median of earlier runs are flagged
+SLOWER_THRESHOLD = 0.2
+
+
+def script_hash(path):
+    """SHA-256 of a script's source, or None if it cannot be read"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+_issued_ids = set()
+_issued_lock = threading.Lock()
+
+
+def new_run_id(script_name):
+    """Unique, sortable id for a run, also used as its log directory name"""
+    stem = str(script_name).rsplit('.py', 1)[0]
+    run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000) % 1000:03d}_{stem}"
+    # Runs of the same script started in the same millisecond (batch runs)
+    with _issued_lock:
+        unique_id, n = run_id, 1
+        while unique_id in _issued_ids:
+            n += 1
+            unique_id = f"{run_id}_{n}"
+        _issued_ids.add(unique_id)
+    return unique_id
+
+
+class RunHistory:
+    """SQLite-backed record of runs, safe to use from worker threads"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+
+    def record(self, script, status, exit_code=None, started=None, ended=None, config=None,
+               conda_env=None, command=None, script_path=None, resources=None,
+               log_path=None, kind="run", run_id=None):
+        """Add a finished run; started/ended are epoch seconds"""
+        row = {
+            "run_id": run_id,
+            "kind": kind,
+            "script": script,
+            "script_hash": script_hash(script_path) if script_path else None,
+            "conda_env": conda_env,
+            "command": command,
+            "config": json.dumps(config, sort_keys=True, default=str) if config is not None else None,
+            "started": started,
+            "ended": ended,
+            "exit_code": exit_code,
+            "status": status,
+            "log_path": str(log_path) if log_path else None,
+        }
+        for key in RESOURCE_KEYS:
+            row[key] = (resources or {}).get(key)
+        if row["wall_seconds"] is None and started is not None and ended is not None:
+            row["wall_seconds"] = ended - started
+        with self._lock:
+            cursor = self._db.execute(
+                f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [row[c] for c in COLUMNS],
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def scripts(self):
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT DISTINCT script FROM runs ORDER BY script")]
+
+    def query(self, script=None, status=None, text=None, kind=None, limit=200):
+        """Most recent runs first, optionally filtered
+
+        text matches the conda env, the command or the config snapshot.
+        """
+        clauses, params = [], []
+        if script:
+            clauses.append("script = ?")
+            params.append(script)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if text:
+            clauses.append("(conda_env LIKE ? OR command LIKE ? OR config LIKE ?)")
+            params.extend([f"%{text}%"] * 3)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM runs {where} ORDER BY started DESC, id DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def compare_durations(self, runs, window=10):
+        """Add 'baseline_seconds' and 'change' to each run
+
+        The baseline is the median duration of up to `window` earlier
+        successful runs of the same script; change is the relative difference
+        (0.35 = 35% slower). Both are None when there is nothing to compare.
+        """
+        with self._lock:
+            for run in runs:
+                run["baseline_seconds"] = run["change"] = None
+                if run["wall_seconds"] is None or run["status"] != "ok":
+                    continue
+                earlier = [r[0] for r in self._db.execute(
+                    "SELECT wall_seconds FROM runs WHERE script = ? AND status = 'ok' "
+                    "AND wall_seconds IS NOT NULL AND (started < ? OR (started = ? AND id < ?)) "
+                    "ORDER BY started DESC LIMIT ?",
+                    (run["script"], run["started"], run["started"], run["id"], window),
+                )]
+                if earlier:
+                    baseline = statistics.median(earlier)
+                    run["baseline_seconds"] = baseline
+                    if baseline > 0:
+                        run["change"] = run["wall_seconds"] / baseline - 1
+        return runs
+
+    def close(self):
+        with self._lock:
+            self._db.close()
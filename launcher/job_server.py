@@ -0,0 +1,532 @@
+"""
+Shared job server.
+
+Several launchers pointed at one processing workstation oversubscribe it when
+each starts its own runs. The job server owns the runs instead: it accepts
+jobs over HTTP on localhost, keeps one queue per user and starts at most
+max_workers runs at a time. A free worker goes to the user with the fewest
+running jobs (ties: whoever started a job least recently), so one user's
+batch cannot starve everyone else. Each run gets a config snapshot and a log
+in the server's state directory and is recorded in its run history.
+
+Start it on the workstation with
+
+    python -m launcher.job_server [--host 127.0.0.1] [--port 8765] [--workers 2]
+
+and set job_server.url in launcher_settings.yml to offer "Run on job server"
+in the GUI. Only scripts from the server's own script directories can be run.
+Users are identified by the name the client sends; the server is meant for
+trusted users on one machine and listens on localhost by default.
+
+API (JSON unless noted):
+    POST /jobs                       {"script", "user", "config", "conda_env", "exec_profile"}
+    GET  /jobs                       all known jobs
+    GET  /jobs/<id>                  one job
+    GET  /jobs/<id>/output?offset=N&wait=S
+                                     raw log bytes from offset N, waiting up to S
+                                     seconds for new output; X-Next-Offset and
+                                     X-Job-Status headers describe the result
+    POST /jobs/<id>/cancel           remove a queued job or stop a running one
+
+POST requests must have Content-Type: application/json and no Origin header,
+so a web page open in a browser on the machine cannot submit or cancel jobs.
+
+JobClient wraps the API; RemoteJob makes a submitted job look like the Popen
+the GUI reads output from.
+"""
+import argparse
+import json
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .conda_envs import discover_environments
+from .exec_profiles import ExecProfileStore
+from .history import RunHistory, new_run_id
+from .runner import run_script, write_config_snapshot
+from .script_registry import ScriptRegistry
+from .settings import load_settings, state_dir
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+FINISHED = ("ok", "failed", "cancelled")
+MAX_OUTPUT_CHUNK = 1024 * 1024
+
+
+class JobServerError(Exception):
+    """Raised by JobClient when the server refuses a request or is unreachable"""
+
+
+class Job:
+    """A submitted run and its state"""
+
+    def __init__(self, job_id, user, script, config, conda_env, exec_profile, run_dir):
+        self.job_id = job_id
+        self.user = user
+        self.script = script
+        self.config = config
+        self.conda_env = conda_env
+        self.exec_profile = exec_profile
+        self.run_dir = run_dir
+        self.log_path = run_dir / "output.log"
+        self.status = "queued"
+        self.exit_code = None
+        self.submitted = time.time()
+        self.started = None
+        self.ended = None
+        self.log_size = 0
+        self.cancel_event = threading.Event()
+
+    def to_dict(self, position=None):
+        return {
+            "id": self.job_id,
+            "user": self.user,
+            "script": self.script,
+            "conda_env": self.conda_env,
+            "exec_profile": self.exec_profile,
+            "status": self.status,
+            "exit_code": self.exit_code,
+            "submitted": self.submitted,
+            "started": self.started,
+            "ended": self.ended,
+            "log_path": str(self.log_path),
+            "queue_position": position,
+        }
+
+
+class JobQueue:
+    """Per-user FIFO queues served fairly by a bounded number of workers"""
+
+    def __init__(self, registry, max_workers=2, keep_jobs=500, settings=None, history=None,
+                 exec_profiles=None, conda_envs=None):
+        self.registry = registry
+        self.conda_envs = conda_envs
+        self.max_workers = max(1, int(max_workers))
+        self.keep_jobs = keep_jobs
+        self.settings = settings or load_settings()
+        self.history = history
+        self.exec_profiles = exec_profiles
+        self.jobs = {}
+        self._queues = {}        # user -> deque of queued jobs
+        self._running = {}       # user -> number of running jobs
+        self._last_start = {}    # user -> time their last job started
+        self._changed = threading.Condition()
+        self._stop = False
+
+    def start(self):
+        threading.Thread(target=self._dispatch, daemon=True).start()
+        return self
+
+    def stop(self):
+        with self._changed:
+            self._stop = True
+            for job in self.jobs.values():
+                job.cancel_event.set()
+            self._changed.notify_all()
+
+    def submit(self, user, script, config=None, conda_env=None, exec_profile=None):
+        info = self.registry.get(script)
+        if info is None:
+            raise ValueError(f"Unknown script '{script}'")
+        if config is not None and not isinstance(config, dict):
+            raise ValueError("config must be a mapping")
+        if conda_env and self.conda_envs is not None and conda_env not in self.conda_envs:
+            raise ValueError(f"Unknown conda environment '{conda_env}'")
+        if exec_profile and (self.exec_profiles is None or self.exec_profiles.get(exec_profile) is None):
+            raise ValueError(f"Unknown execution profile '{exec_profile}'")
+        job_id = new_run_id(script)
+        job = Job(job_id, str(user or "anonymous"), script, config, conda_env or None, exec_profile,
+                  state_dir(self.settings, "runs", job_id))
+        with self._changed:
+            self.jobs[job_id] = job
+            self._queues.setdefault(job.user, deque()).append(job)
+            self._prune()
+            self._changed.notify_all()
+        return job
+
+    def cancel(self, job_id):
+        with self._changed:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == "queued":
+                self._queues[job.user].remove(job)
+                job.status = "cancelled"
+                job.ended = time.time()
+            job.cancel_event.set()
+            self._changed.notify_all()
+            return job
+
+    def describe(self, job_id=None):
+        """Dict of one job (None if unknown), or a list of all jobs"""
+        with self._changed:
+            if job_id is None:
+                return [job.to_dict(self._position(job)) for job in self.jobs.values()]
+            job = self.jobs.get(job_id)
+            return job.to_dict(self._position(job)) if job is not None else None
+
+    def _position(self, job):
+        """Jobs ahead of a queued job in its user's queue"""
+        queue = self._queues.get(job.user)
+        if job.status != "queued" or not queue:
+            return None
+        return list(queue).index(job)
+
+    def wait_for_output(self, job, offset, timeout):
+        """Block until the log grows past offset or the job finishes"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while job.log_size <= offset and job.status not in FINISHED and not self._stop:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+
+    def _next_job(self):
+        """Queued job of the user with the fewest running jobs"""
+        users = [user for user, queue in self._queues.items() if queue]
+        if not users:
+            return None
+        user = min(users, key=lambda u: (self._running.get(u, 0), self._last_start.get(u, 0)))
+        return self._queues[user].popleft()
+
+    def _dispatch(self):
+        with self._changed:
+            while not self._stop:
+                running = sum(self._running.values())
+                job = self._next_job() if running < self.max_workers else None
+                if job is None:
+                    self._changed.wait()
+                    continue
+                job.status = "running"
+                job.started = time.time()
+                self._running[job.user] = self._running.get(job.user, 0) + 1
+                self._last_start[job.user] = job.started
+                threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        info = self.registry.get(job.script)
+        status, exit_code = "failed", None
+        job.run_dir.mkdir(parents=True, exist_ok=True)
+        with open(job.log_path, 'ab', buffering=0) as log_file:
+            def on_output(chunk):
+                log_file.write(chunk)
+                with self._changed:
+                    job.log_size += len(chunk)
+                    self._changed.notify_all()
+
+            try:
+                if info is None:
+                    raise ValueError(f"Script '{job.script}' is no longer available")
+                config_path = None
+                if job.config is not None:
+                    config_path = write_config_snapshot(job.config, job.run_dir / "config.yml")
+                if self.exec_profiles is None:
+                    profile = None
+                elif job.exec_profile:
+                    profile = self.exec_profiles.get(job.exec_profile)
+                else:
+                    profile = self.exec_profiles.profile_for(job.script)
+                result = run_script(info.path, job.conda_env, config_path=config_path, on_output=on_output,
+                                    cancel_event=job.cancel_event, cwd=info.path.parent,
+                                    grace_seconds=self.settings["stop"]["grace_seconds"], exec_profile=profile)
+                exit_code = result.returncode
+                if result.cancelled:
+                    status = "cancelled"
+                elif result.returncode == 0:
+                    status = "ok"
+            except Exception as e:
+                on_output(f"\nError running job: {e}\n".encode())
+        with self._changed:
+            job.status = status
+            job.exit_code = exit_code
+            job.ended = time.time()
+            self._running[job.user] -= 1
+            self._changed.notify_all()
+        if self.history is not None:
+            try:
+                self.history.record(job.script, status, exit_code=exit_code, started=job.started,
+                                    ended=job.ended, config=job.config, conda_env=job.conda_env,
+                                    script_path=info.path if info else None, log_path=job.log_path,
+                                    kind="server", run_id=job.job_id)
+            except Exception as e:
+                print(f"Could not record run history: {e}")
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond keep_jobs (their logs stay on disk)"""
+        finished = [job for job in self.jobs.values() if job.status in FINISHED]
+        for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job.job_id]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP front end of a JobQueue (server.queue)"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send_json({"error": message}, status)
+
+    def _job(self, job_id):
+        job = self.server.queue.jobs.get(job_id)
+        if job is None:
+            self._error(404, f"No job '{job_id}'")
+        return job
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        queue = self.server.queue
+        if parts == ["jobs"]:
+            self._send_json(queue.describe())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job is not None:
+                self._send_json(queue.describe(job.job_id))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "output":
+            job = self._job(parts[1])
+            if job is not None:
+                self._send_output(job, urllib.parse.parse_qs(url.query))
+        else:
+            self._error(404, "Not found")
+
+    def _send_output(self, job, query):
+        try:
+            offset = int(query.get("offset", ["0"])[0])
+            wait = min(float(query.get("wait", ["0"])[0]), 30.0)
+        except ValueError:
+            self._error(400, "offset and wait must be numbers")
+            return
+        if offset < 0:
+            self._error(400, "offset must not be negative")
+            return
+        self.server.queue.wait_for_output(job, offset, wait)
+        data = b''
+        try:
+            with open(job.log_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(MAX_OUTPUT_CHUNK)
+        except FileNotFoundError:
+            pass
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Next-Offset", str(offset + len(data)))
+        self.send_header("X-Job-Status", job.status)
+        self.send_header("X-Exit-Code", "" if job.exit_code is None else str(job.exit_code))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _from_browser(self):
+        """Answer and return True for a POST a web page could have sent"""
+        if self.headers.get("Origin") is not None:
+            self._error(403, "Requests from web pages are not accepted")
+            return True
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self._error(415, "Content-Type must be application/json")
+            return True
+        return False
+
+    def do_POST(self):
+        if self._from_browser():
+            return
+        parts = [p for p in urllib.parse.urlsplit(self.path).path.split("/") if p]
+        queue = self.server.queue
+        if parts == ["jobs"]:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict) or not request.get("script"):
+                    raise ValueError("a script is required")
+                job = queue.submit(request.get("user"), request["script"], request.get("config"),
+                                   request.get("conda_env"), request.get("exec_profile"))
+            except ValueError as e:
+                self._error(400, str(e))
+                return
+            self._send_json(queue.describe(job.job_id), 201)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel":
+            if queue.cancel(parts[1]) is None:
+                self._error(404, f"No job '{parts[1]}'")
+            else:
+                self._send_json(queue.describe(parts[1]))
+        else:
+            self._error(404, "Not found")
+
+
+class JobServer(ThreadingHTTPServer):
+    """HTTP server owning a JobQueue"""
+
+    daemon_threads = True
+
+    def __init__(self, queue, host="127.0.0.1", port=8765):
+        self.queue = queue
+        super().__init__((host, port), _Handler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class JobClient:
+    """Client for a job server URL"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, data=None, timeout=None):
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(self.url + path, data=body, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            return urllib.request.urlopen(request, timeout=timeout or self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error")
+            except ValueError:
+                message = None
+            raise JobServerError(message or f"Job server returned HTTP {e.code}")
+        except OSError as e:
+            raise JobServerError(f"Job server at {self.url} is unreachable: {e}")
+
+    def _json(self, method, path, data=None):
+        with self._request(method, path, data) as response:
+            return json.loads(response.read())
+
+    def submit(self, script, user, config=None, conda_env=None, exec_profile=None):
+        """Queue a run; returns the job as a dict"""
+        return self._json("POST", "/jobs", {"script": script, "user": user, "config": config,
+                                            "conda_env": conda_env, "exec_profile": exec_profile})
+
+    def job(self, job_id):
+        return self._json("GET", f"/jobs/{job_id}")
+
+    def jobs(self):
+        return self._json("GET", "/jobs")
+
+    def cancel(self, job_id):
+        return self._json("POST", f"/jobs/{job_id}/cancel", {})
+
+    def output(self, job_id, offset=0, wait=10):
+        """(data, next_offset, status, exit_code) of a job's log from offset"""
+        path = f"/jobs/{job_id}/output?offset={offset}&wait={wait}"
+        with self._request("GET", path, timeout=self.timeout + wait) as response:
+            data = response.read()
+            exit_code = response.headers.get("X-Exit-Code")
+            return (data, int(response.headers["X-Next-Offset"]), response.headers["X-Job-Status"],
+                    int(exit_code) if exit_code else None)
+
+
+class _RemoteOutput:
+    """Binary stream over a job's log; read() returns b'' once the job is done"""
+
+    def __init__(self, remote):
+        self.remote = remote
+
+    def read(self, size=-1):
+        return self.remote._read()
+
+
+class RemoteJob:
+    """A job on the server, exposing the Popen interface the GUI uses
+
+    stdout.read() long-polls the job's output; terminate() and kill() cancel
+    the job (the server stops its process tree). There is no local pid.
+    """
+
+    def __init__(self, client, job):
+        self.client = client
+        self.job_id = job["id"]
+        self.status = job["status"]
+        self.pid = None
+        self.returncode = None
+        self.stdout = _RemoteOutput(self)
+        self._offset = 0
+        self._exited = threading.Event()
+
+    def _read(self):
+        while not self._exited.is_set():
+            data, self._offset, self.status, exit_code = self.client.output(self.job_id, self._offset)
+            if data:
+                return data
+            if self.status in FINISHED:
+                self.returncode = exit_code if exit_code is not None else 1
+                self._exited.set()
+        return b''
+
+    def poll(self):
+        if self.returncode is None:
+            try:
+                job = self.client.job(self.job_id)
+            except JobServerError:
+                return None
+            self.status = job["status"]
+            if self.status in FINISHED:
+                self.returncode = job["exit_code"] if job["exit_code"] is not None else 1
+                self._exited.set()
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(f"job {self.job_id}", timeout)
+            self._exited.wait(0.5)
+        return self.returncode
+
+    def terminate(self):
+        self.client.cancel(self.job_id)
+
+    def kill(self):
+        self.client.cancel(self.job_id)
+
+
+def main(argv=None):
+    settings = load_settings()
+    server_settings = settings["job_server"]
+    parser = argparse.ArgumentParser(prog="python -m launcher.job_server",
+                                     description="Run launcher jobs for several users from one queue.")
+    parser.add_argument("--host", default=server_settings["host"])
+    parser.add_argument("--port", type=int, default=server_settings["port"])
+    parser.add_argument("--workers", type=int, default=server_settings["max_workers"],
+                        help="runs started at the same time")
+    args = parser.parse_args(argv)
+
+    registry = ScriptRegistry.from_settings(settings, REPO_DIR,
+                                            cache_file=state_dir(settings, "cache") / "script_index.json")
+    registry.refresh()
+    registry.start_watching(settings["scripts"]["poll_seconds"], lambda names: None)
+    known_envs = [name for name, _ in discover_environments(state_dir(settings) / "conda_envs.json")]
+    queue = JobQueue(registry, args.workers, server_settings["keep_jobs"], settings,
+                     history=RunHistory(state_dir(settings) / "history.db"),
+                     exec_profiles=ExecProfileStore(), conda_envs=known_envs or None).start()
+    server = JobServer(queue, args.host, args.port)
+    print(f"Job server on {server.url} with {queue.max_workers} workers; "
+          f"{len(registry.names())} scripts, conda environments: {', '.join(known_envs) or 'none'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
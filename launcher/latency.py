@@ -0,0 +1,244 @@
+"""
+Event-loop latency instrumentation.
+
+When the launcher freezes during a run it is not obvious why: output inserts,
+a popup being built, or a clipboard self.update(). A LatencyMonitor measures
+this from three sides:
+
+- A heartbeat after() callback that should fire every heartbeat_ms. How late
+  it fires is the event-loop lag the user feels.
+- Timed handlers: methods decorated with @instrumented record how long each
+  call took (per name: count, mean, max).
+- A watchdog thread that notices when the heartbeat is overdue and takes
+  stack samples of the main thread while it is blocked. The samples show
+  where a stall happens even in code that is not instrumented.
+
+Every stall or handler call that takes slow_ms or longer is appended to a
+log file with its stack samples, and stop() writes a summary with the
+slowest events. Nothing is measured unless the monitor is running.
+
+Set LAUNCHER_LATENCY=1 to start it with the launcher, or press
+Ctrl+Shift+L in the main window to toggle it.
+"""
+import collections
+import functools
+import heapq
+import os
+import sys
+import threading
+import time
+import traceback
+
+LATENCY_ENV_VAR = "LAUNCHER_LATENCY"
+
+# Stack samples kept per stall; a long freeze repeats the same few stacks
+MAX_SAMPLES = 50
+
+# Heartbeat lags kept for the percentiles (about 80 minutes at 50 ms)
+MAX_LAGS = 100000
+
+
+def enabled_by_env():
+    return os.environ.get(LATENCY_ENV_VAR, "") not in ("", "0")
+
+
+def instrumented(name=None):
+    """Decorator timing a method of an object with a latency_monitor attribute"""
+    def decorate(method):
+        label = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            monitor = getattr(self, "latency_monitor", None)
+            if monitor is None or not monitor.running:
+                return method(self, *args, **kwargs)
+            with monitor.measure(label):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def _collapse(samples):
+    """[(stack text, count)] of the distinct samples, most frequent first"""
+    counts = {}
+    for _, stack in samples:
+        counts[stack] = counts.get(stack, 0) + 1
+    return sorted(counts.items(), key=lambda item: -item[1])
+
+
+class _Measurement:
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.monitor._active.append(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor._active.pop()
+        self.monitor._finish(self.name, self.started, time.perf_counter())
+        return False
+
+
+class LatencyMonitor:
+    """Heartbeat lag, handler timings and stall stack samples of a Tk main loop"""
+
+    def __init__(self, log_path, heartbeat_ms=50, slow_ms=100, sample_ms=20, top=20):
+        self.log_path = log_path
+        self.heartbeat_ms = heartbeat_ms
+        self.slow_ms = slow_ms
+        self.sample_ms = sample_ms
+        self.top = top
+        self.running = False
+        self.widget = None
+        self._after_id = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._active = []         # names of the handlers currently on the main thread's stack
+        self._samples = []        # (time, stack text) taken during the current stall
+        self._lags = collections.deque(maxlen=MAX_LAGS)   # heartbeat lag in ms
+        self._handlers = {}       # name -> [count, total_ms, max_ms]
+        self._slowest = []        # heap of (ms, seq, kind, name)
+        self._seq = 0
+        self._started_at = None
+
+    @classmethod
+    def from_settings(cls, settings, log_path):
+        options = settings["latency"]
+        return cls(log_path, heartbeat_ms=options["heartbeat_ms"], slow_ms=options["slow_ms"],
+                   sample_ms=options["sample_ms"], top=options["top"])
+
+    def start(self, widget):
+        """Start measuring the main loop of a Tk widget; call from the main thread"""
+        if self.running:
+            return
+        self.widget = widget
+        self.running = True
+        self._main_thread = threading.get_ident()
+        self._started_at = time.time()
+        self._lags.clear()
+        self._handlers = {}
+        self._slowest = []
+        self._samples = []
+        self._log(f"=== Latency monitor started {time.strftime('%Y-%m-%d %H:%M:%S')} "
+                  f"(heartbeat {self.heartbeat_ms} ms, slow >= {self.slow_ms} ms)\n")
+        self._last_beat = time.perf_counter()
+        self._expected = self._last_beat + self.heartbeat_ms / 1000
+        self._after_id = widget.after(self.heartbeat_ms, self._heartbeat)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop measuring, append the summary to the log and return it"""
+        if not self.running:
+            return ""
+        self.running = False
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        summary = self.summary()
+        self._log(summary + "\n")
+        return summary
+
+    def measure(self, name):
+        """Context manager timing one handler call"""
+        return _Measurement(self, name)
+
+    def summary(self):
+        """Text report: lag percentiles, per-handler timings and the slowest events"""
+        lines = []
+        duration = time.time() - (self._started_at or time.time())
+        lags = list(self._lags)
+        lines.append(f"=== Latency summary ({duration:.0f} s, {len(lags)} heartbeats)")
+        lines.append(f"Event-loop lag: p50 {_percentile(lags, 0.5):.1f} ms, "
+                     f"p95 {_percentile(lags, 0.95):.1f} ms, max {max(lags, default=0):.1f} ms")
+        if self._handlers:
+            lines.append(f"{'Handler':<28} {'Calls':>7} {'Mean ms':>9} {'Max ms':>9}")
+            for name, (count, total, longest) in sorted(self._handlers.items(), key=lambda item: -item[1][2]):
+                lines.append(f"{name:<28} {count:>7} {total / count:>9.1f} {longest:>9.1f}")
+        if self._slowest:
+            lines.append(f"Slowest {len(self._slowest)} events:")
+            for ms, _, kind, name in sorted(self._slowest, reverse=True):
+                lines.append(f"  {ms:8.1f} ms  {kind:<8} {name}")
+        return "\n".join(lines)
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        lag_ms = max((now - self._expected) * 1000, 0.0)
+        self._lags.append(lag_ms)
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if lag_ms >= self.slow_ms:
+            self._record(lag_ms, "stall", "event loop blocked", samples)
+        self._last_beat = now
+        self._expected = now + self.heartbeat_ms / 1000
+        if self.running:
+            self._after_id = self.widget.after(self.heartbeat_ms, self._heartbeat)
+
+    def _finish(self, name, started, ended):
+        ms = (ended - started) * 1000
+        stats = self._handlers.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += ms
+        stats[2] = max(stats[2], ms)
+        if ms >= self.slow_ms:
+            with self._lock:
+                samples = [s for s in self._samples if s[0] >= started]
+            self._record(ms, "handler", name, samples)
+
+    def _record(self, ms, kind, name, samples):
+        self._seq += 1
+        entry = (ms, self._seq, kind, name)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        else:
+            heapq.heappushpop(self._slowest, entry)
+
+        lines = [f"{time.strftime('%H:%M:%S')} {kind} {ms:.1f} ms: {name}"]
+        if kind == "stall" and samples:
+            lines[0] += f" ({len(samples)} stack samples)"
+        for stack, count in _collapse(samples)[:3]:
+            lines.append(f"  sampled {count}x:")
+            lines.extend("    " + line for line in stack.splitlines())
+        self._log("\n".join(lines) + "\n")
+
+    def _watch(self):
+        """Watchdog thread: sample the main thread's stack while the loop is blocked"""
+        interval = self.sample_ms / 1000
+        overdue = (self.heartbeat_ms + self.slow_ms / 2) / 1000
+        while not self._stop.wait(interval):
+            if time.perf_counter() - self._last_beat < overdue:
+                continue
+            frame = sys._current_frames().get(self._main_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            del frame
+            active = list(self._active)
+            if active:
+                stack = f"in {' > '.join(active)}\n{stack}"
+            with self._lock:
+                if len(self._samples) < MAX_SAMPLES:
+                    self._samples.append((time.perf_counter(), stack))
+
+    def _log(self, text):
+        try:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(text)
+        except OSError as e:
+            print(f"Could not write latency log {self.log_path}: {e}")
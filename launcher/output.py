@@ -0,0 +1,185 @@
+"""
+Terminal-style interpretation of script output.
+
+Child scripts write to a pipe, not a terminal, so progress bars such as tqdm
+redraw themselves with carriage returns and ANSI escape sequences. Feeding
+that stream to a text widget line by line produces one new line per redraw.
+TerminalBuffer applies the stream the way a terminal would: '\\r' rewinds the
+current line, basic cursor/erase sequences are honoured and colour codes are
+dropped. The GUI drains the buffer on a timer, so a progress line is redrawn
+in place a few times per second no matter how often the script writes it.
+"""
+import codecs
+import re
+import threading
+from collections import deque
+
+# CSI sequences: ESC [ <params> <final byte>
+CSI_RE = re.compile(r'\x1b\[([0-9;?]*)([@-~])')
+# An escape sequence that was cut off at the end of a chunk
+PARTIAL_CSI_RE = re.compile(r'\x1b(\[[0-9;?]*)?$')
+# Characters that need special handling; everything else is printable text
+CONTROL_RE = re.compile(r'[\r\n\b\x1b]')
+# tqdm style "45%|" is a progress bar wherever it appears
+TQDM_PERCENT_RE = re.compile(r'(\d{1,3}(?:\.\d+)?)%\|')
+PERCENT_RE = re.compile(r'(\d{1,3}(?:\.\d+)?)%')
+
+
+class TerminalBuffer:
+    """Thread-safe buffer that turns a raw output stream into display lines"""
+
+    def __init__(self, tail_lines=50):
+        self._lock = threading.Lock()
+        self._tail = deque(maxlen=tail_lines)
+        self.reset()
+
+    def reset(self):
+        """Discard all state, e.g. when a new run starts"""
+        with self._lock:
+            self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            self._pending_escape = ''
+            self._line = ''
+            self._col = 0
+            self._redrawn = False
+            self._committed = []
+            self._changed = False
+            self._progress = None
+            self._tail.clear()
+
+    def feed_bytes(self, data):
+        """Feed raw bytes read from a child process pipe"""
+        with self._lock:
+            self._feed(self._decoder.decode(data))
+
+    def feed(self, text):
+        """Feed already decoded text"""
+        with self._lock:
+            self._feed(text)
+
+    def finish(self):
+        """Flush the decoder and commit the current line (end of stream)"""
+        with self._lock:
+            self._feed(self._decoder.decode(b'', final=True))
+            if self._line:
+                self._commit_line()
+                self._changed = True
+
+    def drain(self):
+        """Return (new_lines_text, current_line, progress) or None if unchanged
+
+        new_lines_text holds every line completed since the last drain, each
+        terminated by a newline. current_line is the incomplete line that is
+        still being drawn and replaces whatever was shown for it before.
+        progress is the latest percentage (0-100) seen on a progress line, or
+        None if the script has not reported any.
+        """
+        with self._lock:
+            if not self._changed:
+                return None
+            committed = ''.join(self._committed)
+            self._committed = []
+            self._changed = False
+            self._update_progress(self._line, self._redrawn)
+            return committed, self._line, self._progress
+
+    def tail(self):
+        """Return the last completed lines, used for error reports"""
+        with self._lock:
+            return ''.join(self._tail)
+
+    def _feed(self, text):
+        if self._pending_escape:
+            text = self._pending_escape + text
+            self._pending_escape = ''
+        if not text:
+            return
+        self._changed = True
+
+        pos = 0
+        length = len(text)
+        while pos < length:
+            match = CONTROL_RE.search(text, pos)
+            if match is None:
+                self._write(text[pos:])
+                break
+            if match.start() > pos:
+                self._write(text[pos:match.start()])
+            char = match.group()
+            pos = match.end()
+
+            if char == '\n':
+                self._commit_line()
+            elif char == '\r':
+                self._col = 0
+                self._redrawn = True
+            elif char == '\b':
+                self._col = max(0, self._col - 1)
+            else:
+                csi = CSI_RE.match(text, match.start())
+                if csi:
+                    self._apply_csi(csi.group(1), csi.group(2))
+                    pos = csi.end()
+                elif PARTIAL_CSI_RE.match(text, match.start()):
+                    # Sequence continues in the next chunk
+                    self._pending_escape = text[match.start():]
+                    break
+                # Any other escape (OSC, charset selection...) is dropped
+
+    def _write(self, chunk):
+        line = self._line
+        col = self._col
+        if col > len(line):
+            line = line + ' ' * (col - len(line))
+        self._line = line[:col] + chunk + line[col + len(chunk):]
+        self._col = col + len(chunk)
+
+    def _commit_line(self):
+        self._update_progress(self._line, self._redrawn)
+        self._line += '\n'
+        self._committed.append(self._line)
+        self._tail.append(self._line)
+        self._line = ''
+        self._col = 0
+        self._redrawn = False
+
+    def _apply_csi(self, params, final):
+        try:
+            count = int(params.split(';')[0] or 0)
+        except ValueError:
+            count = 0
+
+        if final == 'K':
+            # Erase in line: 0 = to end, 1 = to start, 2 = whole line
+            if count == 0:
+                self._line = self._line[:self._col]
+            elif count == 1:
+                self._line = ' ' * self._col + self._line[self._col:]
+            elif count == 2:
+                self._line = ''
+        elif final == 'D':
+            self._col = max(0, self._col - max(count, 1))
+        elif final == 'C':
+            self._col += max(count, 1)
+        elif final == 'G':
+            self._col = max(count, 1) - 1
+        elif final in ('A', 'F'):
+            # Lines above have already been shown; moving up (tqdm nested
+            # bars) is approximated by redrawing the current line.
+            self._col = 0
+            self._redrawn = True
+        elif final == 'J' and count == 2:
+            self._line = ''
+            self._col = 0
+        # SGR colours ('m') and everything else are ignored
+
+    def _update_progress(self, line, redrawn):
+        match = None
+        for match in TQDM_PERCENT_RE.finditer(line):
+            pass
+        if match is None and redrawn:
+            for match in PERCENT_RE.finditer(line):
+                pass
+        if match is not None:
+            value = float(match.group(1))
+            if 0 <= value <= 100:
+                self._progress = value
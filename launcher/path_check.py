@@ -0,0 +1,135 @@
+"""
+Background checks of paths entered in config fields.
+
+A dropped folder that is wrong, empty or on a stalled share used to show up
+only when the run failed. PathChecker looks at a path on a daemon thread:
+whether it exists, whether it is a file or a folder and, for folders, how many
+.tif files it holds and their total size (one os.scandir of the folder, like
+the scripts' own glob of *.tif). Results are cached per path and reused until
+the path's mtime changes; a check that is already running for a path is not
+started twice.
+
+A stalled SMB share can block a stat() for minutes, so callers never wait:
+check() returns immediately and the result arrives through a callback. The
+GUI shows a "no answer" badge after the timeout and replaces it if the answer
+still comes.
+"""
+import os
+import threading
+import time
+
+TIF_SUFFIXES = (".tif", ".tiff")
+
+
+def looks_like_path(text):
+    """True for text that is plausibly a file system path"""
+    if not isinstance(text, str) or len(text) < 2:
+        return False
+    return "/" in text or "\\" in text or text[1] == ":"
+
+
+class PathInfo:
+    """What a check found at a path"""
+
+    def __init__(self, path, kind, mtime=None, size=None, tif_count=None, tif_bytes=None,
+                 entries=None, truncated=False, error=None, elapsed=None):
+        self.path = path
+        self.kind = kind            # "dir", "file", "missing" or "error"
+        self.mtime = mtime
+        self.size = size
+        self.tif_count = tif_count
+        self.tif_bytes = tif_bytes
+        self.entries = entries
+        self.truncated = truncated
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def exists(self):
+        return self.kind in ("dir", "file")
+
+
+def inspect_path(path, max_entries=100000):
+    """PathInfo of a path; may block as long as the file system does"""
+    started = time.monotonic()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return PathInfo(path, "missing", elapsed=time.monotonic() - started)
+    except OSError as e:
+        return PathInfo(path, "error", error=str(e), elapsed=time.monotonic() - started)
+
+    if not os.path.isdir(path):
+        return PathInfo(path, "file", mtime=stat.st_mtime_ns, size=stat.st_size,
+                        elapsed=time.monotonic() - started)
+
+    tif_count = tif_bytes = entries = 0
+    truncated = False
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                entries += 1
+                if entries > max_entries:
+                    truncated = True
+                    break
+                if entry.name.lower().endswith(TIF_SUFFIXES):
+                    try:
+                        if entry.is_file():
+                            tif_count += 1
+                            tif_bytes += entry.stat().st_size
+                    except OSError:
+                        continue
+    except OSError as e:
+        return PathInfo(path, "error", mtime=stat.st_mtime_ns, error=str(e),
+                        elapsed=time.monotonic() - started)
+    return PathInfo(path, "dir", mtime=stat.st_mtime_ns, tif_count=tif_count, tif_bytes=tif_bytes,
+                    entries=min(entries, max_entries), truncated=truncated,
+                    elapsed=time.monotonic() - started)
+
+
+class PathChecker:
+    """Cached, non-blocking inspect_path()"""
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._cache = {}       # path -> PathInfo
+        self._pending = {}     # path -> callbacks waiting for a running check
+        self._lock = threading.Lock()
+
+    def cached(self, path):
+        """Last result for a path, possibly stale"""
+        with self._lock:
+            return self._cache.get(path)
+
+    def check(self, path, callback):
+        """Inspect a path in the background and call callback(PathInfo) from that thread"""
+        with self._lock:
+            if path in self._pending:
+                self._pending[path].append(callback)
+                return
+            self._pending[path] = [callback]
+        threading.Thread(target=self._check, args=(path,), daemon=True).start()
+
+    def _check(self, path):
+        cached = self.cached(path)
+        info = None
+        if cached is not None and cached.exists:
+            # A stat is enough to tell whether the cached scan still holds
+            try:
+                if os.stat(path).st_mtime_ns == cached.mtime:
+                    info = cached
+            except OSError:
+                pass
+        if info is None:
+            info = inspect_path(path, self.max_entries)
+        with self._lock:
+            if info.exists:
+                self._cache[path] = info
+            else:
+                self._cache.pop(path, None)
+            callbacks = self._pending.pop(path, [])
+        for callback in callbacks:
+            try:
+                callback(info)
+            except Exception as e:
+                print(f"Error reporting path check of {path}: {e}")
@@ -0,0 +1,275 @@
+"""
+Process-tree aware subprocesses.
+
+A script started through `conda run` (and `cmd /c` on Windows) is several
+processes deep, and the script itself may start GDAL or multiprocessing
+workers. Signalling only the Popen's pid stops the outer shell and leaves the
+real work running.
+
+TreePopen starts the command as the leader of its own tree:
+    - POSIX: a new session (start_new_session), so the session and process
+      group ids equal the leader's pid. terminate() and kill() signal the
+      whole process group, and descendants() also finds processes that left
+      the group but not the session, or were reparented after the leader died.
+    - Windows: a new process group, assigned to a job object created with
+      KILL_ON_JOB_CLOSE. terminate() sends CTRL_BREAK_EVENT to the group,
+      kill() terminates the job and descendants() counts its live processes.
+      job_limits (see _create_job) restrict the job's CPUs, priority and memory.
+
+stop_tree() escalates: terminate, wait up to the grace period, kill, and
+reports whatever is still alive.
+"""
+import os
+import signal
+import subprocess
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+if os.name == 'nt':
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE = 0x2000
+    _JOB_OBJECT_LIMIT_AFFINITY = 0x10
+    _JOB_OBJECT_LIMIT_PRIORITY_CLASS = 0x20
+    _JOB_OBJECT_LIMIT_JOB_MEMORY = 0x200
+    _JobObjectBasicAccountingInformation = 1
+    _JobObjectExtendedLimitInformation = 9
+
+    class _IO_COUNTERS(ctypes.Structure):
+        _fields_ = [(name, ctypes.c_ulonglong) for name in (
+            "ReadOperationCount", "WriteOperationCount", "OtherOperationCount",
+            "ReadTransferCount", "WriteTransferCount", "OtherTransferCount")]
+
+    class _JOBOBJECT_BASIC_LIMIT_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ("PerProcessUserTimeLimit", ctypes.c_int64),
+            ("PerJobUserTimeLimit", ctypes.c_int64),
+            ("LimitFlags", wintypes.DWORD),
+            ("MinimumWorkingSetSize", ctypes.c_size_t),
+            ("MaximumWorkingSetSize", ctypes.c_size_t),
+            ("ActiveProcessLimit", wintypes.DWORD),
+            ("Affinity", ctypes.c_size_t),
+            ("PriorityClass", wintypes.DWORD),
+            ("SchedulingClass", wintypes.DWORD),
+        ]
+
+    class _JOBOBJECT_EXTENDED_LIMIT_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ("BasicLimitInformation", _JOBOBJECT_BASIC_LIMIT_INFORMATION),
+            ("IoInfo", _IO_COUNTERS),
+            ("ProcessMemoryLimit", ctypes.c_size_t),
+            ("JobMemoryLimit", ctypes.c_size_t),
+            ("PeakProcessMemoryUsed", ctypes.c_size_t),
+            ("PeakJobMemoryUsed", ctypes.c_size_t),
+        ]
+
+    class _JOBOBJECT_BASIC_ACCOUNTING_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ("TotalUserTime", ctypes.c_int64),
+            ("TotalKernelTime", ctypes.c_int64),
+            ("ThisPeriodTotalUserTime", ctypes.c_int64),
+            ("ThisPeriodTotalKernelTime", ctypes.c_int64),
+            ("TotalPageFaultCount", wintypes.DWORD),
+            ("TotalProcesses", wintypes.DWORD),
+            ("ActiveProcesses", wintypes.DWORD),
+            ("TotalTerminatedProcesses", wintypes.DWORD),
+        ]
+
+    _kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    _kernel32.CreateJobObjectW.argtypes = (wintypes.LPVOID, wintypes.LPCWSTR)
+    _kernel32.SetInformationJobObject.argtypes = (wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID, wintypes.DWORD)
+    _kernel32.QueryInformationJobObject.argtypes = (wintypes.HANDLE, ctypes.c_int, wintypes.LPVOID,
+                                                    wintypes.DWORD, wintypes.LPVOID)
+    _kernel32.AssignProcessToJobObject.argtypes = (wintypes.HANDLE, wintypes.HANDLE)
+    _kernel32.TerminateJobObject.argtypes = (wintypes.HANDLE, wintypes.UINT)
+    _kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+
+def _create_job(limits=None):
+    """Job object whose processes are killed when its last handle closes
+
+    limits may set affinity_mask, priority_class and job_memory (bytes).
+    """
+    limits = limits or {}
+    job = _kernel32.CreateJobObjectW(None, None)
+    if not job:
+        raise ctypes.WinError(ctypes.get_last_error())
+    info = _JOBOBJECT_EXTENDED_LIMIT_INFORMATION()
+    flags = _JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE
+    if limits.get("affinity_mask"):
+        flags |= _JOB_OBJECT_LIMIT_AFFINITY
+        info.BasicLimitInformation.Affinity = limits["affinity_mask"]
+    if limits.get("priority_class"):
+        flags |= _JOB_OBJECT_LIMIT_PRIORITY_CLASS
+        info.BasicLimitInformation.PriorityClass = limits["priority_class"]
+    if limits.get("job_memory"):
+        flags |= _JOB_OBJECT_LIMIT_JOB_MEMORY
+        info.JobMemoryLimit = limits["job_memory"]
+    info.BasicLimitInformation.LimitFlags = flags
+    if not _kernel32.SetInformationJobObject(job, _JobObjectExtendedLimitInformation,
+                                             ctypes.byref(info), ctypes.sizeof(info)):
+        _kernel32.CloseHandle(job)
+        raise ctypes.WinError(ctypes.get_last_error())
+    return job
+
+
+def _proc_stat(pid):
+    """(ppid, pgrp, session) of a process from /proc, or None"""
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name is in parentheses and may contain spaces
+    fields = data[data.rfind(b')') + 2:].split()
+    if fields[0] == b'Z':
+        return None
+    return int(fields[1]), int(fields[2]), int(fields[3])
+
+
+def session_members(leader_pid):
+    """Live pids (other than the leader) in the tree of a session leader"""
+    if os.path.isdir("/proc"):
+        stats = {}
+        for name in os.listdir("/proc"):
+            if name.isdigit():
+                stat = _proc_stat(int(name))
+                if stat is not None:
+                    stats[int(name)] = stat
+        members = {pid for pid, (_, pgrp, session) in stats.items()
+                   if session == leader_pid or pgrp == leader_pid}
+        # Children that started their own session are still children
+        changed = True
+        while changed:
+            changed = False
+            for pid, (ppid, _, _) in stats.items():
+                if pid not in members and (ppid == leader_pid or ppid in members):
+                    members.add(pid)
+                    changed = True
+        members.discard(leader_pid)
+        return sorted(members)
+    if psutil is not None:
+        try:
+            return sorted(p.pid for p in psutil.Process(leader_pid).children(recursive=True)
+                          if p.status() != psutil.STATUS_ZOMBIE)
+        except psutil.Error:
+            return []
+    return []
+
+
+class TreePopen(subprocess.Popen):
+    """Popen whose terminate(), kill() and descendants() cover the whole process tree"""
+
+    def __init__(self, args, job_limits=None, **kwargs):
+        self._job = None
+        if os.name == 'nt':
+            kwargs["creationflags"] = kwargs.get("creationflags", 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs["start_new_session"] = True
+        super().__init__(args, **kwargs)
+        if os.name == 'nt':
+            try:
+                self._job = _create_job(job_limits)
+                if not _kernel32.AssignProcessToJobObject(self._job, int(self._handle)):
+                    raise ctypes.WinError(ctypes.get_last_error())
+            except OSError as e:
+                print(f"Could not create job object, only the top process can be stopped: {e}")
+
+    def send_signal(self, sig):
+        if os.name == 'nt':
+            super().send_signal(sig)
+            return
+        # The group can outlive its leader, so signal it even after exit
+        try:
+            os.killpg(self.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def terminate(self):
+        """Ask the whole tree to stop"""
+        if os.name == 'nt':
+            try:
+                os.kill(self.pid, signal.CTRL_BREAK_EVENT)
+            except OSError:
+                pass
+            return
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        """Force-stop the whole tree, including processes that left the group"""
+        if os.name == 'nt':
+            if self._job is not None:
+                _kernel32.TerminateJobObject(self._job, 1)
+            else:
+                super().kill()
+            return
+        self.send_signal(signal.SIGKILL)
+        for pid in session_members(self.pid):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def descendants(self):
+        """Live processes of the tree other than the leader (pids, or a count on Windows)"""
+        if os.name == 'nt':
+            if self._job is None:
+                return []
+            info = _JOBOBJECT_BASIC_ACCOUNTING_INFORMATION()
+            if not _kernel32.QueryInformationJobObject(self._job, _JobObjectBasicAccountingInformation,
+                                                       ctypes.byref(info), ctypes.sizeof(info), None):
+                return []
+            alive = info.ActiveProcesses - (1 if self.poll() is None else 0)
+            return [None] * max(alive, 0)
+        return session_members(self.pid)
+
+    def close_job(self):
+        if self._job is not None:
+            _kernel32.CloseHandle(self._job)
+            self._job = None
+
+    def __del__(self):
+        self.close_job()
+        super().__del__()
+
+
+def _tree_alive(process):
+    if process.poll() is None:
+        return True
+    descendants = getattr(process, "descendants", None)
+    return bool(descendants and descendants())
+
+
+def _wait_tree(process, timeout):
+    deadline = time.monotonic() + timeout
+    while _tree_alive(process):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def stop_tree(process, grace_seconds=5, kill_seconds=3, on_message=None):
+    """Stop a process and its descendants, escalating from terminate to kill
+
+    Returns the descendants still alive afterwards (empty when the tree is gone).
+    """
+    on_message = on_message or (lambda message: None)
+    process.terminate()
+    if _wait_tree(process, grace_seconds):
+        on_message("stopped")
+        return []
+    on_message("forced")
+    process.kill()
+    _wait_tree(process, kill_seconds)
+    descendants = getattr(process, "descendants", None)
+    remaining = descendants() if descendants else []
+    if process.poll() is None:
+        remaining = [process.pid] + list(remaining)
+    return remaining
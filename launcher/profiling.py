@@ -0,0 +1,81 @@
+"""
+Profiled runs.
+
+The launcher profiles a script by running launcher/_profile_shim.py in the
+script's environment with the script as its argument (see the shim for the
+modes). The profile is written next to the run's log as profile.prof, with a
+JSON summary in profile.prof.json that load_summary() reads back. Memory
+profiling saves its tracemalloc snapshots in profile.prof.snapshots/.
+"""
+import json
+from pathlib import Path
+
+from .resources import format_bytes
+
+SHIM_SCRIPT = Path(__file__).parent / "_profile_shim.py"
+
+# Menu label -> shim mode
+PROFILE_MODES = {
+    "Off": None,
+    "cProfile": "cprofile",
+    "Sampling": "sample",
+    "Memory (tracemalloc)": "memory",
+}
+PROFILE_FILENAME = "profile.prof"
+
+
+def shim_args(mode, out_path, interval=0.01, snapshot_interval=30):
+    """Arguments placed before the script to run it under the profiling shim"""
+    return [SHIM_SCRIPT, "--mode", mode, "--interval", interval,
+            "--snapshot-interval", snapshot_interval, "--out", out_path]
+
+
+def load_summary(out_path):
+    """Summary written by the shim, or None if the run did not produce one"""
+    try:
+        with open(str(out_path) + ".json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def format_table(entries, mode):
+    """Fixed-width table of profile entries"""
+    lines = [f"{'cumulative s':>12} {'own s':>9} {'calls':>9}  function"]
+    for entry in entries:
+        calls = "" if entry["calls"] is None else str(entry["calls"])
+        lines.append(f"{entry['cumtime']:>12.3f} {entry['tottime']:>9.3f} {calls:>9}  {entry['function']}")
+    if mode == "sample":
+        lines.append("\nSampled: times are estimates (samples x interval) and calls are not counted.")
+    return "\n".join(lines)
+
+
+def format_memory_sites(summary):
+    """Top allocation sites still allocated at exit"""
+    lines = [f"{'size':>12} {'blocks':>9}  site"]
+    for site in summary["top_sites"]:
+        lines.append(f"{format_bytes(site['size']):>12} {site['count']:>9}  {site['site']}")
+    lines.append("\nSnapshots:")
+    for snapshot in summary["snapshots"]:
+        lines.append(f"  #{snapshot['index']:<3} {snapshot['kind']:<9} at {snapshot['elapsed']:8.1f} s  "
+                     f"traced {format_bytes(snapshot['current_bytes']):>10}  "
+                     f"peak {format_bytes(snapshot['peak_bytes']):>10}  {snapshot['file']}")
+    lines.append("\nOnly memory allocated through Python is traced; GDAL's own buffers are not included.")
+    return "\n".join(lines)
+
+
+def format_memory_growth(summary):
+    """Sites whose allocations changed most between consecutive snapshots"""
+    if not summary["growth"]:
+        return "Only one snapshot was taken; lower the snapshot interval to see growth."
+    lines = []
+    for growth in summary["growth"]:
+        sign = "+" if growth["delta_bytes"] >= 0 else "-"
+        lines.append(f"Snapshot {growth['from']} -> {growth['to']} (at {growth['elapsed']:.1f} s): "
+                     f"{sign}{format_bytes(abs(growth['delta_bytes']))}")
+        for site in growth["top"][:10]:
+            sign = "+" if site["size_diff"] >= 0 else "-"
+            lines.append(f"  {sign}{format_bytes(abs(site['size_diff'])):>10}  now {format_bytes(site['size']):>10}  "
+                         f"{site['site']}")
+        lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,218 @@
+"""
+Resource monitoring for a running process tree.
+
+ResourceMonitor samples the run's process and all of its descendants at a
+fixed interval: CPU% (of one core, so 400% is four busy cores), resident
+memory, thread count and bytes read from / written to storage. On Linux the
+numbers come from /proc/<pid>/stat, /proc/<pid>/statm and /proc/<pid>/io;
+elsewhere psutil is used when it is installed.
+
+Counters of processes that exit between samples are kept at their last
+value, so CPU time and I/O totals include short-lived children (e.g. one
+GDAL process per tile).
+
+summary() gives what the completion popups show: wall time, CPU time, peak
+RSS and total I/O. A run that spends most of its wall time with low CPU% and
+high I/O is I/O-bound; one near 100% per core is CPU-bound.
+"""
+import os
+import threading
+import time
+
+from .process_tree import session_members
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+HAVE_PROC = os.path.isdir("/proc")
+if HAVE_PROC:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def available():
+    """True if resource sampling is supported on this platform"""
+    return HAVE_PROC or psutil is not None
+
+
+def format_bytes(n):
+    """Human readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def _read_proc(pid):
+    """(cpu_seconds, rss_bytes, threads, read_bytes, write_bytes) from /proc, or None"""
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/statm", 'rb') as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    fields = stat[stat.rfind(b')') + 2:].split()
+    if fields[0] == b'Z':
+        return None
+    # Fields after the command: utime and stime are fields 14 and 15 of the
+    # full line, num_threads is field 20
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    threads = int(fields[17])
+    read_bytes = write_bytes = 0
+    try:
+        with open(f"/proc/{pid}/io", 'rb') as f:
+            for line in f:
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = int(line.split()[1])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except OSError:
+        pass
+    return cpu_seconds, rss_pages * PAGE_SIZE, threads, read_bytes, write_bytes
+
+
+def _read_psutil(pid):
+    try:
+        p = psutil.Process(pid)
+        with p.oneshot():
+            cpu = p.cpu_times()
+            io = p.io_counters() if hasattr(p, "io_counters") else None
+            return (cpu.user + cpu.system, p.memory_info().rss, p.num_threads(),
+                    io.read_bytes if io else 0, io.write_bytes if io else 0)
+    except (psutil.Error, OSError):
+        return None
+
+
+def tree_pids(pid):
+    """The process and its live descendants"""
+    if HAVE_PROC:
+        return [pid] + session_members(pid)
+    if psutil is not None:
+        try:
+            return [pid] + [p.pid for p in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return [pid]
+    return [pid]
+
+
+class ResourceSample:
+    """Resource use of a process tree at one point in time"""
+
+    def __init__(self, elapsed, cpu_percent, rss_bytes, threads, processes, read_bytes, write_bytes):
+        self.elapsed = elapsed
+        self.cpu_percent = cpu_percent
+        self.rss_bytes = rss_bytes
+        self.threads = threads
+        self.processes = processes
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+
+    def describe(self):
+        return (f"CPU {self.cpu_percent:.0f}% | RSS {format_bytes(self.rss_bytes)} | "
+                f"{self.threads} threads in {self.processes} processes | "
+                f"read {format_bytes(self.read_bytes)} | written {format_bytes(self.write_bytes)}")
+
+
+class ResourceMonitor:
+    """Sample a process tree in a background thread"""
+
+    def __init__(self, pid, interval=1.0, on_sample=None):
+        self.pid = pid
+        self.interval = interval
+        self.on_sample = on_sample or (lambda sample: None)
+        self.started = time.monotonic()
+        self.ended = None
+        self.last = None
+        self.peak_rss = 0
+        self.peak_threads = 0
+        self._counters = {}
+        self._last_cpu = (self.started, 0.0)
+        self._read = _read_proc if HAVE_PROC else _read_psutil
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not available() or self.pid is None:
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling; the summary covers the run up to now"""
+        if self.ended is None:
+            self.ended = time.monotonic()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.interval + 1)
+
+    def _run(self):
+        while True:
+            sample = self.sample()
+            if sample is None:
+                # Nothing of the tree is left
+                return
+            self.on_sample(sample)
+            if self._stop.wait(self.interval):
+                return
+
+    def sample(self):
+        """Take one sample of the tree"""
+        rss = threads = processes = 0
+        for pid in tree_pids(self.pid):
+            values = self._read(pid)
+            if values is None:
+                continue
+            # Less CPU time than before means the pid was reused; keep the
+            # totals of the process that had it
+            previous = self._counters.get(pid)
+            if previous is not None and values[0] < previous[0]:
+                self._counters[(pid, time.monotonic())] = previous
+            self._counters[pid] = values
+            rss += values[1]
+            threads += values[2]
+            processes += 1
+        if processes == 0 and self.last is not None:
+            return None
+
+        cpu_seconds = sum(c[0] for c in self._counters.values())
+        now = time.monotonic()
+        last_time, last_cpu = self._last_cpu
+        cpu_percent = 100.0 * (cpu_seconds - last_cpu) / max(now - last_time, 1e-6)
+        self._last_cpu = (now, cpu_seconds)
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_threads = max(self.peak_threads, threads)
+        self.last = ResourceSample(
+            now - self.started, cpu_percent, rss, threads, processes,
+            sum(c[3] for c in self._counters.values()),
+            sum(c[4] for c in self._counters.values()),
+        )
+        return self.last
+
+    def summary(self):
+        """Totals for the run so far"""
+        wall = (self.ended or time.monotonic()) - self.started
+        cpu_seconds = sum(c[0] for c in self._counters.values())
+        return {
+            "wall_seconds": wall,
+            "cpu_seconds": cpu_seconds,
+            "avg_cpu_percent": 100.0 * cpu_seconds / wall if wall > 0 else 0.0,
+            "peak_rss_bytes": self.peak_rss,
+            "peak_threads": self.peak_threads,
+            "read_bytes": sum(c[3] for c in self._counters.values()),
+            "write_bytes": sum(c[4] for c in self._counters.values()),
+        }
+
+
+def describe_summary(summary):
+    """Lines for a completion popup"""
+    return (
+        f"Wall time: {summary['wall_seconds']:.1f} s\n"
+        f"CPU time: {summary['cpu_seconds']:.1f} s (average {summary['avg_cpu_percent']:.0f}% of one core)\n"
+        f"Peak RSS: {format_bytes(summary['peak_rss_bytes'])}\n"
+        f"Total I/O: read {format_bytes(summary['read_bytes'])}, written {format_bytes(summary['write_bytes'])}\n"
+    )
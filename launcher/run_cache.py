@@ -0,0 +1,198 @@
+"""
+Content-addressed cache of completed runs.
+
+A run's fingerprint is a SHA-256 over
+    - the script source,
+    - the config snapshot the script reads,
+    - the conda environment (name, prefix and the mtime of conda-meta/history,
+      which changes whenever packages are installed or removed),
+    - the metadata (relative path, size, mtime) of every input file: config
+      values that name an existing file or directory. Directories are walked.
+
+File contents are not hashed, so fingerprinting a folder of large TIFFs costs
+one stat per file.
+
+A successful run is recorded under the fingerprint taken before it started
+and, for scripts that may rewrite their inputs in place (a schema key with
+role "inout", like label_dir of gdal_update_geotrans.py, or no schema at all),
+also under one taken after it finished, since only that one matches when the
+same run is requested again. Each fingerprint walks the input folders, so
+the second one is skipped when the schema rules it out.
+
+The cache is off by default (run_cache.enabled): with it on, a script without
+declared inputs is skipped on every identical rerun.
+
+Records are small JSON files in <state_dir>/run_cache. A lookup refreshes the
+record's mtime, and evict() drops records not used for max_age_days, then the
+least recently used ones beyond max_records.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .config_store import PATH_TYPES, normalize_schema
+
+
+def environment_identity(env_name, prefix=None):
+    """What identifies a conda environment's installed packages"""
+    if not env_name:
+        return None
+    identity = {"name": env_name, "prefix": str(prefix) if prefix else None, "history_mtime_ns": None}
+    if prefix:
+        try:
+            identity["history_mtime_ns"] = os.stat(Path(prefix, "conda-meta", "history")).st_mtime_ns
+        except OSError:
+            pass
+    return identity
+
+
+def input_paths(config, schema=None):
+    """Config values naming existing files or directories"""
+    schema = schema or {}
+    paths = []
+    for key, value in sorted(config.items()):
+        declared = (schema.get(key) or {}).get("type") if isinstance(schema.get(key), dict) else schema.get(key)
+        if declared is not None and declared not in PATH_TYPES:
+            continue
+        if not isinstance(value, str) or not value.strip():
+            continue
+        if os.path.exists(value):
+            paths.append((key, value))
+    return paths
+
+
+def _file_entries(path):
+    """(relative path, size, mtime_ns) for a file or every file below a directory"""
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [(".", stat.st_size, stat.st_mtime_ns)]
+    entries = []
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            rel = os.path.relpath(entry.path, path).replace("\\", "/")
+                            entries.append((rel, stat.st_size, stat.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    entries.sort()
+    return entries
+
+
+def may_rewrite_inputs(schema):
+    """True unless a schema declares that the script leaves its inputs alone"""
+    if not schema:
+        return True
+    return any(spec.get("role") == "inout" for spec in normalize_schema(schema).values())
+
+
+def fingerprint(script_path, config, env=None, schema=None):
+    """Fingerprint of running a script with a config in an environment"""
+    digest = hashlib.sha256()
+    with open(script_path, 'rb') as f:
+        digest.update(hashlib.sha256(f.read()).digest())
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    digest.update(json.dumps(env, sort_keys=True).encode())
+    for key, path in input_paths(config, schema):
+        digest.update(f"\0{key}\0".encode())
+        for rel, size, mtime_ns in _file_entries(path):
+            digest.update(f"{rel}\0{size}\0{mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+class RunCache:
+    """Records of completed runs, keyed by fingerprint"""
+
+    def __init__(self, cache_dir, max_records=1000, max_age_days=30):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_records = max_records
+        self.max_age_days = max_age_days
+
+    @classmethod
+    def from_settings(cls, settings, cache_dir):
+        cache_settings = settings["run_cache"]
+        if not cache_settings.get("enabled", True):
+            return None
+        return cls(cache_dir,
+                   max_records=cache_settings.get("max_records", 1000),
+                   max_age_days=cache_settings.get("max_age_days", 30))
+
+    def _path(self, fp):
+        return self.cache_dir / f"{fp}.json"
+
+    def lookup(self, fp):
+        """The record of a completed run with this fingerprint, or None"""
+        path = self._path(fp)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(path):
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return record
+
+    def record(self, fingerprints, record):
+        """Store a completed run under one or more fingerprints"""
+        record = dict(record, recorded=time.time())
+        for fp in set(fingerprints):
+            path = self._path(fp)
+            tmp_path = path.with_name(path.name + ".tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(dict(record, fingerprint=fp), f, default=str)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Could not record run in cache: {e}")
+        self.evict()
+
+    def forget(self, fp):
+        self._remove(self._path(fp))
+
+    def evict(self):
+        """Drop expired records, then the least recently used beyond max_records"""
+        records = []
+        for path in self.cache_dir.glob("*.json"):
+            if self._expired(path):
+                self._remove(path)
+                continue
+            try:
+                records.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        if self.max_records and len(records) > self.max_records:
+            records.sort()
+            for _, path in records[:len(records) - self.max_records]:
+                self._remove(path)
+
+    def _expired(self, path):
+        if not self.max_age_days:
+            return False
+        try:
+            return time.time() - path.stat().st_mtime > self.max_age_days * 86400
+        except OSError:
+            return True
+
+    @staticmethod
+    def _remove(path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
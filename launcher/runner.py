@@ -0,0 +1,171 @@
+"""
+Starting scripts outside the GUI's single-run path.
+
+start_process() builds the same command the launcher has always used (conda
+run for a selected environment, the launcher's Python otherwise) and returns
+a Popen whose stdout carries stdout and stderr as raw bytes. The process
+is the leader of its own process tree (see launcher.process_tree), so
+stopping it also stops conda's python and anything the script started. run_script()
+runs a script to completion, optionally against a config snapshot instead
+of the script's own <script>_config.yml.
+
+Scripts find a snapshot through the LAUNCHER_CONFIG_PATH environment
+variable and fall back to their usual config file when it is not set:
+
+    config_path = Path(os.environ.get("LAUNCHER_CONFIG_PATH")
+                       or Path(__file__).parent / 'my_script_config.yml')
+"""
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import yaml
+
+from .process_tree import TreePopen, stop_tree
+
+CONFIG_ENV_VAR = "LAUNCHER_CONFIG_PATH"
+
+
+def build_command(script_path, conda_env=None, prefix_args=()):
+    """Command to run a script, a string (shell) for conda on Windows
+
+    prefix_args go between "python -u" and the script, e.g. a wrapper such as
+    the profiling shim and its options.
+    """
+    python_args = [str(a) for a in prefix_args] + [str(script_path)]
+    if conda_env:
+        if os.name == 'nt':
+            # Use cmd /c to ensure proper output handling on Windows
+            quoted = ' '.join(f'"{a}"' for a in python_args)
+            return f'cmd /c conda run --no-capture-output -n {conda_env} python -u {quoted}'
+        return ['conda', 'run', '--no-capture-output', '-n', conda_env, 'python', '-u'] + python_args
+    return [sys.executable, '-u'] + python_args
+
+
+def command_text(command):
+    """Printable form of a command"""
+    if isinstance(command, str):
+        return command
+    return ' '.join(str(c) for c in command)
+
+
+def start_process(script_path, conda_env=None, config_path=None, extra_env=None, cwd=None,
+                  prefix_args=(), exec_profile=None):
+    """Start a script, returning (process, command)
+
+    exec_profile (launcher.exec_profiles.ExecProfile) adds its environment
+    variables and applies its affinity, priority and limits to the process.
+    """
+    env = os.environ.copy()
+    env['PYTHONUNBUFFERED'] = '1'
+    if config_path is not None:
+        env[CONFIG_ENV_VAR] = str(config_path)
+    popen_kwargs = {}
+    command = build_command(script_path, conda_env, prefix_args)
+    if exec_profile is not None:
+        env.update(exec_profile.environment())
+        if os.name == 'nt':
+            popen_kwargs["job_limits"] = exec_profile.job_limits()
+        else:
+            wrapper = exec_profile.wrapper_args()
+            if wrapper and shutil.which(command[0]) is None:
+                # The wrapper would only fail at its exec; raise like Popen
+                # does so callers can fall back to the launcher's Python
+                raise FileNotFoundError(f"Command not found: {command[0]}")
+            # No preexec_fn: Python code in a child forked from a threaded
+            # parent can deadlock before exec
+            command = wrapper + command
+    env.update(extra_env or {})
+
+    process = TreePopen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=0,
+        shell=isinstance(command, str),
+        env=env,
+        cwd=cwd,
+        **popen_kwargs,
+    )
+    return process, command
+
+
+def write_config_snapshot(values, path):
+    """Write a config dict to path for a single run"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        yaml.dump(values, f, default_flow_style=False)
+    return path
+
+
+class RunResult:
+    """Outcome of run_script()"""
+
+    def __init__(self, returncode, started, ended, command, output_tail, cancelled=False):
+        self.returncode = returncode
+        self.started = started
+        self.ended = ended
+        self.command = command
+        self.output_tail = output_tail
+        self.cancelled = cancelled
+
+    @property
+    def duration(self):
+        return self.ended - self.started
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.cancelled
+
+
+def run_script(script_path, conda_env=None, config_path=None, log_path=None,
+               on_output=None, cancel_event=None, extra_env=None, cwd=None, grace_seconds=5,
+               exec_profile=None):
+    """Run a script to completion and return a RunResult
+
+    Output is appended to log_path and passed to on_output(bytes) if given.
+    Setting cancel_event terminates the run.
+    """
+    started = time.time()
+    process, command = start_process(script_path, conda_env, config_path, extra_env, cwd,
+                                     exec_profile=exec_profile)
+    tail = deque(maxlen=64)
+    cancelled = threading.Event()
+
+    def watch_cancel():
+        while process.poll() is None:
+            if cancel_event.wait(0.2):
+                cancelled.set()
+                remaining = stop_tree(process, grace_seconds)
+                if remaining:
+                    print(f"Processes still running after cancelling {script_path}: {remaining}")
+                return
+
+    if cancel_event is not None:
+        threading.Thread(target=watch_cancel, daemon=True).start()
+
+    log_file = open(log_path, 'ab') if log_path else None
+    try:
+        while True:
+            chunk = process.stdout.read(65536)
+            if not chunk:
+                break
+            tail.append(chunk)
+            if log_file is not None:
+                log_file.write(chunk)
+            if on_output is not None:
+                on_output(chunk)
+        process.wait()
+    finally:
+        if log_file is not None:
+            log_file.close()
+
+    output_tail = b''.join(tail)[-4096:].decode('utf-8', errors='replace')
+    return RunResult(process.returncode, started, time.time(), command_text(command),
+                     output_tail, cancelled=cancelled.is_set())
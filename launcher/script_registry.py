@@ -0,0 +1,207 @@
+"""
+Script registry.
+
+Scans the configured script directories for runnable *.py files and keeps,
+per script, its module docstring, its config filename and the config schema
+it declares. The docstring and schema come from parsing the file once; the
+entry is reused until the file's mtime or size changes. The index is also
+written to disk so a restart does not re-parse unchanged scripts.
+
+A script declares its config schema with a module-level literal, e.g.
+
+    CONFIG_SCHEMA = {
+        "countdown_seconds": {"type": "int", "default": 10},
+        "label_dir": {"type": "dir", "help": "Folder of prediction TIFFs"},
+    }
+
+It is read with ast.literal_eval, so the script is never imported. A path
+key may also declare a "role" of "input", "output" or "inout" so its data can
+be staged on local disk (see launcher.staging).
+
+start_watching() polls the directories in a background thread and calls back
+only when scripts were added, removed or changed, so the GUI dropdown can
+update live without rescanning everything on every tick.
+"""
+import ast
+import json
+import os
+import threading
+from pathlib import Path
+
+SCHEMA_NAME = "CONFIG_SCHEMA"
+
+
+def config_filename_for(script_name):
+    """Determine config filename from script name"""
+    # Remove .py extension and add _config.yml
+    base_name = script_name.rsplit('.py', 1)[0]
+    return f"{base_name}_config.yml"
+
+
+def parse_script(path):
+    """Return (docstring, schema) of a script without importing it"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+    except Exception as e:
+        return f"Error reading script documentation: {e}", None
+
+    docstring = ast.get_docstring(tree)
+    schema = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+        if any(isinstance(t, ast.Name) and t.id == SCHEMA_NAME for t in targets):
+            try:
+                schema = ast.literal_eval(node.value)
+            except ValueError:
+                print(f"{path}: {SCHEMA_NAME} must be a literal dict")
+    if not isinstance(schema, dict):
+        schema = None
+    docstring = docstring.strip() if docstring else "No documentation available for this script."
+    return docstring, schema
+
+
+class ScriptInfo:
+    """Cached metadata for one script"""
+
+    def __init__(self, path, mtime_ns, size, docstring, schema):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.docstring = docstring
+        self.schema = schema
+
+    @property
+    def config_filename(self):
+        return config_filename_for(self.name)
+
+    @property
+    def config_path(self):
+        """Config files live next to their script"""
+        return self.path.parent / self.config_filename
+
+    def to_dict(self):
+        return {
+            "path": str(self.path),
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "docstring": self.docstring,
+            "schema": self.schema,
+        }
+
+
+class ScriptRegistry:
+    """Scripts found in one or more directories, keyed by file name"""
+
+    def __init__(self, script_dirs, exclude=(), cache_file=None):
+        self.script_dirs = [Path(d) for d in script_dirs]
+        self.exclude = set(exclude)
+        self.cache_file = cache_file
+        self._scripts = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._load_cache()
+
+    @classmethod
+    def from_settings(cls, settings, base_dir, cache_file=None):
+        """Build a registry from the scripts section of the launcher settings"""
+        script_settings = settings["scripts"]
+        dirs = [Path(base_dir, d).resolve() for d in script_settings.get("dirs") or ["."]]
+        return cls(dirs, exclude=script_settings.get("exclude") or (), cache_file=cache_file)
+
+    def names(self):
+        """Script names in display order"""
+        with self._lock:
+            return list(self._scripts)
+
+    def get(self, name):
+        """ScriptInfo for a script name, or None"""
+        with self._lock:
+            return self._scripts.get(name)
+
+    def refresh(self):
+        """Rescan the directories; return True if anything changed"""
+        with self._lock:
+            previous = dict(self._scripts)
+
+        scripts = {}
+        for script_dir in self.script_dirs:
+            try:
+                entries = sorted(os.scandir(script_dir), key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name
+                if not name.endswith('.py') or name in self.exclude or name in scripts:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                info = previous.get(name)
+                if (info is None or info.path != Path(entry.path)
+                        or info.mtime_ns != stat.st_mtime_ns or info.size != stat.st_size):
+                    docstring, schema = parse_script(entry.path)
+                    info = ScriptInfo(entry.path, stat.st_mtime_ns, stat.st_size, docstring, schema)
+                scripts[name] = info
+
+        changed = (list(scripts) != list(previous)
+                   or any(scripts[name] is not previous.get(name) for name in scripts))
+        if changed:
+            with self._lock:
+                self._scripts = scripts
+            self._save_cache()
+        return changed
+
+    def start_watching(self, interval, on_change):
+        """Poll for changes in a background thread, calling on_change(names)"""
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    if self.refresh():
+                        on_change(self.names())
+                except Exception as e:
+                    print(f"Error scanning scripts: {e}")
+        threading.Thread(target=watch, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _load_cache(self):
+        if self.cache_file is None:
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Seed the in-memory index; refresh() still validates every entry
+        scripts = {}
+        for entry in entries:
+            try:
+                info = ScriptInfo(entry["path"], entry["mtime_ns"], entry["size"],
+                                  entry["docstring"], entry["schema"])
+            except (KeyError, TypeError):
+                continue
+            scripts.setdefault(info.name, info)
+        with self._lock:
+            self._scripts = scripts
+
+    def _save_cache(self):
+        if self.cache_file is None:
+            return
+        with self._lock:
+            entries = [info.to_dict() for info in self._scripts.values()]
+        try:
+            tmp_file = Path(str(self.cache_file) + ".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            print(f"Could not write script index: {e}")
@@ -0,0 +1,136 @@
+"""
+Launcher settings.
+
+Defaults live in DEFAULT_SETTINGS. Any section can be overridden in
+launcher_settings.yml next to drag_drop.py; values given there replace the
+defaults key by key within each section.
+"""
+import copy
+from pathlib import Path
+
+import yaml
+
+SETTINGS_FILE = Path(__file__).parent.parent / "launcher_settings.yml"
+
+DEFAULT_SETTINGS = {
+    # Caches, history and run logs
+    "state_dir": "~/.land_cover_launcher",
+    "scripts": {
+        # Directories scanned for runnable scripts, relative to drag_drop.py
+        "dirs": ["."],
+        # Files in those directories that are not scripts to run
+        "exclude": ["drag_drop.py"],
+        # Seconds between background rescans for new or changed scripts
+        "poll_seconds": 2,
+    },
+    "configs": {
+        # Seconds between checks for config files edited outside the launcher
+        "watch_seconds": 1,
+    },
+    "path_check": {
+        # Seconds before a path check is reported as not answering (slow share)
+        "timeout_seconds": 3,
+        # Folder entries looked at when counting .tif files
+        "max_entries": 100000,
+    },
+    "latency": {
+        # Expected interval of the event-loop heartbeat (LAUNCHER_LATENCY=1 or Ctrl+Shift+L)
+        "heartbeat_ms": 50,
+        # Stalls and handler calls at least this long are logged with stack samples
+        "slow_ms": 100,
+        # How often the main thread's stack is sampled during a stall
+        "sample_ms": 20,
+        # Slowest events listed in the summary
+        "top": 20,
+    },
+    "monitor": {
+        # Seconds between CPU / memory / I/O samples of a running script
+        "interval_seconds": 1,
+    },
+    "profiler": {
+        # Seconds between stack samples in the Sampling profiler mode
+        "sample_interval": 0.01,
+        # Seconds between tracemalloc snapshots in the memory profiler mode
+        "snapshot_interval": 30,
+    },
+    "stop": {
+        # Seconds a stopped script's process tree gets to exit before it is killed
+        "grace_seconds": 5,
+    },
+    "sweep": {
+        # Default number of variants run at the same time
+        "max_workers": 2,
+        # Refuse sweeps that expand to more variants than this
+        "max_variants": 500,
+    },
+    "workflows": {
+        # Default number of workflow steps run at the same time
+        "max_workers": 4,
+    },
+    "run_cache": {
+        # Skip runs identical to a completed one (script, config, env, inputs)
+        "enabled": False,
+        # Evict records unused for this many days, then the least recently
+        # used beyond max_records
+        "max_age_days": 30,
+        "max_records": 1000,
+    },
+    "staging": {
+        # Copy declared input dirs to local disk before a run (per-run checkbox default)
+        "enabled": False,
+        # Cache directory; None uses <state_dir>/staging
+        "dir": None,
+        # Least recently used entries are evicted beyond this size
+        "max_gb": 50,
+        # Files copied in parallel
+        "copy_workers": 8,
+    },
+    "job_server": {
+        # URL of a shared job server (python -m launcher.job_server); None hides the option
+        "url": None,
+        # Where a server started on this machine listens
+        "host": "127.0.0.1",
+        "port": 8765,
+        # Runs the server starts at the same time
+        "max_workers": 2,
+        # Finished jobs the server keeps listing
+        "keep_jobs": 500,
+    },
+    "worker_pool": {
+        # Keep a warm interpreter per conda environment (POSIX only)
+        "enabled": True,
+        # Modules imported once by each warm worker, e.g. osgeo.gdal, torch
+        "preload": [],
+        # Recycle a worker after this many runs ...
+        "max_runs": 20,
+        # ... or after it has been idle this long
+        "idle_seconds": 600,
+    },
+}
+
+
+def load_settings(settings_file=SETTINGS_FILE):
+    """Return the default settings updated with launcher_settings.yml"""
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    try:
+        with open(settings_file, 'r') as f:
+            overrides = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return settings
+    except Exception as e:
+        print(f"Error loading launcher settings: {e}")
+        return settings
+
+    for section, values in overrides.items():
+        if isinstance(values, dict) and isinstance(settings.get(section), dict):
+            settings[section].update(values)
+        else:
+            settings[section] = values
+    return settings
+
+
+def state_dir(settings, *parts):
+    """Return (and create) a directory under the launcher state directory"""
+    path = Path(settings["state_dir"]).expanduser().joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
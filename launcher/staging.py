@@ -0,0 +1,274 @@
+"""
+Local staging of network-share data.
+
+Scripts that do many small reads over SMB run much faster against a local
+copy. A script opts in per config key through the "role" of the key in its
+CONFIG_SCHEMA:
+
+    CONFIG_SCHEMA = {
+        "img_dir": {"type": "dir", "role": "input"},     # copied in
+        "label_dir": {"type": "dir", "role": "inout"},   # copied in, synced back
+        "out_dir": {"type": "dir", "role": "output"},    # written locally, synced back
+    }
+
+StagingPlan.prepare() copies the input directories into the staging cache
+with parallel copies, skipping files whose size and mtime already match, and
+returns a config whose paths point at the local copies. Output directories
+are mirrored from their destination too, so a run sees the outputs that
+already exist (and none that were deleted there). finish() copies back only
+the files the run created or changed, never stale copies of other files.
+Copies keep mtimes, so the next run only transfers what changed.
+
+A key of type "file" is staged through its folder: the config points at the
+file's name inside the local copy of that folder.
+
+The cache keeps one entry per source path and evicts the least recently
+used entries when it grows beyond its size cap. Entries used by a running
+plan are never evicted.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .config_store import PATH_TYPES, normalize_schema
+
+ROLES = ("input", "output", "inout")
+
+
+def _files(root):
+    """{relative path: (size, mtime_ns)} of every file below root"""
+    files = {}
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            rel = os.path.relpath(entry.path, root)
+                            files[rel] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return files
+
+
+class StagingCache:
+    """Local copies of source directories with an LRU size cap"""
+
+    def __init__(self, root, max_bytes, copy_workers=8):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.copy_workers = copy_workers
+        self.index_file = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._pinned = {}
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index = self._load_index()
+
+    @classmethod
+    def from_settings(cls, settings, default_root):
+        staging = settings["staging"]
+        root = Path(staging["dir"]).expanduser() if staging.get("dir") else default_root
+        return cls(root, int(staging["max_gb"] * 1024 ** 3), staging["copy_workers"])
+
+    def local_path(self, source):
+        """Cache directory for a source path"""
+        source = os.path.normpath(str(source))
+        digest = hashlib.sha1(source.lower().encode()).hexdigest()[:16]
+        return self.root / "data" / f"{digest}_{os.path.basename(source) or 'root'}"
+
+    def pin(self, local):
+        with self._lock:
+            self._pinned[str(local)] = self._pinned.get(str(local), 0) + 1
+
+    def unpin(self, local):
+        with self._lock:
+            count = self._pinned.get(str(local), 0) - 1
+            if count > 0:
+                self._pinned[str(local)] = count
+            else:
+                self._pinned.pop(str(local), None)
+
+    def sync(self, source, dest, delete_extra=False, baseline=None):
+        """Copy new and changed files from source to dest in parallel
+
+        With a baseline ({relative path: (size, mtime_ns)} of source taken
+        earlier), only files that differ from it are copied, whatever dest
+        holds. Returns (copied files, skipped files, copied bytes).
+        """
+        source, dest = Path(source), Path(dest)
+        source_files = _files(source)
+        dest_files = _files(dest)
+        reference = dest_files if baseline is None else baseline
+        todo = [rel for rel, state in source_files.items() if reference.get(rel) != state]
+
+        def copy(rel):
+            target = dest / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".staging")
+            shutil.copy2(source / rel, tmp)
+            os.replace(tmp, target)
+
+        with ThreadPoolExecutor(max_workers=self.copy_workers) as executor:
+            list(executor.map(copy, todo))
+        if delete_extra:
+            for rel in set(dest_files) - set(source_files):
+                try:
+                    os.remove(dest / rel)
+                except OSError:
+                    pass
+        copied_bytes = sum(source_files[rel][0] for rel in todo)
+        return len(todo), len(source_files) - len(todo), copied_bytes
+
+    def stage_in(self, source):
+        """Bring the cache copy of a directory up to date and return its path"""
+        local = self.local_path(source)
+        local.mkdir(parents=True, exist_ok=True)
+        result = self.sync(source, local, delete_extra=True)
+        self._touch(source, local)
+        return local, result
+
+    def stage_output(self, dest):
+        """Local directory for an output, mirroring what dest already holds
+
+        A missing dest leaves the local directory empty.
+        """
+        local = self.local_path(dest)
+        local.mkdir(parents=True, exist_ok=True)
+        result = self.sync(dest, local, delete_extra=True)
+        self._touch(dest, local)
+        return local, result
+
+    def _touch(self, source, local):
+        with self._lock:
+            self._index[str(local)] = {"source": str(source), "last_used": time.time()}
+            self._save_index()
+
+    def size(self, local):
+        return sum(size for size, _ in _files(local).values())
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its cap"""
+        with self._lock:
+            entries = sorted(self._index.items(), key=lambda item: item[1]["last_used"])
+            pinned = set(self._pinned)
+        sizes = {local: self.size(local) for local, _ in entries}
+        total = sum(sizes.values())
+        removed = []
+        for local, info in entries:
+            if total <= self.max_bytes:
+                break
+            if local in pinned:
+                continue
+            shutil.rmtree(local, ignore_errors=True)
+            total -= sizes[local]
+            removed.append(info["source"])
+            with self._lock:
+                self._index.pop(local, None)
+        if removed:
+            with self._lock:
+                self._save_index()
+        return removed
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {local: info for local, info in index.items() if os.path.isdir(local)}
+
+    def _save_index(self):
+        tmp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            print(f"Could not write staging index: {e}")
+
+
+def staged_keys(config, schema):
+    """{key: role} of config keys that declare a staging role"""
+    keys = {}
+    for key, spec in normalize_schema(schema).items():
+        role = spec.get("role")
+        if role in ROLES and spec["type"] in PATH_TYPES and config.get(key):
+            keys[key] = role
+    return keys
+
+
+class StagingPlan:
+    """Staging of one run's inputs and outputs"""
+
+    def __init__(self, cache, config, schema, on_message=None):
+        self.cache = cache
+        self.config = dict(config)
+        self.keys = staged_keys(config, schema)
+        self.types = {key: spec["type"] for key, spec in normalize_schema(schema).items()}
+        self.on_message = on_message or (lambda message: None)
+        self.outputs = []
+        self.pinned = []
+
+    def prepare(self):
+        """Stage the inputs and outputs; return the config for the run"""
+        staged = dict(self.config)
+        for key, role in self.keys.items():
+            source = Path(self.config[key])
+            if role in ("input", "inout") and not source.exists():
+                self.on_message(f"Staging: {key} {source} does not exist, using it directly\n")
+                continue
+            # Files are staged through their folder, so outputs never become directories
+            single_file = self.types.get(key) == "file" or source.is_file()
+            folder = source.parent if single_file else source
+            self._pin(folder)
+            started = time.time()
+            if role in ("input", "inout"):
+                local, (copied, skipped, copied_bytes) = self.cache.stage_in(folder)
+            else:
+                local, (copied, skipped, copied_bytes) = self.cache.stage_output(folder)
+            staged[key] = str(local / source.name if single_file else local).replace("\\", "/")
+            self.on_message(
+                f"Staging: {key} copied {copied} files ({copied_bytes / 1024 ** 2:.1f} MB), "
+                f"{skipped} already current, in {time.time() - started:.1f} s\n"
+            )
+            if role in ("output", "inout"):
+                # What the local copy holds before the run; only changes are synced back
+                self.outputs.append((key, local, folder, _files(local)))
+        return staged
+
+    def _pin(self, source):
+        local = self.cache.local_path(source)
+        self.cache.pin(local)
+        self.pinned.append(local)
+
+    def finish(self, sync_outputs=True):
+        """Sync outputs back to their original location and release the cache entries"""
+        try:
+            if sync_outputs:
+                for key, local, dest, baseline in self.outputs:
+                    started = time.time()
+                    copied, _, copied_bytes = self.cache.sync(local, dest, baseline=baseline)
+                    self.on_message(
+                        f"Staging: synced {copied} files ({copied_bytes / 1024 ** 2:.1f} MB) of {key} "
+                        f"back to {dest} in {time.time() - started:.1f} s\n"
+                    )
+            elif self.outputs:
+                self.on_message("Staging: run failed, outputs were left in the local cache\n")
+        finally:
+            for local in self.pinned:
+                self.cache.unpin(local)
+            removed = self.cache.evict()
+            if removed:
+                self.on_message(f"Staging: evicted {len(removed)} cached directories to stay under the size cap\n")
@@ -0,0 +1,71 @@
+"""
+Startup instrumentation.
+
+A StartupProfile records how long each initialisation phase of the launcher
+takes, relative to the moment the profile was created (the top of
+drag_drop.py). Phases are delimited by checkpoints: checkpoint("logo")
+records the time spent since the previous checkpoint as the "logo" phase.
+Work that happens on other threads is recorded with mark(), which notes the
+time without ending the current phase.
+
+Set LAUNCHER_PROFILE_STARTUP=1 to have the breakdown printed once start-up
+work has finished; benchmarks/bench_startup.py reads it directly.
+"""
+import os
+import time
+
+PROFILE_ENV_VAR = "LAUNCHER_PROFILE_STARTUP"
+
+
+class StartupProfile:
+    """Timed breakdown of start-up phases"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.phases = []   # (name, start_s, duration_s)
+        self.marks = {}    # name -> offset_s
+
+    @property
+    def enabled(self):
+        """Whether the report should be printed"""
+        return os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
+
+    def checkpoint(self, name):
+        """End the current phase, naming it"""
+        now = time.perf_counter()
+        self.phases.append((name, self._last - self.start, now - self._last))
+        self._last = now
+
+    def mark(self, name):
+        """Record a point in time without ending the current phase"""
+        self.marks[name] = time.perf_counter() - self.start
+
+    def elapsed(self, name):
+        """Milliseconds from start to the end of a phase or to a mark"""
+        if name in self.marks:
+            return self.marks[name] * 1000
+        for phase, offset, duration in self.phases:
+            if phase == name:
+                return (offset + duration) * 1000
+        return None
+
+    def as_dict(self):
+        """Milliseconds per phase and mark, for JSON output"""
+        return {
+            "phases": [
+                {"name": name, "start_ms": offset * 1000, "duration_ms": duration * 1000}
+                for name, offset, duration in self.phases
+            ],
+            "marks": {name: offset * 1000 for name, offset in self.marks.items()},
+        }
+
+    def report(self):
+        """Human readable breakdown"""
+        events = [(offset, f"  {offset * 1000:8.1f}  {duration * 1000:8.1f}  {name}")
+                  for name, offset, duration in self.phases]
+        events += [(offset, f"  {offset * 1000:8.1f}  {'':>8}  * {name}")
+                   for name, offset in self.marks.items()]
+        lines = ["Startup profile (ms since launch):", f"  {'start':>8}  {'took':>8}  phase"]
+        lines.extend(text for _, text in sorted(events))
+        return "\n".join(lines)
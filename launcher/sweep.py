@@ -0,0 +1,223 @@
+"""
+Parameter sweeps: one config template, many runs.
+
+Any field of a script's config can hold a sweep instead of a single value:
+
+    [a, b, c]                  each listed value
+    range(start, stop, step)   numbers from start up to (not including) stop;
+                               step defaults to 1 and may be fractional
+    glob:W:/tiles/block_*      every path matching the pattern, sorted
+
+expand_sweep() turns the fields into the cartesian product of all sweeps, one
+config snapshot per variant. SweepRunner runs the variants across a bounded
+number of parallel workers; each variant gets its own snapshot file (passed
+to the script through LAUNCHER_CONFIG_PATH) and its own log.
+
+Fields whose declared type is "list" are values, not sweeps, unless they use
+range(...) or glob:.
+"""
+import glob
+import itertools
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+from .config_store import ConfigValueError, convert, infer_from_text
+from .runner import run_script, write_config_snapshot
+
+RANGE_RE = re.compile(r'^range\(\s*([^,()]+?)\s*(?:,\s*([^,()]+?)\s*)?(?:,\s*([^,()]+?)\s*)?\)$')
+GLOB_PREFIX = "glob:"
+
+
+class SweepError(ValueError):
+    """Raised for malformed sweep expressions"""
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            raise SweepError(f"'{text}' is not a number")
+
+
+def _range_length(start, stop, step):
+    """Number of values range(start, stop, step) yields, without listing them"""
+    return max(0, math.ceil((stop - start) / step))
+
+
+def _too_many(count, max_values):
+    return max_values is not None and count > max_values
+
+
+def parse_sweep(text, type_name=None, max_values=None):
+    """Return the list of values a field sweeps over, or None if it is a single value
+
+    Raises SweepError before building a range longer than max_values.
+    """
+    text = text.strip()
+    match = RANGE_RE.match(text)
+    if match:
+        args = [_number(a) for a in match.groups() if a is not None]
+        if len(args) == 1:
+            start, stop, step = 0, args[0], 1
+        else:
+            start, stop = args[0], args[1]
+            step = args[2] if len(args) == 3 else 1
+        if step == 0:
+            raise SweepError("range() step must not be zero")
+        count = _range_length(start, stop, step)
+        if _too_many(count, max_values):
+            raise SweepError(f"{text} has {count} values, more than the limit of {max_values}")
+        values = []
+        value = start
+        # Count steps instead of accumulating to avoid float drift
+        count = 0
+        while (step > 0 and value < stop) or (step < 0 and value > stop):
+            values.append(value)
+            count += 1
+            value = start + count * step
+            if isinstance(value, float):
+                value = round(value, 10)
+        return values
+
+    if text.startswith(GLOB_PREFIX):
+        pattern = text[len(GLOB_PREFIX):].strip()
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise SweepError(f"No paths match {pattern}")
+        return [m.replace("\\", "/") for m in matches]
+
+    if text.startswith("[") and text.endswith("]") and type_name != "list":
+        try:
+            # Items stay text and are typed like entry text, not by YAML's rules
+            values = yaml.load(text, Loader=yaml.BaseLoader)
+        except yaml.YAMLError as e:
+            raise SweepError(f"Invalid list {text}: {e}")
+        if not values:
+            raise SweepError("A sweep list needs at least one value")
+        return values
+    return None
+
+
+def expand_sweep(field_texts, type_of=None, max_variants=None):
+    """Expand {key: entry text} into (swept_keys, [config dict per variant])
+
+    type_of(key) returns the schema type of a key (or None) and is used to
+    type every value the same way the config store does. A sweep with more
+    than max_variants variants raises SweepError; the variant count is the
+    product of the axis lengths, checked before any variant is built.
+    """
+    type_of = type_of or (lambda key: None)
+    axes = {}
+    swept_keys = []
+    for key, text in field_texts.items():
+        values = parse_sweep(text, type_of(key), max_variants)
+        if values is None:
+            axes[key] = [text]
+        else:
+            axes[key] = values
+            swept_keys.append(key)
+
+    count = math.prod(len(values) for values in axes.values())
+    if _too_many(count, max_variants):
+        raise SweepError(f"Sweep has {count} variants, more than the limit of {max_variants}")
+
+    def typed(key, value):
+        type_name = type_of(key)
+        if not isinstance(value, str):
+            return convert(value, type_name) if type_name else value
+        if type_name is None:
+            return infer_from_text(value) if value.strip() else None
+        return convert(value, type_name)
+
+    variants = []
+    for combination in itertools.product(*axes.values()):
+        try:
+            variants.append({key: typed(key, value) for key, value in zip(axes, combination)})
+        except ConfigValueError as e:
+            raise SweepError(str(e))
+    return swept_keys, variants
+
+
+class SweepVariant:
+    """One config of a sweep and the state of its run"""
+
+    def __init__(self, index, config, swept_keys):
+        self.index = index
+        self.config = config
+        self.params = {key: config[key] for key in swept_keys}
+        self.status = "pending"
+        self.returncode = None
+        self.duration = None
+        self.started = None
+        self.ended = None
+        self.log_path = None
+
+
+class SweepRunner:
+    """Run every variant of a sweep with at most max_workers at a time"""
+
+    def __init__(self, script_path, conda_env, variants, swept_keys, work_dir,
+                 max_workers=2, on_update=None, exec_profile=None):
+        self.script_path = script_path
+        self.conda_env = conda_env
+        self.work_dir = Path(work_dir)
+        self.max_workers = max(1, int(max_workers))
+        self.on_update = on_update or (lambda variant: None)
+        self.exec_profile = exec_profile
+        self.variants = [SweepVariant(i + 1, config, swept_keys) for i, config in enumerate(variants)]
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+
+    def start(self):
+        """Run all variants in the background"""
+        threading.Thread(target=self._run_all, daemon=True).start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run_all(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(self._run_variant, self.variants))
+        self.done.set()
+
+    def _run_variant(self, variant):
+        if self.cancel_event.is_set():
+            variant.status = "cancelled"
+            self.on_update(variant)
+            return
+        name = f"variant_{variant.index:03d}"
+        config_path = write_config_snapshot(variant.config, self.work_dir / f"{name}.yml")
+        variant.log_path = self.work_dir / f"{name}.log"
+        variant.status = "running"
+        self.on_update(variant)
+
+        variant.started = time.time()
+        status = "failed"
+        try:
+            result = run_script(
+                self.script_path, self.conda_env, config_path=config_path,
+                log_path=variant.log_path, cancel_event=self.cancel_event,
+                exec_profile=self.exec_profile,
+            )
+            variant.returncode = result.returncode
+            if result.cancelled:
+                status = "cancelled"
+            else:
+                status = "ok" if result.returncode == 0 else "failed"
+        except Exception as e:
+            with open(variant.log_path, 'a') as f:
+                f.write(f"\nError running script: {e}\n")
+        # Times are taken here, not when the GUI gets to the update
+        variant.ended = time.time()
+        variant.duration = variant.ended - variant.started
+        variant.status = status
+        self.on_update(variant)
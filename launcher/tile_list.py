@@ -0,0 +1,69 @@
+"""
+Tile lists for subset runs.
+
+Dropping several tiles on a config form writes them to a small sidecar file
+in a tile_lists folder next to the config and puts its path in the config's
+tile_list key:
+
+    # 3 tiles, dropped 2026-10-19 14:02
+    base: W:/block_4/predictions
+    tiles: [tile_0412.tif, tile_0413.tif, tile_0588.tif]
+
+base is the folder the tiles were dropped from and tiles their names relative
+to it. Every drop gets a new file (my_script_20261019_140215.yml), so a
+saved config, run snapshot or history entry keeps pointing at the tiles it
+was run with. A script that supports tile_list processes only those tiles instead
+of everything in its folder.
+
+Scripts read the file themselves (they may run in a conda environment that
+cannot import the launcher) and resolve tiles by file name only, in their own
+input folder: gdal_update_geotrans.py in label_dir, tile_inference.py in
+folder. base is ignored, so the list still applies when that folder is
+staged or swept; it only records where the tiles came from.
+"""
+import os
+import time
+from pathlib import Path
+
+import yaml
+
+TILE_LIST_KEY = "tile_list"
+
+
+def sidecar_path(config_path, when=None):
+    """New tile list file for a config: my_script_config.yml ->
+    tile_lists/my_script_<date>_<time>.yml, never an existing file"""
+    config_path = Path(config_path)
+    stem = config_path.stem
+    if stem.endswith("_config"):
+        stem = stem[:-len("_config")]
+    folder = config_path.parent / "tile_lists"
+    folder.mkdir(exist_ok=True)
+    name = f"{stem}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(when))}"
+    path = folder / f"{name}.yml"
+    suffix = 2
+    while path.exists():
+        path = folder / f"{name}_{suffix}.yml"
+        suffix += 1
+    return path
+
+
+def write_tile_list(paths, path):
+    """Write dropped file paths as a tile list; returns the number of tiles
+
+    Raises ValueError if the tiles do not share a drive (no common base).
+    """
+    paths = [os.path.normpath(p) for p in paths]
+    try:
+        base = os.path.commonpath([os.path.dirname(p) for p in paths])
+    except ValueError:
+        raise ValueError("tiles must come from one drive")
+    tiles = sorted({os.path.relpath(p, base).replace("\\", "/") for p in paths})
+    header = f"# {len(tiles)} tiles, dropped {time.strftime('%Y-%m-%d %H:%M')}\n"
+    tmp_path = Path(str(path) + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        yaml.safe_dump({"base": base.replace("\\", "/"), "tiles": tiles}, f,
+                       default_flow_style=None, width=100000, sort_keys=False)
+    os.replace(tmp_path, path)
+    return len(tiles)
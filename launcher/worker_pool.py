@@ -0,0 +1,353 @@
+"""
+Warm per-environment Python worker pool.
+
+Launching through `conda run` pays for conda's own startup plus the imports of
+GDAL/torch on every click. The pool instead keeps one warm interpreter
+(launcher/_worker.py) per conda environment, started once through conda run
+with the heavy modules optionally preloaded. Every run is a fresh child forked
+from the warm worker and executed with runpy, so runs stay isolated from each
+other.
+
+Workers are recycled after a number of runs or when idle. Forking is only
+available on POSIX; on other platforms available() is False and the launcher
+keeps using conda run.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .process_tree import session_members
+
+WORKER_SCRIPT = Path(__file__).parent / "_worker.py"
+
+# Seconds to wait for a worker to start (conda run + preloads) and for a
+# forked child to connect its output socket
+WORKER_START_TIMEOUT = 120
+RUN_CONNECT_TIMEOUT = 30
+
+
+class WorkerError(Exception):
+    """Raised when a warm worker cannot be started or fails mid-request"""
+
+
+def available():
+    """Warm workers rely on os.fork"""
+    return hasattr(os, 'fork')
+
+
+def _listen():
+    """Open a listening socket on an ephemeral localhost port"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    return listener
+
+
+class WorkerRun:
+    """A script running in a child of a warm worker
+
+    Mimics the parts of subprocess.Popen the launcher uses: stdout (binary,
+    stderr merged), pid, returncode, poll(), wait(), terminate() and kill(),
+    plus descendants() like launcher.process_tree.TreePopen.
+    """
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.pid = None
+        self.returncode = None
+        self.stdout = None
+        self._started = threading.Event()
+        self._exited = threading.Event()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if not self._exited.wait(timeout):
+            raise subprocess.TimeoutExpired("warm worker run", timeout)
+        return self.returncode
+
+    def send_signal(self, sig):
+        # Each child calls setsid(), so its pid is also its process group;
+        # the group can outlive the child, so signal it even after exit
+        if self.pid is not None:
+            try:
+                os.killpg(self.pid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+        for pid in self.descendants():
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def descendants(self):
+        """Live processes started by the script"""
+        if self.pid is None:
+            return []
+        return session_members(self.pid)
+
+    def _set_exited(self, returncode):
+        self.returncode = returncode
+        self._exited.set()
+        self._started.set()
+
+
+class _Worker:
+    """One warm interpreter for one conda environment"""
+
+    def __init__(self, env_name, preload):
+        self.env_name = env_name
+        self.run_count = 0
+        self.last_used = time.monotonic()
+        self.retired = False
+        self.runs = {}
+        self.info = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._dead = threading.Event()
+
+        listener = _listen()
+        port = listener.getsockname()[1]
+        worker_args = [
+            '-u', str(WORKER_SCRIPT),
+            '--control-port', str(port),
+            '--preload', ",".join(preload),
+        ]
+        if env_name:
+            command = ['conda', 'run', '--no-capture-output', '-n', env_name, 'python'] + worker_args
+        else:
+            # No conda environment selected: warm up the launcher's own Python
+            command = [sys.executable] + worker_args
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL)
+        try:
+            self.control = self._accept_control(listener)
+        finally:
+            listener.close()
+
+        self._reader = self.control.makefile('r', encoding='utf-8')
+        ready = json.loads(self._reader.readline() or '{}')
+        if ready.get("event") != "ready":
+            self.close()
+            raise WorkerError(f"Worker for '{env_name}' failed during startup")
+        self.info = ready
+        threading.Thread(target=self._read_events, daemon=True).start()
+
+    @property
+    def active_runs(self):
+        with self._lock:
+            return len(self.runs)
+
+    @property
+    def alive(self):
+        return not self._dead.is_set() and self.process.poll() is None
+
+    def start_script(self, script_path, env=None, cwd=None, args=()):
+        listener = _listen()
+        with self._lock:
+            self._next_id += 1
+            run = WorkerRun(self._next_id)
+            self.runs[run.run_id] = run
+            self.run_count += 1
+            self.last_used = time.monotonic()
+        request = {
+            "op": "run",
+            "id": run.run_id,
+            "script": str(script_path),
+            "cwd": str(cwd) if cwd else None,
+            "args": list(args),
+            "env": dict(env or {}),
+            "port": listener.getsockname()[1],
+        }
+        try:
+            self._send(request)
+            listener.settimeout(RUN_CONNECT_TIMEOUT)
+            connection, _ = listener.accept()
+        except OSError as e:
+            with self._lock:
+                self.runs.pop(run.run_id, None)
+            raise WorkerError(f"Worker for '{self.env_name}' did not start the run: {e}")
+        finally:
+            listener.close()
+
+        run.stdout = connection.makefile('rb', buffering=0)
+        connection.close()  # the file object keeps the socket open
+        if not run._started.wait(RUN_CONNECT_TIMEOUT):
+            raise WorkerError(f"Worker for '{self.env_name}' did not report the run")
+        return run
+
+    def close(self):
+        """Ask the worker to exit; running children are left to finish"""
+        try:
+            self._send({"op": "exit"})
+        except OSError:
+            pass
+        try:
+            self.control.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def _accept_control(self, listener):
+        # Poll so a worker that dies during startup fails fast
+        listener.settimeout(0.5)
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                connection, _ = listener.accept()
+                return connection
+            except socket.timeout:
+                if self.process.poll() is not None:
+                    raise WorkerError(
+                        f"Worker for '{self.env_name}' exited with code {self.process.returncode}"
+                    )
+        self.process.kill()
+        raise WorkerError(f"Worker for '{self.env_name}' did not start")
+
+    def _send(self, message):
+        self.control.sendall((json.dumps(message) + "\n").encode('utf-8'))
+
+    def _read_events(self):
+        try:
+            for line in self._reader:
+                event = json.loads(line)
+                with self._lock:
+                    run = self.runs.get(event.get("id"))
+                    if event.get("event") == "exited":
+                        self.runs.pop(event["id"], None)
+                        self.last_used = time.monotonic()
+                if run is None:
+                    continue
+                if event.get("event") == "started":
+                    run.pid = event["pid"]
+                    run._started.set()
+                elif event.get("event") == "exited":
+                    run._set_exited(event["returncode"])
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._dead.set()
+            with self._lock:
+                orphaned = list(self.runs.values())
+                self.runs.clear()
+            for run in orphaned:
+                run._set_exited(-1)
+
+
+class WorkerPool:
+    """Warm workers keyed by conda environment name"""
+
+    def __init__(self, preload=(), max_runs=20, idle_seconds=600):
+        self.preload = list(preload)
+        self.max_runs = max_runs
+        self.idle_seconds = idle_seconds
+        self._workers = {}
+        self._retired = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        threading.Thread(target=self._reap_idle, daemon=True).start()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build a pool from the worker_pool section of the launcher settings"""
+        pool_settings = settings["worker_pool"]
+        return cls(
+            preload=pool_settings.get("preload") or (),
+            max_runs=pool_settings.get("max_runs", 20),
+            idle_seconds=pool_settings.get("idle_seconds", 600),
+        )
+
+    def start_script(self, env_name, script_path, env=None, cwd=None, args=()):
+        """Run a script in a fresh child of the env's warm worker"""
+        if not available():
+            raise WorkerError("Warm workers need os.fork, which this platform lacks")
+        worker = self._worker_for(env_name)
+        return worker.start_script(script_path, env=env, cwd=cwd, args=args)
+
+    def warm_up(self, env_name):
+        """Start the worker for an environment ahead of the first run"""
+        if not available():
+            return
+        self._worker_for(env_name)
+
+    def _worker_for(self, env_name):
+        """The env's usable worker, starting one if needed
+
+        Starting a worker preloads modules and can take minutes, so it
+        happens outside the lock; other environments, the idle reaper and
+        shutdown() are not held up. If another thread published a worker
+        for the env meanwhile, that one is used and the new one closed.
+        """
+        with self._lock:
+            worker = self._workers.get(env_name)
+            if worker is not None and self._usable(worker):
+                return worker
+        started = _Worker(env_name, self.preload)
+        with self._lock:
+            if self._stop.is_set():
+                extra, worker = started, None
+            else:
+                worker = self._workers.get(env_name)
+                if worker is not None and self._usable(worker):
+                    extra = started
+                else:
+                    if worker is not None:
+                        self._retire(worker)
+                    worker = self._workers[env_name] = started
+                    extra = None
+        if extra is not None:
+            extra.close()
+        if worker is None:
+            raise WorkerError("The worker pool has been shut down")
+        return worker
+
+    def _usable(self, worker):
+        return worker.alive and worker.run_count < self.max_runs
+
+    def shutdown(self):
+        """Stop all workers"""
+        self._stop.set()
+        with self._lock:
+            workers = list(self._workers.values()) + self._retired
+            self._workers.clear()
+            self._retired = []
+        for worker in workers:
+            worker.close()
+
+    def _retire(self, worker):
+        # Must hold self._lock. Workers with running children are closed once
+        # those finish so their exit codes are still collected.
+        del self._workers[worker.env_name]
+        worker.retired = True
+        if worker.active_runs:
+            self._retired.append(worker)
+        else:
+            worker.close()
+
+    def _reap_idle(self):
+        while not self._stop.wait(30):
+            now = time.monotonic()
+            with self._lock:
+                for worker in list(self._workers.values()):
+                    idle = now - worker.last_used
+                    if not worker.alive or (not worker.active_runs and idle > self.idle_seconds):
+                        self._retire(worker)
+                for worker in list(self._retired):
+                    if not worker.active_runs:
+                        self._retired.remove(worker)
+                        worker.close()
@@ -0,0 +1,289 @@
+"""
+Workflows: scripts chained into a dependency graph.
+
+A workflow file lists steps by name. Each step runs one script with its own
+config and conda environment and may wait for other steps with `needs`:
+
+    name: finetune
+    conda_env: geo                 # default for steps without their own
+    steps:
+      geotrans:
+        script: gdal_update_geotrans.py
+        config:                    # overrides on top of the script's config file
+          label_dir: W:/block_4/predictions
+      debuffer:
+        script: debuffer_placeholder.py
+        conda_env: base
+        profile: light             # execution profile (launcher.exec_profiles)
+        needs: [geotrans]
+        config:
+          buffered_tile: ${geotrans.label_dir}
+
+A string value of the form ${step.key} is replaced by that key of another
+step's resolved config, so outputs of one step can feed the next. Script paths
+are relative to the workflow file. A step without a `profile` uses the
+execution profile attached to its script, if any.
+
+WorkflowRunner starts every step whose needs have finished successfully, up to
+max_workers at a time, so independent branches run in parallel. Steps
+downstream of a failure are skipped. Each step gets a config snapshot and a
+log in the run directory; the script reads the snapshot through
+LAUNCHER_CONFIG_PATH.
+"""
+import re
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+from .runner import run_script, write_config_snapshot
+from .script_registry import config_filename_for
+
+REFERENCE_RE = re.compile(r'\$\{([^.}]+)\.([^}]+)\}')
+FINISHED = ("ok", "failed", "skipped", "cancelled")
+
+
+class WorkflowError(ValueError):
+    """Raised for malformed workflow files"""
+
+
+class WorkflowStep:
+    """One script run in a workflow and the state of its run"""
+
+    def __init__(self, name, script, conda_env=None, config=None, needs=(), profile=None):
+        self.name = name
+        self.script = Path(script)
+        self.conda_env = conda_env
+        self.profile = profile
+        self.overrides = dict(config or {})
+        self.needs = list(needs)
+        self.config = None
+        self.status = "pending"
+        self.returncode = None
+        self.started = None
+        self.ended = None
+        self.log_path = None
+
+    @property
+    def duration(self):
+        if self.started is None:
+            return None
+        return (self.ended or time.time()) - self.started
+
+    def base_config(self):
+        """The script's own config file, if it has one"""
+        config_path = self.script.parent / config_filename_for(self.script.name)
+        try:
+            with open(config_path, 'r') as f:
+                data = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+class Workflow:
+    """Steps of a workflow file in dependency order"""
+
+    def __init__(self, name, steps, path=None):
+        self.name = name
+        self.steps = {step.name: step for step in steps}
+        self.path = path
+        self.order = self._topological_order()
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        try:
+            with open(path, 'r') as f:
+                data = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise WorkflowError(f"Invalid YAML in {path.name}: {e}")
+        if not isinstance(data, dict) or not isinstance(data.get("steps"), dict) or not data["steps"]:
+            raise WorkflowError(f"{path.name} has no steps")
+
+        default_env = data.get("conda_env")
+        steps = []
+        for name, spec in data["steps"].items():
+            if not isinstance(spec, dict) or not spec.get("script"):
+                raise WorkflowError(f"Step '{name}' needs a script")
+            needs = spec.get("needs") or []
+            if isinstance(needs, str):
+                needs = [needs]
+            config = spec.get("config") or {}
+            if not isinstance(config, dict):
+                raise WorkflowError(f"config of step '{name}' must be a mapping")
+            steps.append(WorkflowStep(
+                str(name),
+                path.parent / spec["script"],
+                conda_env=spec.get("conda_env", default_env),
+                config=config,
+                needs=[str(n) for n in needs],
+                profile=spec.get("profile"),
+            ))
+        return cls(data.get("name") or path.stem, steps, path)
+
+    def _topological_order(self):
+        for step in self.steps.values():
+            for need in step.needs:
+                if need not in self.steps:
+                    raise WorkflowError(f"Step '{step.name}' needs unknown step '{need}'")
+        order = []
+        state = {}
+
+        def visit(name, chain):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise WorkflowError("Dependency cycle: " + " -> ".join(chain + [name]))
+            state[name] = "visiting"
+            for need in self.steps[name].needs:
+                visit(need, chain + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    def levels(self):
+        """Step names grouped by depth; steps in one level are independent"""
+        depth = {}
+        for name in self.order:
+            needs = self.steps[name].needs
+            depth[name] = 1 + max((depth[n] for n in needs), default=-1)
+        levels = [[] for _ in range(max(depth.values()) + 1)]
+        for name in self.order:
+            levels[depth[name]].append(name)
+        return levels
+
+    def dependents(self, name):
+        return [s.name for s in self.steps.values() if name in s.needs]
+
+    def resolve_configs(self):
+        """Fill every step's config: script config + overrides + ${step.key} references"""
+        for name in self.order:
+            step = self.steps[name]
+            config = step.base_config()
+            config.update(step.overrides)
+            step.config = {key: self._resolve(step, value) for key, value in config.items()}
+
+    def _resolve(self, step, value):
+        if not isinstance(value, str):
+            return value
+
+        def replace(match):
+            other, key = match.group(1), match.group(2)
+            if other not in step.needs and other not in self._ancestors(step.name):
+                raise WorkflowError(f"Step '{step.name}' refers to '{other}', which it does not need")
+            other_config = self.steps[other].config or {}
+            if key not in other_config:
+                raise WorkflowError(f"Step '{other}' has no config key '{key}'")
+            return str(other_config[key])
+
+        whole = REFERENCE_RE.fullmatch(value)
+        if whole:
+            # Keep the type of a value that is just a reference
+            replace(whole)
+            return self.steps[whole.group(1)].config[whole.group(2)]
+        return REFERENCE_RE.sub(replace, value)
+
+    def _ancestors(self, name):
+        seen = set()
+        stack = list(self.steps[name].needs)
+        while stack:
+            need = stack.pop()
+            if need not in seen:
+                seen.add(need)
+                stack.extend(self.steps[need].needs)
+        return seen
+
+
+class WorkflowRunner:
+    """Run a workflow's steps as soon as their needs are done"""
+
+    def __init__(self, workflow, work_dir, max_workers=4, default_env=None, on_update=None,
+                 exec_profiles=None):
+        self.workflow = workflow
+        self.work_dir = Path(work_dir)
+        self.max_workers = max(1, int(max_workers))
+        self.default_env = default_env
+        self.on_update = on_update or (lambda step: None)
+        self.exec_profiles = exec_profiles
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self._changed = threading.Condition()
+
+    def start(self):
+        """Resolve configs and run the workflow in the background"""
+        self.workflow.resolve_configs()
+        threading.Thread(target=self._run_all, daemon=True).start()
+
+    def cancel(self):
+        self.cancel_event.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    def _run_all(self):
+        steps = self.workflow.steps
+        running = set()
+        with self._changed:
+            while True:
+                for name in self.workflow.order:
+                    step = steps[name]
+                    if step.status != "pending":
+                        continue
+                    if self.cancel_event.is_set():
+                        self._finish(step, "cancelled")
+                    elif any(steps[n].status in ("failed", "skipped", "cancelled") for n in step.needs):
+                        self._finish(step, "skipped")
+                    elif (all(steps[n].status == "ok" for n in step.needs)
+                            and len(running) < self.max_workers):
+                        step.status = "running"
+                        running.add(name)
+                        threading.Thread(target=self._run_step, args=(step, running), daemon=True).start()
+                        self.on_update(step)
+                if all(step.status in FINISHED for step in steps.values()):
+                    break
+                self._changed.wait()
+        self.done.set()
+
+    def _finish(self, step, status):
+        step.status = status
+        self.on_update(step)
+
+    def _exec_profile(self, step):
+        if self.exec_profiles is None:
+            return None
+        if step.profile:
+            profile = self.exec_profiles.get(step.profile)
+            if profile is None:
+                raise WorkflowError(f"Step '{step.name}' uses unknown execution profile '{step.profile}'")
+            return profile
+        return self.exec_profiles.profile_for(step.script.name)
+
+    def _run_step(self, step, running):
+        step.log_path = self.work_dir / f"{step.name}.log"
+        step.started = time.time()
+        status = "failed"
+        try:
+            config_path = write_config_snapshot(step.config, self.work_dir / f"{step.name}.yml")
+            result = run_script(
+                step.script, step.conda_env or self.default_env, config_path=config_path,
+                log_path=step.log_path, cancel_event=self.cancel_event, cwd=step.script.parent,
+                exec_profile=self._exec_profile(step),
+            )
+            step.returncode = result.returncode
+            if result.cancelled:
+                status = "cancelled"
+            elif result.returncode == 0:
+                status = "ok"
+        except Exception as e:
+            with open(step.log_path, 'a') as f:
+                f.write(f"\nError running step: {e}\n")
+        step.ended = time.time()
+        with self._changed:
+            running.discard(step.name)
+            step.status = status
+            self.on_update(step)
+            self._changed.notify_all()
@@ -0,0 +1,21 @@
+"""
+Stand-in model for tile_inference.py.
+
+Classifies each pixel as vegetation (1) or not (0) by thresholding NDVI of
+4-band RGBN imagery. It needs only numpy, so the inference pipeline can be
+tested on any machine without torch or model weights. Set model_path to this
+file to use it; python tile_inference.py --smoke-test runs it on synthetic
+tiles without GDAL.
+"""
+import numpy as np
+
+# NDVI above this counts as vegetation
+THRESHOLD = 0.3
+
+
+def predict(batch):
+    """Class ids (tiles, height, width) of a float32 batch (tiles, bands, height, width)"""
+    red = batch[:, 0]
+    nir = batch[:, 3] if batch.shape[1] > 3 else batch[:, -1]
+    ndvi = (nir - red) / np.maximum(nir + red, 1e-6)
+    return (ndvi > THRESHOLD).astype(np.uint8)
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+Tile Inference for Land Cover Models
+
+Runs a segmentation model over every tile of an imagery folder and writes one
+georeferenced class raster per tile.
+
+Purpose:
+    Prediction used to be done tile by tile: read a tile from the share,
+    predict, write, repeat, so the CPU sat idle during every read. Here the
+    three stages overlap:
+        - reader threads read tiles (in windows, if window_size is set) into a
+          bounded prefetch queue, so reads run ahead of the model but memory
+          stays capped at `prefetch` windows
+        - the main thread stacks windows into batches of batch_size and
+          predicts them
+        - a writer thread writes the predictions; each output gets the
+          geotransform and projection of its source tile, like add_proj() in
+          gdal_update_geotrans.py, so no separate georeferencing pass is needed
+
+Model:
+    model_path is either
+        - a .py file defining predict(batch): batch is a float32 array
+          (tiles, bands, height, width); it returns class ids (tiles, height,
+          width) or class scores (tiles, classes, height, width). An optional
+          setup(config) is called once before the first batch.
+        - a TorchScript file (.pt/.pth), run on the CPU; the class with the
+          highest score is written. Models that need normalised inputs should
+          be wrapped in a .py file instead.
+    models/ndvi_threshold_model.py is a tiny stand-in model for testing the
+    pipeline without torch.
+
+Configuration:
+    Reads from tile_inference_config.yml (or the file named by LAUNCHER_CONFIG_PATH):
+        model_path     model file (see above)
+        folder         imagery tiles (*.tif)
+        out_dir        where the predictions are written, same file names
+        tile_list      optional tile list; only these tiles are predicted
+        batch_size     windows per prediction call
+        window_size    predict in square windows of this many pixels (0: whole tiles)
+        prefetch       windows read ahead of the model
+        read_workers   tiles read at the same time
+        overwrite      predict tiles whose output already exists
+
+Output:
+    One single-band Byte GeoTIFF per tile in out_dir. An output only appears
+    under its final name once it is complete, so an interrupted run can simply
+    be started again. Ends with a breakdown of where the time went.
+
+Smoke test:
+    python tile_inference.py --smoke-test [model.py]
+    runs the same reader, batch and writer threads on synthetic in-memory
+    tiles, whole and in windows, and checks each assembled prediction against
+    the model applied to the whole tile. It needs only numpy (no GDAL) and
+    uses models/ndvi_threshold_model.py unless a model is given.
+"""
+import glob
+import importlib.util
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+try:
+    from osgeo import gdal
+except ImportError:     # only --smoke-test works without GDAL
+    gdal = None
+
+# Config keys and types, read by the launcher without importing this script
+CONFIG_SCHEMA = {
+    "model_path": {"type": "file", "help": "Model: a .py file with predict(batch), or a TorchScript .pt"},
+    "folder": {"type": "dir", "role": "input", "help": "Imagery tiles to predict"},
+    "out_dir": {"type": "dir", "role": "output", "help": "Where the predictions are written"},
+    "tile_list": {"type": "file", "help": "Optional tile list (drop several tiles); only these tiles are predicted"},
+    "batch_size": {"type": "int", "default": 8},
+    "window_size": {"type": "int", "default": 0, "help": "Window size in pixels (0: whole tiles)"},
+    "prefetch": {"type": "int", "default": 16, "help": "Windows read ahead of the model"},
+    "read_workers": {"type": "int", "default": 4},
+    "overwrite": {"type": "bool", "default": False},
+}
+
+REQUIRED_KEYS = ("model_path", "folder", "out_dir")
+
+TORCH_SUFFIXES = (".pt", ".pth", ".ts")
+
+SMOKE_TEST_MODEL = Path(__file__).parent / "models" / "ndvi_threshold_model.py"
+
+# Seconds a blocked put() waits before checking whether the run was aborted
+PUT_TIMEOUT = 0.5
+
+# Load configuration from YAML file
+# LAUNCHER_CONFIG_PATH points at a per-run config snapshot, e.g. for sweeps
+config_path = Path(os.environ.get('LAUNCHER_CONFIG_PATH') or Path(__file__).parent / 'tile_inference_config.yml')
+with open(config_path, 'r') as f:
+    config = yaml.safe_load(f) or {}
+
+
+def setting(key):
+    """Config value, or the schema default when missing or empty"""
+    value = config.get(key)
+    return CONFIG_SCHEMA[key].get("default") if value is None else value
+
+
+model_path = setting('model_path')
+folder = setting('folder')
+out_dir = setting('out_dir')
+tile_list_path = setting('tile_list')
+batch_size = max(int(setting('batch_size')), 1)
+window_size = max(int(setting('window_size')), 0)
+prefetch = max(int(setting('prefetch')), 1)
+read_workers = max(int(setting('read_workers')), 1)
+overwrite = bool(setting('overwrite'))
+
+
+def load_model(path):
+    """predict(batch) function of a .py model file or a TorchScript model"""
+    path = str(path)
+    if path.lower().endswith(TORCH_SUFFIXES):
+        import torch
+
+        model = torch.jit.load(path, map_location="cpu")
+        model.eval()
+
+        def predict(batch):
+            with torch.inference_mode():
+                return model(torch.from_numpy(batch)).argmax(dim=1).numpy()
+        return predict
+
+    spec = importlib.util.spec_from_file_location(Path(path).stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "predict"):
+        raise ValueError(f"{path} does not define predict(batch)")
+    if hasattr(module, "setup"):
+        module.setup(config)
+    return module.predict
+
+
+def read_tile_list(path):
+    """Tiles named in a tile list file, looked up in folder"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tiles = (yaml.safe_load(f) or {}).get('tiles') or []
+    return [os.path.join(folder, os.path.basename(t)) for t in tiles]
+
+
+def windows(xsize, ysize, size):
+    """(xoff, yoff, width, height) of the windows covering a tile"""
+    if not size:
+        return [(0, 0, xsize, ysize)]
+    return [(x, y, min(size, xsize - x), min(size, ysize - y))
+            for y in range(0, ysize, size)
+            for x in range(0, xsize, size)]
+
+
+class TileInfo:
+    """A tile being predicted; shared by the reader, model and writer stages"""
+
+    def __init__(self, path, out_path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.out_path = out_path
+        self.xsize = self.ysize = None
+        self.geotransform = self.projection = None
+        self.window_count = 0
+
+
+class GdalRasters:
+    """Tile reads and prediction writes with GDAL"""
+
+    def __init__(self):
+        gdal.UseExceptions()
+        self.driver = gdal.GetDriverByName("GTiff")
+
+    def open(self, tile):
+        ds = gdal.Open(tile.path)
+        tile.xsize, tile.ysize = ds.RasterXSize, ds.RasterYSize
+        # Same metadata add_proj() copies from the source imagery
+        tile.geotransform = ds.GetGeoTransform()
+        tile.projection = ds.GetProjection()
+        return ds
+
+    def read(self, ds, window):
+        return ds.ReadAsArray(*window)
+
+    def create(self, tile):
+        ds = self.driver.Create(self.partial_path(tile), tile.xsize, tile.ysize, 1, gdal.GDT_Byte,
+                                options=["COMPRESS=LZW", "TILED=YES"])
+        ds.SetGeoTransform(tile.geotransform)
+        ds.SetProjection(tile.projection)
+        return ds
+
+    def write(self, ds, prediction, xoff, yoff):
+        ds.GetRasterBand(1).WriteArray(prediction, xoff, yoff)
+
+    def commit(self, tile):
+        """Give a closed output its final name"""
+        os.replace(self.partial_path(tile), tile.out_path)
+
+    def discard(self, tile):
+        try:
+            os.remove(self.partial_path(tile))
+        except OSError:
+            pass
+
+    @staticmethod
+    def partial_path(tile):
+        return tile.out_path + ".partial"
+
+
+class SyntheticRasters:
+    """In-memory 4-band tiles and outputs for --smoke-test"""
+
+    def __init__(self, xsize=300, ysize=200, bands=4):
+        self.xsize, self.ysize, self.bands = xsize, ysize, bands
+
+    def tile_data(self, tile):
+        seed = sum(tile.name.encode())
+        rng = np.random.default_rng(seed)
+        return rng.integers(0, 4096, (self.bands, self.ysize, self.xsize), dtype=np.uint16)
+
+    def open(self, tile):
+        tile.xsize, tile.ysize = self.xsize, self.ysize
+        tile.geotransform = (0.0, 1.0, 0.0, 0.0, 0.0, -1.0)
+        tile.projection = ""
+        return self.tile_data(tile)
+
+    def read(self, data, window):
+        xoff, yoff, width, height = window
+        return data[:, yoff:yoff + height, xoff:xoff + width]
+
+    def create(self, tile):
+        return np.full((tile.ysize, tile.xsize), 255, dtype=np.uint8)
+
+    def write(self, output, prediction, xoff, yoff):
+        height, width = prediction.shape
+        output[yoff:yoff + height, xoff:xoff + width] = prediction
+
+    def commit(self, tile):
+        pass
+
+    def discard(self, tile):
+        pass
+
+
+def reader(rasters, tiles, data_queue, stop, size, read_time):
+    """Reader thread: read the windows of tiles taken from a shared queue
+
+    read_time is this thread's own [seconds] total, summed after the run.
+    """
+    while not stop.is_set():
+        try:
+            tile = tiles.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            started = time.perf_counter()
+            ds = rasters.open(tile)
+            tile_windows = windows(tile.xsize, tile.ysize, size)
+            tile.window_count = len(tile_windows)
+            for window in tile_windows:
+                array = rasters.read(ds, window)
+                if array.ndim == 2:
+                    array = array[np.newaxis]
+                read_time[0] += time.perf_counter() - started
+                if not put(data_queue, ("window", tile, window, array), stop):
+                    return
+                started = time.perf_counter()
+            ds = None
+        except Exception as e:
+            put(data_queue, ("error", tile, str(e), None), stop)
+    put(data_queue, ("done", None, None, None), stop)
+
+
+def writer(rasters, write_queue, results, timings, on_output=None):
+    """Writer thread: write predicted windows, finishing each tile with a rename"""
+    open_tiles = {}     # out_path -> [dataset, windows still to come, tile]
+    failed = set()
+    while True:
+        item = write_queue.get()
+        if item is None:
+            break
+        kind, tile, window, prediction = item
+        if kind == "error" or tile.out_path in failed:
+            if kind == "error":
+                failed.add(tile.out_path)
+            entry = open_tiles.pop(tile.out_path, None)
+            if entry is not None:
+                entry[0] = None
+                rasters.discard(tile)
+            continue
+        started = time.perf_counter()
+        try:
+            entry = open_tiles.get(tile.out_path)
+            if entry is None:
+                entry = open_tiles[tile.out_path] = [rasters.create(tile), tile.window_count, tile]
+            xoff, yoff, width, height = window
+            rasters.write(entry[0], prediction[:height, :width], xoff, yoff)
+            entry[1] -= 1
+            if entry[1] == 0:
+                del open_tiles[tile.out_path]
+                if on_output is not None:
+                    on_output(tile, entry[0])
+                entry[0] = None     # closes and flushes a GDAL dataset
+                rasters.commit(tile)
+                results["written"] += 1
+                print(f"[{results['written'] + results['failed']}/{results['total']}] {tile.name} "
+                      f"({100 * (results['written'] + results['failed']) / results['total']:.0f}%)", flush=True)
+        except Exception as e:
+            print(f"Error writing {tile.out_path}: {e}", flush=True)
+            failed.add(tile.out_path)
+            results["failed"] += 1
+            open_tiles.pop(tile.out_path, None)
+            rasters.discard(tile)
+        timings["write"] += time.perf_counter() - started
+    # Tiles left open when a run is aborted
+    for entry in open_tiles.values():
+        entry[0] = None
+        rasters.discard(entry[2])
+
+
+def put(target, item, stop):
+    """Put an item on a bounded queue unless the run is stopped"""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def prepare_batch(arrays):
+    """Stack windows into one float32 batch; edge windows are zero-padded"""
+    height = max(a.shape[1] for a in arrays)
+    width = max(a.shape[2] for a in arrays)
+    stacked = np.zeros((len(arrays), arrays[0].shape[0], height, width), dtype=np.float32)
+    for i, array in enumerate(arrays):
+        stacked[i, :, :array.shape[1], :array.shape[2]] = array
+    return stacked
+
+
+def class_ids(predictions):
+    """Model output as uint8 class ids (tiles, height, width)"""
+    predictions = np.asarray(predictions)
+    if predictions.ndim == 4:
+        predictions = predictions.argmax(axis=1)
+    return predictions.astype(np.uint8)
+
+
+def predict_batch(predict, batch, write_queue, timings):
+    """Predict a batch of windows and hand the results to the writer"""
+    started = time.perf_counter()
+    predictions = class_ids(predict(prepare_batch([array for _, _, array in batch])))
+    timings["predict"] += time.perf_counter() - started
+    # The writer crops the padding of edge windows again
+    for (tile, window, _), prediction in zip(batch, predictions):
+        write_queue.put(("window", tile, window, prediction))
+
+
+def run_pipeline(rasters, tiles, predict, size, on_output=None):
+    """Predict tiles through the reader, model and writer stages; returns the results"""
+    started = time.perf_counter()
+    timings = {"wait": 0.0, "predict": 0.0, "write": 0.0}
+    results = {"written": 0, "failed": 0, "total": len(tiles)}
+    stop = threading.Event()
+    tile_queue = queue.Queue()
+    for tile in tiles:
+        tile_queue.put(tile)
+    data_queue = queue.Queue(maxsize=prefetch)
+    write_queue = queue.Queue(maxsize=prefetch + batch_size)
+
+    workers = min(read_workers, len(tiles))
+    read_times = [[0.0] for _ in range(workers)]
+    readers = [threading.Thread(target=reader, args=(rasters, tile_queue, data_queue, stop, size, read_time),
+                                daemon=True)
+               for read_time in read_times]
+    write_thread = threading.Thread(target=writer, args=(rasters, write_queue, results, timings, on_output),
+                                    daemon=True)
+    for thread in readers + [write_thread]:
+        thread.start()
+
+    batch = []
+    running = workers
+    try:
+        while running:
+            waited = time.perf_counter()
+            kind, tile, window, array = data_queue.get()
+            timings["wait"] += time.perf_counter() - waited
+            if kind == "done":
+                running -= 1
+            elif kind == "error":
+                print(f"Error reading {tile.path}: {window}", flush=True)
+                results["failed"] += 1
+                write_queue.put(("error", tile, None, None))
+            else:
+                if batch and array.shape[0] != batch[0][2].shape[0]:
+                    predict_batch(predict, batch, write_queue, timings)
+                    batch = []
+                batch.append((tile, window, array))
+                if len(batch) >= batch_size:
+                    predict_batch(predict, batch, write_queue, timings)
+                    batch = []
+        if batch:
+            predict_batch(predict, batch, write_queue, timings)
+    finally:
+        stop.set()
+        write_queue.put(None)
+        write_thread.join()
+        for thread in readers:
+            thread.join()
+
+    results["elapsed"] = time.perf_counter() - started
+    results["timings"] = dict(timings, read=sum(t[0] for t in read_times))
+    return results
+
+
+def report(results):
+    timings = results["timings"]
+    print(f"Predicted {results['written']} tiles in {results['elapsed']:.1f} s"
+          + (f", {results['failed']} failed" if results['failed'] else ""))
+    # Model waiting on reads means the share, not the CPU, is the limit
+    print(f"Time: model waited for reads {timings['wait']:.1f} s, predicting {timings['predict']:.1f} s; "
+          f"reading {timings['read']:.1f} s (all readers) and writing {timings['write']:.1f} s in the background")
+
+
+def check_config():
+    """Error message for a config that cannot be run, or None"""
+    missing = [key for key in REQUIRED_KEYS if not setting(key)]
+    if missing:
+        return f"Set {', '.join(missing)} in {config_path.name} before running"
+    if not os.path.isfile(model_path):
+        return f"Model not found: {model_path}"
+    if not os.path.isdir(folder):
+        return f"Imagery folder not found: {folder}"
+    if tile_list_path and not os.path.isfile(tile_list_path):
+        return f"Tile list not found: {tile_list_path}"
+    if gdal is None:
+        return "GDAL (osgeo) is not installed in this environment"
+    return None
+
+
+def main():
+    error = check_config()
+    if error:
+        print(f"Error: {error}", flush=True)
+        return 1
+
+    if tile_list_path:
+        tile_paths = read_tile_list(tile_list_path)
+        print(f"Processing {len(tile_paths)} tiles from {tile_list_path}")
+    else:
+        tile_paths = sorted(glob.glob(f'{folder}/*.tif'))
+    os.makedirs(out_dir, exist_ok=True)
+
+    tiles = [TileInfo(p, os.path.join(out_dir, os.path.basename(p))) for p in tile_paths]
+    if not overwrite:
+        done = [t for t in tiles if os.path.exists(t.out_path)]
+        if done:
+            print(f"Skipping {len(done)} tiles that already have a prediction (overwrite: false)")
+        tiles = [t for t in tiles if not os.path.exists(t.out_path)]
+    if not tiles:
+        print("No tiles to predict")
+        return 0
+
+    print(f"Loading model {model_path}", flush=True)
+    predict = load_model(model_path)
+    print(f"Predicting {len(tiles)} tiles, batch size {batch_size}, "
+          f"{'whole tiles' if not window_size else f'{window_size} px windows'}", flush=True)
+
+    results = run_pipeline(GdalRasters(), tiles, predict, window_size)
+    report(results)
+    print("Process Complete")
+    return 1 if results["failed"] else 0
+
+
+def smoke_test(model=None, tile_count=6):
+    """Run the pipeline on synthetic tiles and compare with whole-tile predictions"""
+    model = model or SMOKE_TEST_MODEL
+    print(f"Smoke test with {model}", flush=True)
+    predict = load_model(model)
+    rasters = SyntheticRasters()
+    failures = 0
+    # Whole tiles, then windows that do not divide the tile size (edge padding)
+    for size in (0, 128):
+        tiles = [TileInfo(f"tile_{i:03d}.tif", f"out/tile_{i:03d}.tif") for i in range(tile_count)]
+        outputs = {}
+        results = run_pipeline(rasters, tiles, predict, size,
+                               on_output=lambda tile, output: outputs.__setitem__(tile.name, output.copy()))
+        report(results)
+        for tile in tiles:
+            data = rasters.tile_data(tile)
+            expected = class_ids(predict(prepare_batch([data])))[0]
+            if tile.name not in outputs or not np.array_equal(outputs[tile.name], expected):
+                print(f"Smoke test: {tile.name} differs from the whole-tile prediction "
+                      f"({'whole tiles' if not size else f'{size} px windows'})", flush=True)
+                failures += 1
+    print("Smoke test passed" if not failures else f"Smoke test failed for {failures} tiles", flush=True)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--smoke-test":
+        sys.exit(smoke_test(sys.argv[2] if len(sys.argv) > 2 else None))
+    sys.exit(main())
@@ -1,38 +1,170 @@
 """
 Wait Script with Interval Alerts
 
-A simple demonstration script that waits for a configurable number of seconds
-while displaying progress alerts at 1-second intervals.
+A demonstration script that runs for a configurable number of seconds while
+printing alerts. It doubles as a synthetic output load generator for testing
+the launcher's output streaming, cancellation and memory behavior.
 
 Purpose:
     This script serves as a test/demonstration for subprocess execution monitoring
-    in GUI applications. It provides real-time output that can be captured and
-    displayed to show script progress.
+    in GUI applications. With the default config it prints one alert per second;
+    the load settings turn it into a reproducible stress test of the output path.
 
 Configuration:
-    Reads countdown_seconds from wait_script_config.yml to determine how long
-    to count down.
+    Reads from wait_script_config.yml (or the file named by LAUNCHER_CONFIG_PATH):
+        countdown_seconds      how long to run
+        lines_per_second       alert lines per second (fractions allowed)
+        line_length            pad or cut each line to this many characters (0: as is)
+        burst_lines            extra lines printed at once ...
+        burst_every_seconds    ... this often (0: no bursts)
+        progress_fraction      share of output that is '\\r' progress bar redraws
+        stderr_fraction        share of alert lines written to stderr instead
+        unicode                mix accented, CJK, emoji, combining and RTL text into lines
+        exit_code              exit status when the countdown completes
+        seed                   random seed; the same config gives the same output
 
 Output:
-    Prints an alert message every second until the countdown completes, then exits.
-    All print statements use flush=True to ensure immediate output buffering
-    for real-time display in parent processes.
+    Alert lines, optional progress bars and warnings on stderr, then a summary
+    of the lines and bytes written. Output is written once per tick and
+    flushed, so the timing seen by the parent process matches the config.
 """
+import os
+import random
+import sys
 import time
 import yaml
 from pathlib import Path
 
+# Config keys and types, read by the launcher without importing this script
+CONFIG_SCHEMA = {
+    "countdown_seconds": {"type": "int", "default": 10},
+    "lines_per_second": {"type": "float", "default": 1, "help": "Alert lines per second"},
+    "line_length": {"type": "int", "default": 0, "help": "Pad or cut lines to this length (0: as is)"},
+    "burst_lines": {"type": "int", "default": 0, "help": "Extra lines printed at once every burst interval"},
+    "burst_every_seconds": {"type": "float", "default": 0, "help": "Seconds between bursts (0: none)"},
+    "progress_fraction": {"type": "float", "default": 0, "help": "Share of output that is \\r progress bars"},
+    "stderr_fraction": {"type": "float", "default": 0, "help": "Share of lines written to stderr"},
+    "unicode": {"type": "bool", "default": False, "help": "Mix non-ASCII text into lines"},
+    "exit_code": {"type": "int", "default": 0, "help": "Exit status at the end"},
+    "seed": {"type": "int", "default": 0},
+}
+
+# Longest sleep between writes; bounds how late a line can be
+TICK_SECONDS = 0.01
+
+UNICODE_SAMPLES = [
+    "Fläche → Ω ✓ Größe",
+    "土地被覆分類 タイル",
+    "🌲🏠🌊 land cover",
+    "café combining",
+    "مرحبا RTL text",
+    "Ελληνικά ∑ ∞",
+]
+
 # Load configuration
-config_path = Path(__file__).parent / 'wait_script_config.yml'
+# LAUNCHER_CONFIG_PATH points at a per-run config snapshot, e.g. for sweeps
+config_path = Path(os.environ.get('LAUNCHER_CONFIG_PATH') or Path(__file__).parent / 'wait_script_config.yml')
 with open(config_path, 'r') as f:
-    config = yaml.safe_load(f)
+    config = yaml.safe_load(f) or {}
+
+
+def setting(key, convert):
+    """Config value, or the schema default when missing or empty"""
+    value = config.get(key)
+    return convert(CONFIG_SCHEMA[key]["default"] if value is None else value)
+
+
+countdown_seconds = setting('countdown_seconds', int)
+lines_per_second = max(setting('lines_per_second', float), 0.0)
+line_length = max(setting('line_length', int), 0)
+burst_lines = max(setting('burst_lines', int), 0)
+burst_every_seconds = max(setting('burst_every_seconds', float), 0.0)
+progress_fraction = min(max(setting('progress_fraction', float), 0.0), 0.99)
+stderr_fraction = min(max(setting('stderr_fraction', float), 0.0), 1.0)
+use_unicode = setting('unicode', bool)
+exit_code = setting('exit_code', int)
+rng = random.Random(setting('seed', int))
+
+
+def make_line(n, elapsed):
+    """Text of the n-th alert line, without the newline"""
+    text = f"Alert: line {n}, {elapsed:.1f} second(s) elapsed"
+    if use_unicode:
+        text += " " + UNICODE_SAMPLES[n % len(UNICODE_SAMPLES)]
+    if line_length:
+        filler = " " + (UNICODE_SAMPLES[n % len(UNICODE_SAMPLES)] if use_unicode else "abcdefghij")
+        while len(text) < line_length:
+            text += filler
+        text = text[:line_length]
+    return text
+
+
+def progress_bar(elapsed):
+    fraction = min(elapsed / countdown_seconds, 1.0) if countdown_seconds else 1.0
+    filled = int(fraction * 30)
+    return f"\r[{'#' * filled}{' ' * (30 - filled)}] {fraction * 100:5.1f}%"
+
+
+def main():
+    print(f"Starting {countdown_seconds}-second countdown...", flush=True)
+
+    started = time.monotonic()
+    lines = 0           # all alert lines, for numbering and the summary
+    base_lines = 0      # lines written at lines_per_second, without bursts
+    written_bytes = 0
+    next_burst = burst_every_seconds if burst_every_seconds and burst_lines else None
+    bar_open = False
+
+    while True:
+        elapsed = time.monotonic() - started
+        due = int(min(elapsed, countdown_seconds) * lines_per_second) - base_lines
+        base_lines += due
+        if next_burst is not None and elapsed >= next_burst and next_burst <= countdown_seconds:
+            due += burst_lines
+            next_burst += burst_every_seconds
+
+        out, err = [], []
+        for _ in range(max(due, 0)):
+            lines += 1
+            if rng.random() < progress_fraction:
+                # A progress redraw stands in for this line
+                out.append(progress_bar(elapsed))
+                bar_open = True
+                continue
+            line = make_line(lines, elapsed)
+            if bar_open:
+                out.append("\n")
+                bar_open = False
+            if rng.random() < stderr_fraction:
+                err.append(f"Warning: {line}\n")
+            else:
+                out.append(line + "\n")
+        if out:
+            text = "".join(out)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            written_bytes += len(text.encode("utf-8"))
+        if err:
+            text = "".join(err)
+            sys.stderr.write(text)
+            sys.stderr.flush()
+            written_bytes += len(text.encode("utf-8"))
 
-countdown_seconds = int(config.get('countdown_seconds', 10))  # Default to 10 if not specified, convert to int
+        if elapsed >= countdown_seconds:
+            break
+        time.sleep(min(TICK_SECONDS, 1 / lines_per_second) if lines_per_second else TICK_SECONDS)
 
-print(f"Starting {countdown_seconds}-second countdown...", flush=True)
+    if bar_open:
+        print(flush=True)
+    print(f"{countdown_seconds} seconds completed: {lines} lines, {written_bytes} bytes. "
+          f"Exiting with code {exit_code}...", flush=True)
+    return exit_code
 
-for i in range(1, countdown_seconds + 1):
-    print(f"Alert: {i} second(s) elapsed", flush=True)
-    time.sleep(1)
 
-print(f"{countdown_seconds} seconds completed. Exiting...", flush=True)
+if __name__ == "__main__":
+    # Python's UTF-8 mode is not on everywhere; keep Unicode lines from
+    # failing on a cp1252 console
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
+    sys.exit(main())